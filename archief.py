@@ -0,0 +1,87 @@
+"""Archief van de planningen: één genormaliseerde rij per dag en veld.
+
+Vroeger ging bij elke opslag de volledige planning als JSON-blob naar
+Weekresultaten. Nu houdt een lokale SQLite-tabel per (dag, veld) de laatst
+gekende waarde bij; enkel velden die veranderden sinds de vorige sync gaan,
+als één gebundelde append, naar een eigen tabblad met koprij Dag | Veld |
+Waarde | Tijdstip. Weekresultaten zelf blijft onaangeroerd met zijn oude
+JSON-blobs. Dezelfde tabel beantwoordt vragen als "wanneer aten we laatst X"
+zonder het tabblad te downloaden.
+"""
+from datetime import date, datetime
+
+from databank import verbind
+
+ARCHIEF_TABBLAD = "Archief per veld"
+ARCHIEF_KOPPEN = ["Dag", "Veld", "Waarde", "Tijdstip"]
+ARCHIEF_VELDEN = ('eten', 'taak_lise', 'taak_cedric', 'cedric', 'lise', 'kids', 'all')
+
+
+class Archief:
+    def __init__(self, pad, velden=ARCHIEF_VELDEN):
+        self.pad = pad
+        self.velden = tuple(velden)
+        self._tabbladen = set()  # tabbladen waarvoor al een maak_tabblad in de wachtrij staat
+        with verbind(self.pad) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS archief (dag_key TEXT NOT NULL, veld TEXT NOT NULL, "
+                "waarde TEXT NOT NULL, gesynct INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (dag_key, veld))"
+            )
+            # Leeskant: laatste dag per (veld, waarde) is één index-lookup
+            conn.execute("CREATE INDEX IF NOT EXISTS archief_waarde ON archief (veld, waarde, dag_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS archief_open ON archief (gesynct) WHERE gesynct = 0")
+
+    def registreer(self, planningen):
+        """Neemt {dag_key: planning} op; enkel gewijzigde velden worden als niet-gesynct gemarkeerd.
+
+        Geeft het aantal gewijzigde velden terug.
+        """
+        if not planningen:
+            return 0
+        keys = list(planningen)
+        with verbind(self.pad) as conn:
+            conn.execute("BEGIN IMMEDIATE")  # lezen en schrijven zonder sync ertussen
+            bekend = {
+                (dag_key, veld): waarde for dag_key, veld, waarde in conn.execute(
+                    f"SELECT dag_key, veld, waarde FROM archief WHERE dag_key IN ({','.join('?' * len(keys))})", keys,
+                )
+            }
+            gewijzigd = [
+                (dag_key, veld, str(planning.get(veld, "")))
+                for dag_key, planning in planningen.items() for veld in self.velden
+                if bekend.get((dag_key, veld)) != str(planning.get(veld, ""))
+            ]
+            conn.executemany("INSERT OR REPLACE INTO archief VALUES (?, ?, ?, 0)", gewijzigd)
+        return len(gewijzigd)
+
+    def sync(self, wachtrij, tabblad=ARCHIEF_TABBLAD):
+        """Zet alle niet-gesyncte velden als één append in de schrijfwachtrij; doet zelf geen netwerkcalls"""
+        with verbind(self.pad) as conn:
+            conn.execute("BEGIN IMMEDIATE")  # twee sessies mogen dezelfde rijen niet dubbel versturen
+            rijen = conn.execute(
+                "SELECT dag_key, veld, waarde FROM archief WHERE gesynct = 0 ORDER BY dag_key, veld"
+            ).fetchall()
+            if not rijen:
+                return 0
+            tijdstip = datetime.now().isoformat(timespec='seconds')
+            if tabblad not in self._tabbladen:
+                # Eén keer per proces; de wachtrij maakt het tabblad bij de flush aan als het ontbreekt
+                wachtrij.maak_tabblad(tabblad, ARCHIEF_KOPPEN)
+                self._tabbladen.add(tabblad)
+            # De wachtrij bewaart de operatie op schijf, dus meteen als gesynct markeren mag
+            wachtrij.append_rows(tabblad, [[dag_key, veld, waarde, tijdstip] for dag_key, veld, waarde in rijen])
+            conn.executemany("UPDATE archief SET gesynct = 1 WHERE dag_key = ? AND veld = ?",
+                             [(dag_key, veld) for dag_key, veld, _ in rijen])
+        return len(rijen)
+
+    def laatst(self, waarde, velden=('eten',), tot=None):
+        """Laatste dag (dag_key) tot en met `tot` (standaard vandaag) waarop een van `velden` `waarde` had"""
+        tot = str(tot or date.today())
+        velden = list(velden)
+        with verbind(self.pad) as conn:
+            rij = conn.execute(
+                f"SELECT MAX(dag_key) FROM archief WHERE veld IN ({','.join('?' * len(velden))}) "
+                "AND waarde = ? AND dag_key <= ?",
+                velden + [str(waarde), tot],
+            ).fetchone()
+        return rij[0]
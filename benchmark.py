@@ -0,0 +1,607 @@
+"""Benchmarks tegen de lokale fake gspread backend (geen netwerk nodig).
+
+Gebruik:
+    python benchmark.py suite --schalen 10 1000 100000   (resultaten per commit in benchmark_resultaten.jsonl)
+    python benchmark.py laden --latentie 0.05
+    python benchmark.py snapshot --latentie 0.3
+    python benchmark.py wachtrij --klikken 20
+    python benchmark.py opslag --dagen 100 1000 10000
+    python benchmark.py geschiktheid --taken 1000 10000 100000
+    python benchmark.py toewijzing --taken 100 10000
+    python benchmark.py horizon --dagen 7 91 365
+    python benchmark.py weergave --opties 100 1000 10000
+    python benchmark.py zoeken --gerechten 1000 20000
+    python benchmark.py taken --taken 1000 10000 100000
+    python benchmark.py optimalisatie --taken 20 1000 100000 --weken 8
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+from fake_gspread import maak_gezinsplanning
+from huishoudens import OLIEBOOM
+from omgeving import Omgeving
+from opslag import PlanningDB
+from optimalisatie import VENSTERS, optimaliseer_week
+from planning import (
+    Planner, PlanningOpties, generate_daily_planning_with_randomness, verdeel_taken_per_persoon_with_shuffle, beschikbaar_masker, met_volgende_datum, plan_horizon, taak_eigenaars, taken_per_dag,
+    wijs_taken_toe,
+)
+from sheets import TABBLADEN, SheetRegister, TabbladCache, laad_tabbladen
+from snapshot import Snapshot, SnapshotSync
+from lru import LRUCache
+from wachtrij import SchrijfWachtrij
+from taken import TakenStore
+from weergave import NIEUW_GERECHT, week_weergave
+from zoeken import ZoekIndex
+
+
+def meet(functie, herhalingen=5):
+    """Geeft de beste tijd (in ms) over een aantal herhalingen terug"""
+    tijden = []
+    for _ in range(herhalingen):
+        start = time.perf_counter()
+        functie()
+        tijden.append((time.perf_counter() - start) * 1000)
+    return min(tijden)
+
+
+def laden_sequentieel(client):
+    # Oude aanpak: één worksheet() + get_all_records() per tabblad
+    spreadsheet = client.open("Gezinsplanning")
+    return {
+        key: pd.DataFrame(spreadsheet.worksheet(naam).get_all_records())
+        for key, naam in TABBLADEN.items()
+    }
+
+
+def laden_batch(client):
+    return laad_tabbladen(client.open("Gezinsplanning"))
+
+
+def bench_laden(args):
+    client = maak_gezinsplanning(latentie=args.latentie)
+    for naam, functie in [("sequentieel", laden_sequentieel), ("batch", laden_batch)]:
+        client.aanroepen.clear()
+        data = functie(client)
+        aanroepen = client.totaal_aanroepen
+        ms = meet(lambda: functie(client), args.herhalingen)
+        print(f"{naam:>12}: {ms:8.1f} ms  ({aanroepen} requests, {len(data)} tabbladen)")
+
+    referentie, batch = laden_sequentieel(client), laden_batch(client)
+    for key in TABBLADEN:
+        pd.testing.assert_frame_equal(referentie[key], batch[key])
+    print("Resultaten identiek ✅")
+
+
+def bench_snapshot(args):
+    client = maak_gezinsplanning(taken=args.taken, gerechten=args.taken, latentie=args.latentie)
+    with tempfile.TemporaryDirectory() as map_:
+        pad = os.path.join(map_, "snapshot.sqlite")
+        SnapshotSync(SheetRegister(client, "Gezinsplanning"), Snapshot(pad)).ververs(forceer=True)
+
+        def opstart_netwerk():
+            register = SheetRegister(client, "Gezinsplanning")
+            return TabbladCache(lambda t: register.voer_uit(lambda sp: laad_tabbladen(sp, t))).haal_op()
+
+        def opstart_snapshot():
+            sync = SnapshotSync(SheetRegister(client, "Gezinsplanning"), Snapshot(pad))
+            return TabbladCache(sync.laad, ttl=None).haal_op()
+
+        for naam, functie in [("netwerk", opstart_netwerk), ("snapshot", opstart_snapshot)]:
+            client.aanroepen.clear()
+            functie()
+            aanroepen = client.totaal_aanroepen
+            print(f"{naam:>9}: {meet(functie, args.herhalingen):8.1f} ms  ({aanroepen} requests)")
+
+        sync = SnapshotSync(SheetRegister(client, "Gezinsplanning"), Snapshot(pad))
+        client.aanroepen.clear()
+        sync.ververs()
+        print(f"sync zonder wijzigingen: {dict(client.aanroepen)}")
+        client.faal_volgende(10, code=503)
+        data = TabbladCache(sync.laad, ttl=None).haal_op()
+        print(f"opstart met Sheets onbereikbaar: {sum(len(df) for df in data.values())} rijen uit de snapshot ✅")
+
+
+def bench_wachtrij(args):
+    # Eén "klik" = taak afvinken (update_cell) + gerecht toevoegen (append_row)
+    client = maak_gezinsplanning(latentie=args.latentie)
+    sheet = client.open("Gezinsplanning").worksheet("Taken")
+    eten = client.open("Gezinsplanning").worksheet("Eten")
+    client.aanroepen.clear()
+    start = time.perf_counter()
+    for i in range(args.klikken):
+        sheet.update_cell(i % 5 + 2, 5, "2025-01-01")
+        eten.append_row([f"Nieuw gerecht {i}"])
+    blokkerend = (time.perf_counter() - start) * 1000
+    print(f"{'direct':>12}: {blokkerend:8.1f} ms blokkerend  ({client.totaal_aanroepen} requests)")
+
+    client = maak_gezinsplanning(latentie=args.latentie)
+    register = SheetRegister(client, "Gezinsplanning")
+    register.worksheet("Taken"), register.worksheet("Eten")
+    pad = os.path.join(tempfile.mkdtemp(), "schrijfwachtrij.json")
+    wachtrij = SchrijfWachtrij(register, pad)
+    client.aanroepen.clear()
+    client.faal_volgende(args.fouten, code=429)
+    start = time.perf_counter()
+    for i in range(args.klikken):
+        wachtrij.update_cell("Taken", i % 5 + 2, 5, "2025-01-01")
+        wachtrij.append_row("Eten", [f"Nieuw gerecht {i}"])
+    blokkerend = (time.perf_counter() - start) * 1000
+    wachtrij.backoff = 0.01
+    assert wachtrij.flush()
+    print(f"{'wachtrij':>12}: {blokkerend:8.1f} ms blokkerend  ({client.totaal_aanroepen} requests, "
+          f"waarvan {args.fouten} met 429)")
+
+
+def voorbeeld_dag(i):
+    return {
+        "datum": f"Dag {i}", "dag_kort": f"D {i}", "eten": f"Gerecht {i % 50}",
+        "taak_lise": "", "taak_cedric": f"Taak {i % 20}",
+        "cedric": "Activiteit C 1", "lise": "Activiteit L 2", "kids": "Activiteit K 3", "all": "Activiteit C 4",
+    }
+
+
+def bench_opslag(args):
+    # Eén interactie = één veld van één dag wijzigen en opslaan
+    map_ = tempfile.mkdtemp()
+    for aantal in args.dagen:
+        historiek = {f"d{i:06d}": voorbeeld_dag(i) for i in range(aantal)}
+
+        json_pad = os.path.join(map_, f"db_{aantal}.json")
+        def json_opslaan():
+            historiek["d000000"]["eten"] = "Ander gerecht"
+            with open(json_pad, "w") as f:
+                json.dump(historiek, f, indent=2)
+
+        db = PlanningDB(os.path.join(map_, f"db_{aantal}.sqlite"))
+        for key, dag in historiek.items():
+            db[key] = dag
+        db.opslaan()
+        def sqlite_opslaan():
+            db["d000000"]["eten"] = "Ander gerecht"
+            db.markeer("d000000")
+            db.opslaan()
+
+        print(f"{aantal:>7} dagen: json {meet(json_opslaan, args.herhalingen):8.2f} ms   "
+              f"sqlite {meet(sqlite_opslaan, args.herhalingen):8.2f} ms")
+
+
+def synthetische_data(taken=20, gerechten=50, activiteiten=20):
+    client = maak_gezinsplanning(taken=taken, gerechten=gerechten, activiteiten=activiteiten)
+    return laad_tabbladen(client.open("Gezinsplanning"))
+
+
+def masker_per_rij(taken_df, referentiedatum):
+    # Oude aanpak: apply over de rijen met strptime en een dict per aanroep
+    def mag_nog_niet(tijdseenheid, laatst):
+        if not laatst:
+            return True
+        try:
+            laatst_datum = datetime.strptime(laatst, "%Y-%m-%d")
+        except:
+            return True
+        delta = (referentiedatum - laatst_datum).days
+        return {
+            'Wekelijks': delta >= 7,
+            'Maandelijks': delta >= 30,
+            '3-maadelijks': delta >= 90,
+            'Half jaarlijks': delta >= 182,
+            'Jaarlijks': delta >= 365,
+            'Om de 5 jaar': delta >= 1825
+        }.get(tijdseenheid, True)
+    return taken_df.apply(lambda r: mag_nog_niet(r['Frequentie'], r.get('Laatst_Uitgevoerd')), axis=1).to_numpy()
+
+
+def bench_geschiktheid(args):
+    referentiedatum = datetime(2024, 9, 1)
+    for aantal in args.taken:
+        taken = synthetische_data(taken=aantal)['taken']
+        gecachet = met_volgende_datum(taken.copy())
+        assert (masker_per_rij(taken, referentiedatum) == beschikbaar_masker(taken, referentiedatum)).all()
+        herhalingen = 1 if aantal > 10000 else args.herhalingen
+        print(f"{aantal:>7} taken: per rij {meet(lambda: masker_per_rij(taken, referentiedatum), herhalingen):9.2f} ms   "
+              f"gevectoriseerd {meet(lambda: beschikbaar_masker(taken, referentiedatum), args.herhalingen):7.2f} ms   "
+              f"met cachekolom {meet(lambda: beschikbaar_masker(gecachet, referentiedatum), args.herhalingen):6.2f} ms")
+
+
+def toewijzing_iterrows(df, personen_volgorde):
+    # Oude aanpak: per persoon over alle rijen lopen en de combinatie lineair opzoeken
+    planning = {persoon: [] for persoon in personen_volgorde}
+    reeds_toegewezen = set()
+    for persoon in personen_volgorde:
+        huidige_taken = []
+        huidige_efforts = []
+        for _, taak in df.iterrows():
+            if taak['Taak'] in reeds_toegewezen:
+                continue
+            if len(huidige_taken) >= 3:
+                break
+            kandidaat_efforts = sorted(huidige_efforts + [taak['Effort']])
+            toegelaten = kandidaat_efforts in [
+                ["Laag"], ["Laag", "Laag"], ["Laag", "Hoog"], ["Laag", "Gemiddeld"],
+                ["Gemiddeld", "Gemiddeld"], ["Laag", "Laag", "Laag"],
+                ["Laag", "Laag", "Hoog"], ["Gemiddeld", "Gemiddeld", "Laag"]
+            ]
+            if toegelaten:
+                planning[persoon].append(taak)
+                huidige_taken.append(taak)
+                huidige_efforts.append(taak['Effort'])
+                reeds_toegewezen.add(taak['Taak'])
+    return planning
+
+
+def geschud(df, personen, seed):
+    volgorde = personen.copy()
+    random.Random(seed).shuffle(volgorde)
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True), volgorde
+
+
+def bench_toewijzing(args):
+    personen = ["cedric", "lise"]
+    for aantal in args.taken:
+        taken = synthetische_data(taken=aantal)['taken']
+
+        df, volgorde = geschud(taken, personen, 0)
+        eigenaars = taak_eigenaars(df, personen)
+        herhalingen = 1 if aantal > 10000 else args.herhalingen
+        print(f"{aantal:>7} taken: iterrows {meet(lambda: toewijzing_iterrows(df, volgorde), herhalingen):9.2f} ms   "
+              f"buckets {meet(lambda: wijs_taken_toe(df, volgorde, eigenaars), args.herhalingen):7.2f} ms")
+
+
+def dag_per_dag(start, aantal_dagen, data, taak_planning_week):
+    # Oude aanpak: per dag reseeden en alle kolommen opnieuw naar lijsten omzetten
+    dagen = []
+    for i in range(aantal_dagen):
+        dag = start + timedelta(days=i)
+        random.seed(dag.toordinal())
+        act_lijst_cedric = data['act_cedric']['Activiteiten'].tolist()
+        act_lijst_lise = data['act_lise']['Activiteiten'].tolist()
+        act_lijst_kids = data['act_kids']['Activiteiten'].tolist()
+        eten_lijst = data['eten'].iloc[:, 0].tolist()
+        planning = {"datum": dag.strftime('%A %d %B %Y'), "dag_kort": dag.strftime('%a %d/%m'),
+                    "eten": random.choice(eten_lijst)}
+        planning.update(taken_per_dag(dag, taak_planning_week))
+        planning.update({
+            "cedric": random.choice(act_lijst_cedric), "lise": random.choice(act_lijst_lise),
+            "kids": random.choice(act_lijst_kids), "all": random.choice(act_lijst_cedric),
+        })
+        dagen.append(planning)
+    return dagen
+
+
+def bench_horizon(args):
+    data = synthetische_data(taken=args.taken, gerechten=args.gerechten, activiteiten=args.gerechten)
+    personen = ["cedric", "lise"]
+    start = date(2024, 9, 2)
+    for aantal in args.dagen:
+        # De oude aanpak verdeelt de taken maar één keer; de horizon doet dat per week
+        taak_planning = wijs_taken_toe(data['taken'], personen)
+        per_dag = meet(lambda: dag_per_dag(start, aantal, data, taak_planning), args.herhalingen)
+        horizon = meet(lambda: plan_horizon(start, aantal, PlanningOpties(data), data['taken'], personen),
+                       args.herhalingen)
+        print(f"{aantal:>5} dagen: per dag {per_dag:9.2f} ms   horizon {horizon:8.2f} ms (incl. takenverdeling per week)")
+
+
+def rooster_per_dag(data, week):
+    # Oude aanpak: per dag elke kolom naar een lijst omzetten en lineair .index() zoeken
+    for dag in week:
+        eten_opties = data['eten'].iloc[:, 0].tolist()
+        eten_opties.insert(0, NIEUW_GERECHT)
+        if dag['eten'] not in eten_opties:
+            eten_opties.insert(0, dag['eten'])
+        eten_opties.index(dag['eten'])
+        for veld, key in [('cedric', 'act_cedric'), ('lise', 'act_lise'), ('kids', 'act_kids'), ('all', 'act_cedric')]:
+            data[key]['Activiteiten'].tolist()
+            data[key]['Activiteiten'].tolist().index(dag[veld])
+
+
+def rooster_weergave(cache, data, versies, week):
+    weergave = week_weergave(cache, data, versies)
+    for dag in week:
+        weergave.eten.met_waarde(dag['eten'])
+        for veld in ('cedric', 'lise', 'kids', 'all'):
+            weergave.activiteiten[veld].met_waarde(dag[veld])
+
+
+def bench_weergave(args):
+    for aantal in args.opties:
+        data = synthetische_data(gerechten=aantal, activiteiten=aantal)
+        versies = {key: hash(key) for key in data}
+        # Waarden achteraan de lijst: het slechtste geval voor een lineaire .index()
+        week = [{'eten': f"Gerecht {aantal - 1 - i}", 'cedric': f"Activiteit C {aantal - 1}",
+                 'lise': f"Activiteit L {aantal - 1}", 'kids': f"Activiteit K {aantal - 1}",
+                 'all': f"Activiteit C {aantal - 2}"} for i in range(7)]
+        cache = LRUCache(8)
+        print(f"{aantal:>7} opties: per dag {meet(lambda: rooster_per_dag(data, week), args.herhalingen):8.2f} ms   "
+              f"view-model {meet(lambda: rooster_weergave(cache, data, versies, week), args.herhalingen):6.3f} ms")
+
+
+def zoek_per_toets(opties, zoekterm):
+    # Oude aanpak: bij elke toetsaanslag alle opties lower()-en en filteren
+    return [opt for opt in opties if zoekterm.lower() in str(opt).lower()]
+
+
+def bench_zoeken(args):
+    # Een gebruiker die de zoekterm letter per letter typt: elke prefix is een rerun, in elk van de zeven dagkolommen
+    toetsen = [args.term[:n] for n in range(1, len(args.term) + 1)] * 7
+    for aantal in args.gerechten:
+        opties = synthetische_data(gerechten=aantal)['eten'].iloc[:, 0].tolist()
+        opbouw = meet(lambda: ZoekIndex(opties), args.herhalingen)
+        index = ZoekIndex(opties)
+        oud = meet(lambda: [zoek_per_toets(opties, term) for term in toetsen], args.herhalingen)
+
+        def koud():
+            # Zonder onthouden resultaten: elke toets is een echte zoekopdracht
+            for term in toetsen:
+                index.leeg()
+                index.zoek(term)
+
+        nieuw = meet(koud, args.herhalingen)
+        warm = meet(lambda: [index.zoek(term) for term in toetsen], args.herhalingen)
+        print(f"{aantal:>7} gerechten: per toets {oud:8.2f} ms   index koud {nieuw:8.2f} ms, "
+              f"onthouden {warm:6.3f} ms (opbouw {opbouw:.1f} ms, één keer per versie)")
+
+
+def bench_taken(args):
+    for aantal in args.taken:
+        client = maak_gezinsplanning(taken=aantal)
+        register = SheetRegister(client, "Gezinsplanning")
+        cache = TabbladCache(lambda tabbladen: register.voer_uit(lambda sp: laad_tabbladen(sp, tabbladen)),
+                             verwerkers={'taken': met_volgende_datum})
+        with tempfile.TemporaryDirectory() as map_:
+            store = TakenStore(cache, SchrijfWachtrij(register, os.path.join(map_, "wachtrij.json")))
+            df = store.dataframe()
+            namen = [f"Taak {i}" for i in range(aantal - 1, aantal - 101, -1)]
+            masker = meet(lambda: [df[df['Taak'] == naam].index[0] for naam in namen], args.herhalingen)
+            index = meet(lambda: [store.positie(naam) for naam in namen], args.herhalingen)
+            assert [store.positie(naam) for naam in namen] == [df[df['Taak'] == naam].index[0] for naam in namen]
+            print(f"{aantal:>7} taken, 100 opzoekingen: masker {masker:8.2f} ms   store {index:6.3f} ms")
+
+
+def herhalingen_binnen(waarden, venster):
+    """Aantal dagen waarop dezelfde waarde al binnen `venster` dagen voorkwam"""
+    laatst, aantal = {}, 0
+    for dag, waarde in enumerate(waarden):
+        if waarde in laatst and dag - laatst[waarde] < venster:
+            aantal += 1
+        laatst[waarde] = dag
+    return aantal
+
+
+def bench_optimalisatie(args):
+    start = date(2024, 9, 2)
+    for aantal in args.taken:
+        data = synthetische_data(taken=aantal, gerechten=args.gerechten, activiteiten=args.gerechten)
+        versies = {key: 0 for key in data}
+        for naam in ("willekeurig", "optimaal"):
+            with tempfile.TemporaryDirectory() as map_:
+                db = PlanningDB(os.path.join(map_, "db.sqlite"))
+                planner = Planner(LRUCache(maxsize=1024))
+                dagen, tijden = [], []
+                for week in range(args.weken):
+                    week_start = start + timedelta(days=7 * week)
+                    begin = time.perf_counter()
+                    if naam == "optimaal":
+                        planning, _ = optimaliseer_week(planner, data, versies, db, week_start, PERSONEN)
+                    else:
+                        planning, _ = planner.week(data, versies, db, week_start, PERSONEN)
+                    tijden.append((time.perf_counter() - begin) * 1000)
+                    dagen.extend(planning)
+            herhaald = herhalingen_binnen([dag['eten'] for dag in dagen], VENSTERS['eten'])
+            ingepland = sum(bool(dag[f"taak_{persoon}"]) for dag in dagen for persoon in PERSONEN)
+            print(f"{aantal:>7} taken, {naam:<11}: {max(tijden):7.2f} ms/week (max)   "
+                  f"eten herhaald binnen {VENSTERS['eten']} dagen: {herhaald:3d}   taken ingepland: {ingepland}")
+
+
+PERSONEN = ["cedric", "lise"]
+
+
+def git_commit():
+    """Korte hash van HEAD, met '-dirty' als er niet-gecommitte wijzigingen zijn; None buiten git"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if status else "")
+
+
+def maak_omgeving(client, map_):
+    # Dezelfde Omgeving als main.py, maar zonder achtergrondthreads en met bestanden in `map_`
+    omgeving = Omgeving(client, OLIEBOOM.in_map(map_))
+    omgeving.db = omgeving.nieuwe_db()
+    return omgeving
+
+
+def scripted_rerun(omgeving, start, teller=0):
+    """Eén rerun van main.py zonder widgets: laden, plannen, opslaan, archiveren en keuzelijsten"""
+    data = dict(omgeving.cache.haal_op())
+    versies = omgeving.cache.versies()
+    planning, _ = omgeving.planner.week(data, versies, omgeving.db, start, omgeving.huishouden.personen, teller)
+    omgeving.db.opslaan()
+    omgeving.archief.registreer({(start + timedelta(days=i)).strftime("%Y-%m-%d"): dag
+                                 for i, dag in enumerate(planning)})
+    omgeving.archief.sync(omgeving.wachtrij)
+    velden = omgeving.huishouden.activiteit_velden
+    weergave = week_weergave(omgeving.planner.cache, data, versies, velden)
+    for dag in planning:
+        weergave.eten.met_waarde(dag['eten'])
+        for veld in velden:
+            weergave.activiteiten[veld].met_waarde(dag[veld])
+    return planning
+
+
+def meet_schaal(aantal, args):
+    """{meting: ms} voor één schaal (aantal taken = aantal gerechten)"""
+    client = maak_gezinsplanning(taken=aantal, gerechten=aantal, activiteiten=min(aantal, 1000),
+                                 latentie=args.latentie)
+    start = date(2025, 1, 6)
+    data = laad_tabbladen(client.open("Gezinsplanning"))
+    taken_df = met_volgende_datum(data['taken'])
+    week = verdeel_taken_per_persoon_with_shuffle(taken_df, start, PERSONEN, shuffle_seed=1)
+    resultaten = {}
+
+    def cache_koud():
+        register = SheetRegister(client, "Gezinsplanning")
+        return TabbladCache(lambda t: register.voer_uit(lambda sp: laad_tabbladen(sp, t)),
+                            verwerkers={'taken': met_volgende_datum}).haal_op()
+
+    resultaten['load_all_sheets'] = meet(cache_koud, args.herhalingen)
+    resultaten['verdeel_taken'] = meet(
+        lambda: verdeel_taken_per_persoon_with_shuffle(taken_df, start, PERSONEN, shuffle_seed=1), args.herhalingen)
+    resultaten['generate_7_dagen'] = meet(
+        lambda: [generate_daily_planning_with_randomness(start + timedelta(days=i), data, week, seed_offset=1)
+                 for i in range(7)], args.herhalingen)
+
+    with tempfile.TemporaryDirectory() as map_:
+        db = PlanningDB(os.path.join(map_, "db.sqlite"))
+        for i in range(365):
+            db[f"2024-{i:03d}"] = voorbeeld_dag(i)
+        db.opslaan()
+
+        def save_db():
+            for i in range(7):
+                db[f"2024-{i:03d}"]["eten"] = f"Gerecht {random.randrange(aantal)}"
+                db.markeer(f"2024-{i:03d}")
+            db.opslaan()
+
+        resultaten['save_db'] = meet(save_db, args.herhalingen)
+
+    tellers = iter(range(1, 10 ** 6))
+
+    def rerun_koud():
+        with tempfile.TemporaryDirectory() as map_:
+            scripted_rerun(maak_omgeving(client, map_), start)
+
+    resultaten['rerun_koud'] = meet(rerun_koud, args.herhalingen)
+    with tempfile.TemporaryDirectory() as map_:
+        omgeving = maak_omgeving(client, map_)
+        scripted_rerun(omgeving, start)
+        resultaten['rerun_warm'] = meet(lambda: scripted_rerun(omgeving, start), args.herhalingen)
+        # Warme caches, maar een week die nog niet in de db staat
+        resultaten['rerun_nieuwe_week'] = meet(
+            lambda: scripted_rerun(omgeving, start + timedelta(weeks=next(tellers))), args.herhalingen)
+    return resultaten
+
+
+def vorige_resultaten(pad, commit):
+    """{schaal: resultaten} van de recentste run van een andere commit"""
+    if not os.path.exists(pad):
+        return {}
+    vorige = {}
+    with open(pad) as f:
+        for lijn in f:
+            record = json.loads(lijn)
+            if record.get('commit') != commit:
+                vorige[record['schaal']] = record
+    return vorige
+
+
+def bench_suite(args):
+    commit = git_commit()
+    vorige = vorige_resultaten(args.uitvoer, commit)
+    for aantal in args.schalen:
+        resultaten = meet_schaal(aantal, args)
+        record = {'commit': commit, 'tijdstip': datetime.now().isoformat(timespec='seconds'), 'schaal': aantal,
+                  'latentie': args.latentie, 'herhalingen': args.herhalingen,
+                  'resultaten_ms': {naam: round(ms, 3) for naam, ms in resultaten.items()}}
+        with open(args.uitvoer, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+        print(f"{aantal:>7} taken/gerechten (commit {commit}):")
+        oud = vorige.get(aantal, {})
+        for naam, ms in resultaten.items():
+            regel = f"    {naam:<18} {ms:10.2f} ms"
+            if naam in oud.get('resultaten_ms', {}) and oud['resultaten_ms'][naam]:
+                regel += f"   ({(ms / oud['resultaten_ms'][naam] - 1) * 100:+6.1f}% t.o.v. {oud['commit']})"
+            print(regel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="benchmark", required=True)
+
+    suite = sub.add_parser("suite", help="alle fasen van een rerun per schaal, bijgehouden per commit")
+    suite.add_argument("--schalen", type=int, nargs="+", default=[10, 1000, 10000, 100000])
+    suite.add_argument("--latentie", type=float, default=0.0)
+    suite.add_argument("--herhalingen", type=int, default=3)
+    suite.add_argument("--uitvoer", default="benchmark_resultaten.jsonl")
+    suite.set_defaults(functie=bench_suite)
+
+    laden = sub.add_parser("laden", help="load_all_sheets: sequentieel vs batch")
+    laden.add_argument("--latentie", type=float, default=0.05, help="gesimuleerde latentie per request (s)")
+    laden.add_argument("--herhalingen", type=int, default=5)
+    laden.set_defaults(functie=bench_laden)
+
+    snapshot = sub.add_parser("snapshot", help="opstart: tabbladen van het netwerk vs lokale snapshot")
+    snapshot.add_argument("--latentie", type=float, default=0.3)
+    snapshot.add_argument("--taken", type=int, default=1000)
+    snapshot.add_argument("--herhalingen", type=int, default=3)
+    snapshot.set_defaults(functie=bench_snapshot)
+
+    wachtrij = sub.add_parser("wachtrij", help="schrijfacties: direct vs write-behind wachtrij")
+    wachtrij.add_argument("--latentie", type=float, default=0.05)
+    wachtrij.add_argument("--klikken", type=int, default=20)
+    wachtrij.add_argument("--fouten", type=int, default=1, help="aantal gesimuleerde 429-antwoorden")
+    wachtrij.set_defaults(functie=bench_wachtrij)
+
+    opslag = sub.add_parser("opslag", help="save_db: volledige JSON-rewrite vs enkel gewijzigde dagen")
+    opslag.add_argument("--dagen", type=int, nargs="+", default=[100, 1000, 10000])
+    opslag.add_argument("--herhalingen", type=int, default=5)
+    opslag.set_defaults(functie=bench_opslag)
+
+    geschiktheid = sub.add_parser("geschiktheid", help="welke taken mogen gepland worden: apply vs masker")
+    geschiktheid.add_argument("--taken", type=int, nargs="+", default=[1000, 10000, 100000])
+    geschiktheid.add_argument("--herhalingen", type=int, default=5)
+    geschiktheid.set_defaults(functie=bench_geschiktheid)
+
+    toewijzing = sub.add_parser("toewijzing", help="takenverdeling: iterrows vs buckets (seed-equivalentie: test_planning.py)")
+    toewijzing.add_argument("--taken", type=int, nargs="+", default=[100, 1000, 10000])
+    toewijzing.add_argument("--herhalingen", type=int, default=5)
+    toewijzing.set_defaults(functie=bench_toewijzing)
+
+    horizon = sub.add_parser("horizon", help="meerdere weken plannen: per dag vs plan_horizon")
+    horizon.add_argument("--dagen", type=int, nargs="+", default=[7, 91, 365])
+    horizon.add_argument("--taken", type=int, default=200)
+    horizon.add_argument("--gerechten", type=int, default=5000)
+    horizon.add_argument("--herhalingen", type=int, default=3)
+    horizon.set_defaults(functie=bench_horizon)
+
+    weergave = sub.add_parser("weergave", help="keuzelijsten van het weekrooster: per dag vs view-model")
+    weergave.add_argument("--opties", type=int, nargs="+", default=[100, 1000, 10000])
+    weergave.add_argument("--herhalingen", type=int, default=5)
+    weergave.set_defaults(functie=bench_weergave)
+
+    zoeken = sub.add_parser("zoeken", help="gerecht zoeken: lower() per toets vs zoekindex")
+    zoeken.add_argument("--gerechten", type=int, nargs="+", default=[1000, 20000])
+    zoeken.add_argument("--term", default="gerecht 12")
+    zoeken.add_argument("--herhalingen", type=int, default=3)
+    zoeken.set_defaults(functie=bench_zoeken)
+
+    taken = sub.add_parser("taken", help="taak op naam opzoeken: boolean masker vs TakenStore")
+    taken.add_argument("--taken", type=int, nargs="+", default=[1000, 10000, 100000])
+    taken.add_argument("--herhalingen", type=int, default=3)
+    taken.set_defaults(functie=bench_taken)
+
+    optimalisatie = sub.add_parser("optimalisatie", help="weekplanning: willekeurig vs geoptimaliseerd")
+    optimalisatie.add_argument("--taken", type=int, nargs="+", default=[20, 1000, 100000])
+    optimalisatie.add_argument("--gerechten", type=int, default=30)
+    optimalisatie.add_argument("--weken", type=int, default=8)
+    optimalisatie.set_defaults(functie=bench_optimalisatie)
+
+    args = parser.parse_args()
+    args.functie(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Gedeelde SQLite-verbinding voor de dagplanningen, de snapshot en het archief."""
+import sqlite3
+from contextlib import contextmanager
+
+
+@contextmanager
+def verbind(pad, timeout=10):
+    """Eén verbinding per operatie: commit (of rollback bij een fout) en sluit ze daarna altijd.
+
+    Streamlit voert reruns uit op wisselende threads en de achtergrondthreads
+    lezen tegelijk; een sqlite3-verbinding delen tussen threads mag niet.
+    """
+    conn = sqlite3.connect(pad, timeout=timeout)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:  # enkel commit of rollback; sluiten doet de finally
+            yield conn
+    finally:
+        conn.close()
@@ -0,0 +1,223 @@
+"""In-memory nabootsing van de gspread Client/Spreadsheet/Worksheet API.
+
+Elke methode die in het echt een netwerkrequest doet, wacht `latentie`
+seconden en wordt geteld in `FakeClient.aanroepen`, zodat benchmarks
+kunnen meten hoeveel round trips een aanpak kost zonder netwerktoegang.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from gspread.exceptions import APIError, GSpreadException, SpreadsheetNotFound, WorksheetNotFound
+from gspread.utils import fill_gaps, numericise_all
+
+
+class FakeResponse:
+    """Net genoeg van requests.Response om een gspread APIError te bouwen"""
+
+    def __init__(self, code, bericht):
+        self.status_code = code
+        self.text = bericht
+        self._fout = {'code': code, 'message': bericht, 'status': 'FAKE'}
+
+    def json(self):
+        return {'error': self._fout}
+
+
+class FakeCell:
+    def __init__(self, row, col, value):
+        self.row = row
+        self.col = col
+        self.value = value
+
+
+class FakeClient:
+    def __init__(self, spreadsheets=None, latentie=0.0):
+        # spreadsheets: {naam: {tabblad: [[koppen], [rij], ...]}}
+        self.latentie = latentie
+        self.aanroepen = Counter()
+        self._fouten = []  # foutcodes die de volgende requests opleveren
+        self._lock = threading.Lock()
+        self._spreadsheets = {
+            naam: FakeSpreadsheet(self, naam, tabbladen)
+            for naam, tabbladen in (spreadsheets or {}).items()
+        }
+
+    def _request(self, operatie):
+        with self._lock:
+            self.aanroepen[operatie] += 1
+            fout = self._fouten.pop(0) if self._fouten else None
+        if self.latentie:
+            time.sleep(self.latentie)
+        if fout:
+            raise APIError(FakeResponse(fout, f"Gesimuleerde fout {fout}"))
+
+    def faal_volgende(self, aantal=1, code=429):
+        """Laat de volgende `aantal` requests mislukken met de gegeven foutcode"""
+        with self._lock:
+            self._fouten.extend([code] * aantal)
+
+    @property
+    def totaal_aanroepen(self):
+        return sum(self.aanroepen.values())
+
+    def open(self, naam):
+        self._request('open')
+        if naam not in self._spreadsheets:
+            raise SpreadsheetNotFound(naam)
+        return self._spreadsheets[naam]
+
+
+class FakeSpreadsheet:
+    def __init__(self, client, titel, tabbladen):
+        self.client = client
+        self.title = titel
+        self.revisie = 0  # elke mutatie verhoogt de revisie, zoals modifiedTime in Drive
+        self._worksheets = {
+            naam: FakeWorksheet(self, naam, waarden, index)
+            for index, (naam, waarden) in enumerate(tabbladen.items())
+        }
+
+    def worksheet(self, naam):
+        self.client._request('worksheet')
+        if naam not in self._worksheets:
+            raise WorksheetNotFound(naam)
+        return self._worksheets[naam]
+
+    def worksheets(self):
+        self.client._request('worksheets')
+        return list(self._worksheets.values())
+
+    def get_lastUpdateTime(self):
+        self.client._request('get_lastUpdateTime')
+        tijd = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=self.revisie)
+        return tijd.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    def values_batch_get(self, ranges, params=None):
+        self.client._request('values_batch_get')
+        value_ranges = []
+        for bereik in ranges:
+            naam = bereik.split('!')[0].strip("'")
+            if naam not in self._worksheets:
+                raise WorksheetNotFound(naam)
+            waarden = self._worksheets[naam]._waarden
+            value_ranges.append({'range': bereik, 'values': [list(rij) for rij in waarden]})
+        return {'valueRanges': value_ranges}
+
+    def batch_update(self, body):
+        self.client._request('batch_update')
+        self.revisie += 1
+        per_id = {ws.id: ws for ws in self._worksheets.values()}
+        for request in body.get('requests', []):
+            (soort, inhoud), = request.items()
+            if soort == 'addSheet':
+                eigenschappen = inhoud['properties']
+                if eigenschappen['title'] in self._worksheets or eigenschappen['sheetId'] in per_id:
+                    raise APIError(FakeResponse(400, f"Tabblad bestaat al: {eigenschappen['title']}"))
+                ws = FakeWorksheet(self, eigenschappen['title'], [], eigenschappen['sheetId'])
+                self._worksheets[ws.title] = per_id[ws.id] = ws
+            elif soort == 'updateCells':
+                bereik = inhoud['range']
+                ws = per_id[bereik['sheetId']]
+                for r, rij in enumerate(inhoud['rows'], start=bereik['startRowIndex']):
+                    for c, cel in enumerate(rij['values'], start=bereik['startColumnIndex']):
+                        ws._zet(r + 1, c + 1, _waarde(cel))
+            elif soort == 'appendCells':
+                ws = per_id[inhoud['sheetId']]
+                for rij in inhoud['rows']:
+                    ws._waarden.append([_waarde(cel) for cel in rij['values']])
+            elif soort == 'deleteDimension':
+                bereik = inhoud['range']
+                del per_id[bereik['sheetId']]._waarden[bereik['startIndex']:bereik['endIndex']]
+            else:
+                raise ValueError(f"Niet ondersteund in de fake: {soort}")
+        return {'replies': [{} for _ in body.get('requests', [])]}
+
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, titel, waarden, index=0):
+        self.spreadsheet = spreadsheet
+        self.client = spreadsheet.client
+        self.title = titel
+        self.id = index
+        self._waarden = [[str(w) for w in rij] for rij in waarden]
+
+    def get_all_values(self):
+        self.client._request('get_all_values')
+        return [list(rij) for rij in self._waarden]
+
+    def get_all_records(self):
+        self.client._request('get_all_records')
+        if not self._waarden:
+            return []
+        waarden = fill_gaps([list(rij) for rij in self._waarden])
+        koppen = waarden[0]
+        if len(set(koppen)) < len(koppen):
+            raise GSpreadException(f"the header row in the worksheet contains duplicates: {koppen}")
+        return [dict(zip(koppen, numericise_all(rij))) for rij in waarden[1:]]
+
+    def append_row(self, values, **kwargs):
+        self.client._request('append_row')
+        self.spreadsheet.revisie += 1
+        self._waarden.append([str(w) for w in values])
+
+    def update_cell(self, row, col, value):
+        self.client._request('update_cell')
+        self._zet(row, col, value)
+
+    def _zet(self, row, col, value):
+        self.spreadsheet.revisie += 1
+        while len(self._waarden) < row:
+            self._waarden.append([])
+        rij = self._waarden[row - 1]
+        while len(rij) < col:
+            rij.append("")
+        rij[col - 1] = str(value)
+
+    def find(self, query):
+        self.client._request('find')
+        for r, rij in enumerate(self._waarden, start=1):
+            for c, waarde in enumerate(rij, start=1):
+                if waarde == query:
+                    return FakeCell(r, c, waarde)
+        return None
+
+    def delete_rows(self, start_index, end_index=None):
+        self.client._request('delete_rows')
+        self.spreadsheet.revisie += 1
+        end_index = end_index or start_index
+        del self._waarden[start_index - 1:end_index]
+
+
+def _waarde(cel):
+    waarde = cel.get('userEnteredValue', {})
+    return str(next(iter(waarde.values()), ""))
+
+
+def maak_gezinsplanning(taken=20, gerechten=50, activiteiten=20, latentie=0.0):
+    """Bouwt een FakeClient met een synthetische "Gezinsplanning" spreadsheet"""
+    frequenties = ['Wekelijks', 'Maandelijks', '3-maadelijks', 'Half jaarlijks', 'Jaarlijks', 'Eenmalig']
+    efforts = ['Laag', 'Gemiddeld', 'Hoog']
+    personen = ['beiden', 'Lise', 'Cédric']
+    taken_rijen = [["Taak", "Frequentie", "Effort", "Persoon", "Laatst_Uitgevoerd"]]
+    for i in range(taken):
+        laatst = f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}" if i % 3 else ""
+        taken_rijen.append([
+            f"Taak {i}", frequenties[i % len(frequenties)], efforts[i % 7 % 3],
+            personen[i % 5 % 3], laatst,
+        ])
+
+    def kolom(kop, prefix, aantal):
+        return [[kop]] + [[f"{prefix} {i}"] for i in range(aantal)]
+
+    return FakeClient({
+        "Gezinsplanning": {
+            "Eten": kolom("Gerecht", "Gerecht", gerechten),
+            "Taken": taken_rijen,
+            "Activiteiten Cédric": kolom("Activiteiten", "Activiteit C", activiteiten),
+            "Activiteiten Lise": kolom("Activiteiten", "Activiteit L", activiteiten),
+            "Activiteiten kids": kolom("Activiteiten", "Activiteit K", activiteiten),
+            "Weekresultaten": [["Week", "Planning"]],
+        }
+    }, latentie=latentie)
@@ -0,0 +1,145 @@
+"""Configuratie per huishouden: spreadsheet, leden, taakdagen en activiteitenlijsten.
+
+Zonder configuratiebestand is er één huishouden, Olieboom, met exact de
+tabbladen, velden en bestanden van vroeger. Extra huishoudens komen uit
+huishoudens.json en krijgen elk een eigen map voor hun lokale opslag:
+
+    {"huishoudens": [{"id": "peeters", "naam": "Peeters", "spreadsheet": "Planning Peeters",
+      "leden": [{"id": "an", "naam": "An", "taakdagen": [0, 3], "activiteiten": "Activiteiten An"}],
+      "groepsvelden": [{"veld": "all", "naam": "Iedereen", "activiteiten": "Activiteiten gezin"}]}]}
+
+Zodra er meer dan één huishouden is, ziet een bezoeker enkel de huishoudens
+waarvan in die sessie de toegangscode ingegeven werd. De codes staan in de Streamlit secrets,
+niet in huishoudens.json:
+
+    [toegangscodes]
+    olieboom = "..."
+    peeters = "..."
+"""
+import copy
+import hmac
+import json
+import os
+
+from sheets import TABBLADEN
+
+CONFIG_PATH = "huishoudens.json"
+DATA_MAP = "huishoudens"
+
+
+class Lid:
+    def __init__(self, id, naam, taakdagen, activiteiten, icoon="🙂"):
+        self.id = id
+        self.naam = naam
+        self.taakdagen = list(taakdagen)  # weekdagen 0=ma ... 6=zo waarop dit lid taken doet
+        self.activiteiten = activiteiten  # naam van het tabblad met activiteiten
+        self.icoon = icoon
+
+
+class Groepsveld:
+    """Een activiteitenveld dat niet bij één lid hoort, zoals 'kids' of 'all'"""
+
+    def __init__(self, veld, naam, activiteiten, icoon="👨‍👩‍👦‍👦"):
+        self.veld = veld
+        self.naam = naam
+        self.activiteiten = activiteiten
+        self.icoon = icoon
+
+
+class Huishouden:
+    def __init__(self, id, naam, spreadsheet, leden, groepsvelden=(), map=None):
+        self.id = id
+        self.naam = naam
+        self.spreadsheet = spreadsheet
+        self.leden = list(leden)
+        self.groepsvelden = list(groepsvelden)
+        self.map = os.path.join(DATA_MAP, id) if map is None else map
+
+        # Eén data-key per tabblad; velden die hetzelfde tabblad delen, delen ook de key
+        self.tabbladen = {'eten': TABBLADEN['eten'], 'taken': TABBLADEN['taken']}
+        self.activiteit_velden = {}
+        keys_per_tabblad = {}
+        velden = [(lid.id, lid.activiteiten) for lid in self.leden]
+        velden += [(groep.veld, groep.activiteiten) for groep in self.groepsvelden]
+        for veld, tabblad in velden:
+            if tabblad not in keys_per_tabblad:
+                keys_per_tabblad[tabblad] = f"act_{veld}"
+                self.tabbladen[f"act_{veld}"] = tabblad
+            self.activiteit_velden[veld] = keys_per_tabblad[tabblad]
+
+    @property
+    def personen(self):
+        return [lid.id for lid in self.leden]
+
+    @property
+    def namen(self):
+        return {lid.id: lid.naam for lid in self.leden}
+
+    @property
+    def taak_dagen(self):
+        return {lid.id: lid.taakdagen for lid in self.leden}
+
+    @property
+    def labels(self):
+        """{veld: (icoon, naam)} voor de activiteitvelden in de weergave"""
+        labels = {lid.id: (lid.icoon, lid.naam) for lid in self.leden}
+        labels.update({groep.veld: (groep.icoon, groep.naam) for groep in self.groepsvelden})
+        return labels
+
+    def pad(self, bestandsnaam):
+        """Pad van een lokaal bestand van dit huishouden (db, wachtrij, snapshot)"""
+        if self.map:
+            os.makedirs(self.map, exist_ok=True)
+        return os.path.join(self.map, bestandsnaam)
+
+    def in_map(self, map):
+        """Kopie die haar lokale bestanden in `map` bewaart, bv. een tijdelijke map"""
+        kopie = copy.copy(self)
+        kopie.map = map
+        return kopie
+
+    @classmethod
+    def uit_dict(cls, config):
+        return cls(
+            config['id'], config.get('naam', config['id']), config['spreadsheet'],
+            [Lid(**lid) for lid in config['leden']],
+            [Groepsveld(**groep) for groep in config.get('groepsvelden', [])],
+            config.get('map'),
+        )
+
+
+# Het oorspronkelijke huishouden; zijn bestanden blijven in de hoofdmap staan
+OLIEBOOM = Huishouden(
+    'olieboom', "Olieboom", "Gezinsplanning",
+    [
+        Lid('cedric', "Cédric", [1, 3, 5], "Activiteiten Cédric", icoon="👨‍🦱"),  # di, do, za
+        Lid('lise', "Lise", [0, 2, 4], "Activiteiten Lise", icoon="👩‍🦰"),        # ma, wo, vr
+    ],
+    [
+        Groepsveld('kids', "Kids", "Activiteiten kids", icoon="👦"),
+        Groepsveld('all', "Iedereen", "Activiteiten Cédric"),
+    ],
+    map="",
+)
+
+
+def laad_huishoudens(pad=CONFIG_PATH):
+    """{id: Huishouden} uit het configuratiebestand, of enkel Olieboom als het niet bestaat"""
+    if not os.path.exists(pad):
+        return {OLIEBOOM.id: OLIEBOOM}
+    with open(pad, "r") as f:
+        config = json.load(f)
+    huishoudens = [Huishouden.uit_dict(item) for item in config.get('huishoudens', [])]
+    return {huishouden.id: huishouden for huishouden in huishoudens} or {OLIEBOOM.id: OLIEBOOM}
+
+
+def ontgrendel(codes, code):
+    """Ids van de huishoudens waarvoor `code` de toegangscode is ({id: code} uit de secrets)"""
+    return {id for id, geheim in codes.items() if hmac.compare_digest(str(geheim).encode(), code.encode())}
+
+
+def toegankelijk(huishoudens, ontgrendeld):
+    """De huishoudens die een bezoeker mag openen: alle als er maar één is, anders enkel de ontgrendelde"""
+    if len(huishoudens) == 1:
+        return dict(huishoudens)
+    return {id: huishouden for id, huishouden in huishoudens.items() if id in ontgrendeld}
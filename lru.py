@@ -0,0 +1,39 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Begrensde, thread-safe cache die het minst recent gebruikte item eerst vergeet"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.verwijderd = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def haal_of_bereken(self, key, bereken):
+        """Geeft de waarde voor `key`, en roept `bereken()` enkel op bij een miss"""
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+        # Buiten de lock berekenen; in het slechtste geval rekenen twee threads hetzelfde uit
+        waarde = bereken()
+        with self._lock:
+            self._items[key] = waarde
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.verwijderd += 1
+        return waarde
+
+    def leeg(self):
+        with self._lock:
+            self._items.clear()
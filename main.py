@@ -3,14 +3,31 @@ import gspread
 import pandas as pd
 from datetime import datetime, timedelta
 from oauth2client.service_account import ServiceAccountCredentials
-import json
-import os
-import random
+
+from huishoudens import laad_huishoudens, ontgrendel, toegankelijk
+from metrics import FASEN, Metrics
+from omgeving import Omgeving
+from optimalisatie import optimaliseer_week
+from planning import IEDEREEN
+from sheets import TokenEmmer
+from weergave import NIEUW_GERECHT, week_weergave
 
 # Instellingen
 st.set_page_config(layout="wide")
 
-DB_PATH = "weekplanning_db.json"
+SHEETS_TEMPO = 1.0  # requests per seconde over alle huishoudens samen (quotum: 60/min per gebruiker)
+SHEETS_PIEK = 10
+VEROUDERD_NA = 15 * 60  # vanaf hier tonen we een waarschuwing
+METRICS_PATH = "metrics.jsonl"
+
+@st.cache_resource
+def get_huishoudens():
+    return laad_huishoudens()
+
+@st.cache_resource
+def get_metrics():
+    # Gedeeld over sessies: de API-tellers horen bij de ene gedeelde client
+    return Metrics(METRICS_PATH)
 
 # Google Sheets toegang
 @st.cache_resource
@@ -27,216 +44,196 @@ def get_gsheet_client():
     
     service_account_info = to_dict(st.secrets["gcp_service_account"])
     creds = ServiceAccountCredentials.from_json_keyfile_dict(service_account_info, scopes=scope)
-    return gspread.authorize(creds)
+    # Eén client (en dus één connection pool) voor alle huishoudens, samen begrensd
+    client = gspread.authorize(creds)
+    return TokenEmmer(SHEETS_TEMPO, SHEETS_PIEK).begrens(get_metrics().api.instrumenteer(client))
+
+@st.cache_resource
+def get_omgeving(huishouden_id):
+    # Register, wachtrij, snapshot, caches, archief en planner: één keer per
+    # huishouden, gedeeld door de sessies van dat huishouden
+    return Omgeving(get_gsheet_client(), get_huishoudens()[huishouden_id]).start()
 
-@st.cache_data(ttl=300)
 def load_all_sheets():
     try:
-        client = get_gsheet_client()
-        spreadsheet = client.open("Gezinsplanning")
-        sheets = {
-            'eten': spreadsheet.worksheet("Eten"),
-            'taken': spreadsheet.worksheet("Taken"), 
-            'act_cedric': spreadsheet.worksheet("Activiteiten Cédric"),
-            'act_lise': spreadsheet.worksheet("Activiteiten Lise"),
-            'act_kids': spreadsheet.worksheet("Activiteiten kids")
-        }
-        data = {}
-        for key, sheet in sheets.items():
-            df = pd.DataFrame(sheet.get_all_records())
-            data[key] = df
-        return data
+        # Nieuwe dict, zodat herbinden van data['...'] de cache niet raakt
+        return dict(get_omgeving(huishouden.id).cache.haal_op())
     except Exception as e:
         st.error(f"❌ Fout bij laden van Google Sheets: {e}")
         return None
 
-def taak_bestaat_al(nieuwe_taak, taken_df):
-    return nieuwe_taak in taken_df['Taak'].values
+def taak_bestaat_al(nieuwe_taak):
+    return get_omgeving(huishouden.id).taken.bestaat(nieuwe_taak)
 
 def add_to_taken_sheet(nieuwe_taak, frequency, effort, person):
     try:
-        client = get_gsheet_client()
-        sheet = client.open("Gezinsplanning").worksheet("Taken")
-        sheet.append_row([nieuwe_taak, frequency, effort, person])
+        get_omgeving(huishouden.id).taken.voeg_toe([nieuwe_taak, frequency, effort, person])
         st.success(f"✅ '{nieuwe_taak}' toegevoegd aan Taken")
-        st.cache_data.clear()
     except Exception as e:
         st.warning(f"⚠️ Fout bij toevoegen aan Taken: {e}")
 
-def verwijder_taak(sheet, taak_naam):
-    cell = sheet.find(taak_naam)
-    if cell:
-        sheet.delete_rows(cell.row)
+def vink_taak_af(key, taak_naam):
+    """on_change van een taakvakje: eenmalige taak verwijderen of Laatst_Uitgevoerd op vandaag zetten.
+
+    Loopt enkel op het moment van aanvinken, dus één schrijfactie per vinkje,
+    hoe vaak de pagina of kolom daarna ook herladen wordt.
+    """
+    st.session_state.pop(f"{key}_melding", None)
+    if not st.session_state.get(key):
+        return
+    resultaat = get_omgeving(huishouden.id).taken.vink_af(taak_naam)
+    if resultaat == 'verwijderd':
+        st.session_state[f"{key}_melding"] = f"🗑️ '{taak_naam}' verwijderd (eenmalige taak)"
+    elif resultaat == 'uitgevoerd':
+        st.session_state[f"{key}_melding"] = f"✅ '{taak_naam}' gemarkeerd als uitgevoerd op {datetime.today().date()}"
 
 def load_db():
-    if os.path.exists(DB_PATH):
-        with open(DB_PATH, "r") as f:
-            return json.load(f)
-    return {}
+    # Eigen SQLite-bestand per huishouden; SQLite regelt de locking tussen sessies
+    return get_omgeving(huishouden.id).nieuwe_db()
 
 def save_db(data):
-    with open(DB_PATH, "w") as f:
-        json.dump(data, f, indent=2)
+    # Schrijft enkel de gewijzigde dagen weg
+    data.opslaan()
 
-def save_planning_to_gsheet(week_key, planning):
+def save_planning_to_gsheet(planningen):
+    """Archiveert {dag_key: planning}: enkel gewijzigde velden gaan, gebundeld, naar het archieftabblad"""
     try:
-        client = get_gsheet_client()
-        sheet = client.open("Gezinsplanning").worksheet("Weekresultaten")
-        sheet.append_row([week_key, json.dumps(planning)])
+        archief = get_omgeving(huishouden.id).archief
+        archief.registreer(planningen)
+        archief.sync(get_omgeving(huishouden.id).wachtrij)
     except Exception as e:
         st.warning(f"⚠️ Kon niet opslaan naar Google Sheets: {e}")
 
 def add_to_sheet(sheet_name, new_value):
-    client = get_gsheet_client()
-    sheet = client.open("Gezinsplanning").worksheet(sheet_name)
-    sheet.append_row([new_value])
-    st.cache_data.clear()
-
-def generate_daily_planning_with_randomness(dag, data, taak_planning_week, seed_offset=0):
-    """Aangepaste versie met randomness voor variatie in planning"""
-    
-    # Gebruik datum + offset als seed voor consistente maar verschillende resultaten
-    random.seed(dag.toordinal() + seed_offset)
-    
-    act_lijst_cedric = data['act_cedric']['Activiteiten'].tolist()
-    act_lijst_lise = data['act_lise']['Activiteiten'].tolist()
-    act_lijst_kids = data['act_kids']['Activiteiten'].tolist()
-    eten_lijst = data['eten'].iloc[:,0].tolist()
-    
-    taak_cedric, taak_lise = "", ""
+    get_omgeving(huishouden.id).wachtrij.append_row(sheet_name, [new_value])
+    keys = {naam: key for key, naam in huishouden.tabbladen.items()}
+    if sheet_name in keys:
+        get_omgeving(huishouden.id).cache.voeg_rij_toe(keys[sheet_name], [new_value])
 
-    taken_cedric = taak_planning_week.get("cedric", [])
-    taken_lise = taak_planning_week.get("lise", [])
+def save_planning_change(dag_key, field, new_value):
+    """Helper functie om wijzigingen direct op te slaan"""
+    if dag_key in st.session_state.db:
+        st.session_state.db[dag_key][field] = new_value
+        st.session_state.db.markeer(dag_key)
+        save_db(st.session_state.db)
+        save_planning_to_gsheet({dag_key: st.session_state.db[dag_key]})
 
-    dagnummer = dag.weekday()  # 0=ma, ..., 6=zo
-    cedric_dagen = [1, 3, 5]  # di, do, za
-    lise_dagen = [0, 2, 4]    # ma, wo, vr
+def leg_horizon_vast():
+    """on_click van "Vastleggen": de nieuwe dagen van de vooruitplanning bewaren"""
+    nieuw = get_omgeving(huishouden.id).planner.leg_vast(st.session_state.db, st.session_state.pop("horizon"))
+    save_db(st.session_state.db)
+    save_planning_to_gsheet(nieuw)
+    st.session_state.horizon_melding = f"📌 {len(nieuw)} nieuwe dagen vastgelegd in het weekrooster"
 
-    if dagnummer in cedric_dagen:
-        index = cedric_dagen.index(dagnummer)
-        if index < len(taken_cedric):
-            taak_cedric = taken_cedric[index]['Taak']
+def kolom_widgets(i):
+    """Keys van de widgets in dagkolom i"""
+    velden = ['eten', 'zoek_eten', 'nieuw_eten'] + list(huishouden.labels)
+    taken = [f"taak_{persoon}_chk_{i}" for persoon in huishouden.personen]
+    return [f"{veld}_{i}" for veld in velden] + taken + [f"{key}_melding" for key in taken]
 
-    if dagnummer in lise_dagen:
-        index = lise_dagen.index(dagnummer)
-        if index < len(taken_lise):
-            taak_lise = taken_lise[index]['Taak']
+def hergenereer_dag(i, dag, start_dag):
+    """Plant één dag opnieuw met een nieuwe teller en herlaadt enkel die kolom"""
+    dag_key = dag.strftime("%Y-%m-%d")
+    st.session_state.planning_counter = getattr(st.session_state, 'planning_counter', 0) + 1
+    teller = st.session_state.planning_counter
+
+    # Zelfde resultaat als de dag wissen en de hele pagina herladen
+    data = load_all_sheets()
+    versies = get_omgeving(huishouden.id).cache.versies()
+    planner = get_omgeving(huishouden.id).planner
+    if st.session_state.get("optimaliseren"):
+        # De andere dagen van de week blijven staan en tellen mee voor de herhalingen
+        del st.session_state.db[dag_key]
+        optimaliseer_week(planner, data, versies, st.session_state.db, start_dag, huishouden.personen, teller)
+    else:
+        taak_planning_week = planner.week_taken(data['taken'], versies['taken'], start_dag, huishouden.personen, teller)
+        st.session_state.db[dag_key] = planner.dag(dag, data, versies, taak_planning_week, teller)
+    save_db(st.session_state.db)
+    save_planning_to_gsheet({dag_key: st.session_state.db[dag_key]})
 
-    return {
-        "datum": dag.strftime('%A %d %B %Y'),
-        "dag_kort": dag.strftime('%a %d/%m'),
-        "eten": random.choice(eten_lijst),  # Random eten ipv gebaseerd op dag
-        "taak_lise": taak_lise,
-        "taak_cedric": taak_cedric,
-        "cedric": random.choice(act_lijst_cedric),  # Random activiteit
-        "lise": random.choice(act_lijst_lise),      # Random activiteit
-        "kids": random.choice(act_lijst_kids),      # Random activiteit
-        "all": random.choice(act_lijst_cedric),     # Random activiteit
-    }
+    # Oude keuzes van de widgets vergeten, anders tonen (en bewaren) ze de vorige planning
+    for key in kolom_widgets(i):
+        st.session_state.pop(key, None)
+    st.rerun(scope="fragment")
 
-def verdeel_taken_per_persoon_with_shuffle(taken_df, referentiedatum, personen, shuffle_seed=None):
-    """Aangepaste versie die taken shuffelt voor meer variatie"""
+@st.fragment
+def dag_kolom(i, dag, start_dag, data, weergave):
+    """Eén dagkolom als fragment: een wijziging herlaadt enkel deze kolom en bewaart enkel deze dag"""
+    dag_key = dag.strftime("%Y-%m-%d")
+    dag_planning = st.session_state.db[dag_key]
+    st.markdown(f"**{dag_planning['dag_kort']}**")
     
-    if shuffle_seed:
-        random.seed(shuffle_seed)
+    # Eten selectie met optie om nieuw gerecht toe te voegen
+    current_eten = dag_planning['eten']
+    eten_opties, eten_index = weergave.eten.met_waarde(current_eten)
     
-    def effort_score(e):
-        return {'Laag': 1, 'Gemiddeld': 2, 'Hoog': 3}[e]
-
-    def mag_nog_niet(tijdseenheid, laatst):
-        if not laatst:
-            return True
-        try:
-            laatst_datum = datetime.strptime(laatst, "%Y-%m-%d")
-        except:
-            return True
-        delta = (referentiedatum - laatst_datum).days
-        return {
-            'Wekelijks': delta >= 7,
-            'Maandelijks': delta >= 30,
-            '3-maadelijks': delta >= 90,
-            'Half jaarlijks': delta >= 182,
-            'Jaarlijks': delta >= 365,
-            'Om de 5 jaar': delta >= 1825
-        }.get(tijdseenheid, True)
-
-    df = taken_df.copy()
-    df = df[df.apply(lambda r: mag_nog_niet(r['Frequentie'], r.get('Laatst_Uitgevoerd')), axis=1)]
-    df['Effort_Score'] = df['Effort'].map(effort_score)
+    zoekterm = st.text_input("🔍 Zoek gerecht:", key=f"zoek_eten_{i}")
+    if zoekterm:
+        # Beste treffers eerst; zonder treffers blijft het huidige gerecht staan
+        gefilterde_opties = weergave.eten_zoek.zoek(zoekterm) or [current_eten]
+        gefilterde_opties = gefilterde_opties + [NIEUW_GERECHT]
+        eten_index = gefilterde_opties.index(current_eten) if current_eten in gefilterde_opties else 0
+    else:
+        gefilterde_opties = eten_opties
     
-    # Shuffle de taken voor meer variatie
-    df = df.sample(frac=1).reset_index(drop=True)
-
-    planning = {persoon: [] for persoon in personen}
-    reeds_toegewezen = set()
-
-    # Shuffle ook de personen volgorde
-    personen_shuffled = personen.copy()
-    random.shuffle(personen_shuffled)
-
-    for persoon in personen_shuffled:
-        huidige_taken = []
-        huidige_efforts = []
-
-        for _, taak in df.iterrows():
-            if taak['Taak'] in reeds_toegewezen:
-                continue
-
-            if len(huidige_taken) >= 3:
-                break
-
-            kandidaat_efforts = sorted(huidige_efforts + [taak['Effort']])
-            toegelaten = kandidaat_efforts in [
-                ["Laag"], ["Laag", "Laag"], ["Laag", "Hoog"], ["Laag", "Gemiddeld"],
-                ["Gemiddeld", "Gemiddeld"], ["Laag", "Laag", "Laag"],
-                ["Laag", "Laag", "Hoog"], ["Gemiddeld", "Gemiddeld", "Laag"]
-            ]
-
-            if toegelaten:
-                planning[persoon].append(taak)
-                huidige_taken.append(taak)
-                huidige_efforts.append(taak['Effort'])
-                reeds_toegewezen.add(taak['Taak'])
+    selected_eten = st.selectbox(
+        "🍽️ Eten",
+        options=gefilterde_opties,
+        index=eten_index,
+        key=f"eten_{i}"
+    )
     
-    return planning
-
-def wis_dag_uit_json_en_cache(dag_key):
-    """Verbeterde functie die ook session state reset"""
-    db = load_db()
+    if selected_eten == NIEUW_GERECHT:
+        nieuw_eten = st.text_input("Nieuw gerecht invullen:", key=f"nieuw_eten_{i}")
+        if st.button("✅ Toevoegen", key=f"toevoegen_eten_{i}") and nieuw_eten:
+            if nieuw_eten not in weergave.eten:
+                add_to_sheet("Eten", nieuw_eten)
+                st.success(f"'{nieuw_eten}' toegevoegd aan gerechten.")
+                data['eten'] = load_all_sheets()['eten']  # rij staat al in de cache
+                save_planning_change(dag_key, 'eten', nieuw_eten)
+                st.rerun()
+            else:
+                st.info("ℹ️ Dit gerecht bestaat al.")
+    elif selected_eten != current_eten:
+        save_planning_change(dag_key, 'eten', selected_eten)
     
-    if dag_key in db:
-        db.pop(dag_key)
+    st.markdown("---")
     
-    save_db(db)
+    # Taken: één afvinkvakje per lid dat vandaag een taak heeft
+    for lid in reversed(huishouden.leden):
+        taak_naam = dag_planning.get(f"taak_{lid.id}", "")
+        if taak_naam:
+            st.markdown(f"🧹 **Taak {lid.naam}:**")
+            key = f"taak_{lid.id}_chk_{i}"
+            st.checkbox(taak_naam, key=key, on_change=vink_taak_af, args=(key, taak_naam))
+            if st.session_state.get(f"{key}_melding"):
+                st.success(st.session_state[f"{key}_melding"])
     
-    # Reset session state
-    st.session_state.db = db
+    if not any(dag_planning.get(f"taak_{persoon}") for persoon in huishouden.personen):
+        st.markdown(f"🧹 **Geen taak vandaag**")
+        st.markdown("")
+        st.markdown("")
     
-    # Clear ook de Google Sheets cache zodat nieuwe data wordt geladen
-    st.cache_data.clear()
+    st.markdown("---")
     
-    # Reset een planning counter voor extra randomness
-    if 'planning_counter' not in st.session_state:
-        st.session_state.planning_counter = 0
-    st.session_state.planning_counter += 1
+    # Activiteiten per lid en voor de groep (kids, iedereen)
+    for veld, (icoon, naam) in huishouden.labels.items():
+        huidig = dag_planning.get(veld, "")
+        veld_opties, veld_index = weergave.activiteiten[veld].met_waarde(huidig)
+        gekozen = st.selectbox(
+            f"{icoon} {naam}", 
+            options=veld_opties, 
+            index=veld_index, 
+            key=f"{veld}_{i}"
+        )
+        if gekozen != huidig:
+            save_planning_change(dag_key, veld, gekozen)
     
-    return dag_key
-
-def save_planning_change(dag_key, field, new_value):
-    """Helper functie om wijzigingen direct op te slaan"""
-    if dag_key in st.session_state.db:
-        st.session_state.db[dag_key][field] = new_value
-        save_db(st.session_state.db)
-
-def hergenereer_dag(dag, data, taak_planning_week):
-    dag_key = dag.strftime("%Y-%m-%d")
-    nieuwe_planning = generate_daily_planning_with_randomness(
-        dag, data, taak_planning_week, seed_offset=random.randint(0, 99999)
-    )
-    st.session_state.db[dag_key] = nieuwe_planning
-    save_db(st.session_state.db)
-    st.success(f"🔄 Dag {dag.strftime('%A %d/%m')} hergegenereerd.")
-    st.rerun()
+    st.markdown("---")
+    
+    if st.button(f"🔄 Nieuwe dagplanning", key=f"regen_{i}"):
+        with st.spinner("Bezig met genereren van nieuwe planning..."):
+            hergenereer_dag(i, dag, start_dag)
 
 # UI
 st.markdown("""
@@ -246,17 +243,84 @@ h1, h2, h3, h4, h5, h6 { font-size: 22px !important; }
 </style>
 """, unsafe_allow_html=True)
 
-st.title("💖Olieboom Weekplanner💖")
-if "db" not in st.session_state:
-    st.session_state.db = load_db()
+def voer_toegangscode_in():
+    """Callback van het codeveld: ontgrendelt de huishoudens van de ingegeven code"""
+    code = st.session_state.toegangscode
+    st.session_state.toegangscode = ""
+    gevonden = ontgrendel(dict(st.secrets.get("toegangscodes", {})), code)
+    st.session_state.ontgrendeld = st.session_state.get("ontgrendeld", set()) | gevonden
+    st.session_state.toegang_melding = None if gevonden else "❌ Onbekende toegangscode"
+
+huishoudens = get_huishoudens()
+if len(huishoudens) > 1:
+    # Elk huishouden enkel met zijn eigen code: de query parameter en de keuzelijst alleen volstaan niet
+    st.sidebar.text_input("🔑 Toegangscode", type="password", key="toegangscode", on_change=voer_toegangscode_in)
+    if st.session_state.get("toegang_melding"):
+        st.sidebar.error(st.session_state.toegang_melding)
+beschikbaar = toegankelijk(huishoudens, st.session_state.get("ontgrendeld", set()))
+if not beschikbaar:
+    st.title("💖Weekplanner💖")
+    st.info("Geef in de zijbalk de toegangscode van je huishouden in.")
+    st.stop()
+
+huishouden_id = st.query_params.get("huishouden", next(iter(beschikbaar)))
+if len(beschikbaar) > 1:
+    huishouden_id = st.sidebar.selectbox(
+        "🏠 Huishouden", list(beschikbaar), format_func=lambda id: beschikbaar[id].naam,
+        index=list(beschikbaar).index(huishouden_id) if huishouden_id in beschikbaar else 0,
+    )
+huishouden = beschikbaar.get(huishouden_id) or next(iter(beschikbaar.values()))
+if len(huishoudens) > 1:
+    st.query_params["huishouden"] = huishouden.id  # deelbare link; opent enkel met de code
 
-data = load_all_sheets()
+st.title(f"💖{huishouden.naam} Weekplanner💖")
+if st.session_state.get("db_huishouden") != huishouden.id:
+    st.session_state.db = load_db()
+    st.session_state.db_huishouden = huishouden.id
+    st.session_state.pop("horizon", None)  # vooruitplanning van het vorige huishouden
+# Andere sessies schrijven naar hetzelfde bestand: ongewijzigde dagen opnieuw lezen
+st.session_state.db.ververs()
+
+meting = get_metrics().start_rerun()
+with meting.fase('load_all_sheets'):
+    data = load_all_sheets()
 db = st.session_state.db
 
+def toon_versheid():
+    """Hoe oud de getoonde gegevens zijn, en of de spreadsheet bereikbaar is"""
+    sync = get_omgeving(huishouden.id).sync
+    leeftijd = sync.leeftijd()
+    if leeftijd is None:
+        return
+    if leeftijd < 90:
+        tekst = "zonet"
+    elif leeftijd < 3600:
+        tekst = f"{leeftijd / 60:.0f} min geleden"
+    else:
+        tekst = f"{leeftijd / 3600:.1f} u geleden"
+    if sync.laatste_fout or leeftijd > VEROUDERD_NA:
+        st.warning(f"📴 Offline: gegevens van {tekst} ({sync.laatste_fout or 'geen recente synchronisatie'})")
+    else:
+        st.caption(f"🔄 Gesynchroniseerd met Google Sheets: {tekst}")
+
+toon_versheid()
+
+wachtrij = get_omgeving(huishouden.id).wachtrij
+if wachtrij.laatste_fout:
+    st.warning(f"⚠️ Wijzigingen nog niet naar Google Sheets geschreven "
+               f"({wachtrij.openstaand} in wachtrij): {wachtrij.laatste_fout}")
+
 if st.checkbox("🔍 Debug informatie tonen"):
     st.write("**Session State Info:**")
     st.write(f"Planning counter: {getattr(st.session_state, 'planning_counter', 0)}")
     st.write(f"Database entries: {len(st.session_state.db)}")
+    register = get_omgeving(huishouden.id).register
+    st.write(f"Sheets handles: {sum(register.geopend.values())} geopend, "
+             f"{sum(register.vermeden.values())} opens vermeden")
+    st.write(f"Schrijfwachtrij: {get_omgeving(huishouden.id).wachtrij.openstaand} openstaand, "
+             f"{get_omgeving(huishouden.id).wachtrij.flushes} flushes")
+    sync = get_omgeving(huishouden.id).sync
+    st.write(f"Snapshot: {sync.controles} revisiecontroles, {sync.ophalingen} keer opgehaald")
     st.write("**Huidige planning keys:**")
     for key in sorted(st.session_state.db.keys()):
         st.write(f"- {key}")
@@ -264,13 +328,24 @@ if st.checkbox("🔍 Debug informatie tonen"):
 col1, col2 = st.columns(2)
 with col1:
     start_dag = st.date_input("Startdatum weekplanning", value=datetime.today())
+    st.toggle("🧠 Geoptimaliseerd plannen", key="optimaliseren",
+              help="Geen herhalingen van eten en activiteiten, evenwichtige taken, achterstallige taken eerst")
+    if st.session_state.optimaliseren and st.button("🧠 Week opnieuw optimaliseren"):
+        # De week wissen: hieronder worden de ontbrekende dagen opnieuw gepland
+        for i in range(7):
+            dag_key = (start_dag + timedelta(days=i)).strftime("%Y-%m-%d")
+            if dag_key in st.session_state.db:
+                del st.session_state.db[dag_key]
+            for key in kolom_widgets(i):
+                st.session_state.pop(key, None)
+        st.session_state.planning_counter = getattr(st.session_state, 'planning_counter', 0) + 1
 
 with col2:
         # nieuwe_taak = st.text_input("Nieuwe taak")
         # frequentie = st.selectbox("Frequentie:", ["Wekelijks", "Maandelijks", "Jaarlijks", "Half jaarlijks", "Om de 5 jaar"])
         # effort = st.selectbox("Effort:", ["Laag", "Gemiddeld", "Hoog"])
         # if st.button("➕ Toevoegen aan Taken") and nieuwe_taak:
-        #     if not taak_bestaat_al(nieuwe_taak, data['taken']):
+        #     if not taak_bestaat_al(nieuwe_taak):
         #         add_to_taken_sheet(nieuwe_taak, frequentie, effort)
         #     else:
         #         st.info("ℹ️ Deze taak bestaat al.")
@@ -286,203 +361,91 @@ with col2:
             nieuwe_taak = st.text_input("📝 Taaknaam")
             frequentie = st.selectbox("📅 Frequentie", ["Wekelijks", "Maandelijks", "Jaarlijks", "Half jaarlijks", "Om de 5 jaar"])
             effort = st.selectbox("⚡ Effort", ["Laag", "Gemiddeld", "Hoog"])
-            person= st.selectbox("👷🏻‍♂️ Wie", ["beiden", "Lise", "Cédric"])
+            person= st.selectbox("👷🏻‍♂️ Wie", [IEDEREEN] + [lid.naam for lid in reversed(huishouden.leden)])
             submitted = st.form_submit_button("✅ Bevestigen")
 
             if submitted:
-                if not taak_bestaat_al(nieuwe_taak, data['taken']):
+                if not taak_bestaat_al(nieuwe_taak):
                     add_to_taken_sheet(nieuwe_taak, frequentie, effort, person)
                     st.success(f"✅ '{nieuwe_taak}' toegevoegd aan Taken")
-                    st.cache_data.clear()
-                    data['taken'] = load_all_sheets()['taken']
                     st.session_state.taak_toevoegen_open = False
                     st.rerun()
                 else:
                     st.info("ℹ️ Deze taak bestaat al.")
 
 if data:
-    planning = []
-    sheet_taken = get_gsheet_client().open("Gezinsplanning").worksheet("Taken")
-
-    personen = ["cedric", "lise"]
-    
-    # Gebruik counter voor extra randomness bij taken verdeling
-    shuffle_seed = getattr(st.session_state, 'planning_counter', 0) * 1000 + start_dag.toordinal()
-    taak_planning_week = verdeel_taken_per_persoon_with_shuffle(
-        data['taken'], 
-        start_dag, 
-        personen, 
-        shuffle_seed=shuffle_seed
-    )
+    personen = huishouden.personen
     
-    for i in range(7):
-        dag = start_dag + timedelta(days=i)
-        dag_key = dag.strftime("%Y-%m-%d")
-        
-        if dag_key in db:
-            dag_planning = db[dag_key]
-        else:
-            # Gebruik counter voor extra randomness
-            seed_offset = getattr(st.session_state, 'planning_counter', 0) * 100
-            dag_planning = generate_daily_planning_with_randomness(
-                dag, 
-                data, 
-                taak_planning_week, 
-                seed_offset=seed_offset
-            )
-            db[dag_key] = dag_planning
-        
-        planning.append(dag_planning)
-
-    save_db(db)
-    st.session_state.db = db
-
+    # Gebruik counter voor extra randomness bij taken verdeling; zolang Taken niet
+    # wijzigt, komt de verdeling van de week uit het geheugen
+    planner = get_omgeving(huishouden.id).planner
+    planning_counter = getattr(st.session_state, 'planning_counter', 0)
+    versies = get_omgeving(huishouden.id).cache.versies()
+    # Bewaarde dagen komen uit de db, ontbrekende worden (gememoiseerd) gepland
+    if st.session_state.get("optimaliseren"):
+        planning, taak_planning_week = optimaliseer_week(
+            planner, data, versies, db, start_dag, personen, planning_counter, meting,
+        )
+    else:
+        planning, taak_planning_week = planner.week(data, versies, db, start_dag, personen, planning_counter, meting)
+    opties = planner.opties(data, versies)
+
+    with meting.fase('save_db'):
+        save_db(db)
+        st.session_state.db = db
+        save_planning_to_gsheet({
+            (start_dag + timedelta(days=i)).strftime("%Y-%m-%d"): dag_planning for i, dag_planning in enumerate(planning)
+        })
+
+    meting.begin('render')
     st.subheader("📅 Weekoverzicht")
     st.markdown("📝 **Je wijzigingen hieronder worden automatisch opgeslagen**")
     cols = st.columns(7)
 
-    for i, dag_planning in enumerate(planning):
-        with cols[i]:
-            dag_key = (start_dag + timedelta(days=i)).strftime("%Y-%m-%d")
-            st.markdown(f"**{dag_planning['dag_kort']}**")
-        
-            # Eten selectie met optie om nieuw gerecht toe te voegen
-            eten_opties = data['eten'].iloc[:,0].tolist()
-            eten_opties.insert(0, "➕ Nieuw gerecht toevoegen...")
-
-            current_eten = dag_planning['eten']
-            if current_eten not in eten_opties:
-                eten_opties.insert(0, current_eten)
-
-            zoekterm = st.text_input("🔍 Zoek gerecht:", key=f"zoek_eten_{i}")
-            gefilterde_opties = [opt for opt in eten_opties if zoekterm.lower() in opt.lower()]
-
-            selected_eten = st.selectbox(
-                "🍽️ Eten",
-                options=gefilterde_opties,
-                index=0 if current_eten not in gefilterde_opties else gefilterde_opties.index(current_eten),
-                key=f"eten_{i}"
-            )
+    # Keuzelijsten en index-maps één keer per dataversie, gedeeld door alle dagen
+    weergave = week_weergave(planner.cache, data, versies, huishouden.activiteit_velden)
 
-            if selected_eten == "➕ Nieuw gerecht toevoegen...":
-                nieuw_eten = st.text_input("Nieuw gerecht invullen:", key=f"nieuw_eten_{i}")
-                if st.button("✅ Toevoegen", key=f"toevoegen_eten_{i}") and nieuw_eten:
-                    if nieuw_eten not in eten_opties:
-                        add_to_sheet("Eten", nieuw_eten)
-                        st.success(f"'{nieuw_eten}' toegevoegd aan gerechten.")
-                        data['eten'] = load_all_sheets()['eten']  # reload data
-                        save_planning_change(dag_key, 'eten', nieuw_eten)
-                        st.rerun()
-                    else:
-                        st.info("ℹ️ Dit gerecht bestaat al.")
-            elif selected_eten != current_eten:
-                save_planning_change(dag_key, 'eten', selected_eten)
-            
-            st.markdown("---")
-            
-            # Taak logica (ongewijzigd)
-            if dag_planning['taak_lise']:
-                st.markdown(f"🧹 **Taak Lise:**")
-                taak_naam = dag_planning['taak_lise']
-                taak_afgevinkt = st.checkbox(taak_naam, key=f"taak_lise_chk_{i}")
-                
-                if taak_afgevinkt:
-                    idx = data['taken'][data['taken']['Taak'] == taak_naam].index[0]
-                    if data['taken'].iloc[idx]['Frequentie'] == 'Eenmalig':
-                        verwijder_taak(sheet_taken, taak_naam)
-                        data['taken'] = data['taken'].drop(index=idx).reset_index(drop=True)
-                        st.success(f"🗑️ '{taak_naam}' verwijderd (eenmalige taak)")
-                    else:
-                        data['taken'].at[idx, 'Laatst_Uitgevoerd'] = str(datetime.today())
-                        kolomindex = data['taken'].columns.get_loc("Laatst_Uitgevoerd")
-                        sheet_taken.update_cell(idx + 2, kolomindex, str(datetime.today().date()))
-                        st.success(f"✅ '{taak_naam}' gemarkeerd als uitgevoerd op {datetime.today()}")
-                        
-            if dag_planning['taak_cedric']:
-                st.markdown(f"🧹 **Taak Cedric:**")
-                taak_naam = dag_planning['taak_cedric']
-                taak_afgevinkt = st.checkbox(taak_naam, key=f"taak_cedric_chk_{i}")
-                
-                if taak_afgevinkt:
-                    idx = data['taken'][data['taken']['Taak'] == taak_naam].index[0]
-                    if data['taken'].iloc[idx]['Frequentie'] == 'Eenmalig':
-                        verwijder_taak(sheet_taken, taak_naam)
-                        data['taken'] = data['taken'].drop(index=idx).reset_index(drop=True)
-                        st.success(f"🗑️ '{taak_naam}' verwijderd (eenmalige taak)")
-                    else:
-                        data['taken'].at[idx, 'Laatst_Uitgevoerd'] = str(datetime.today())
-                        kolomindex = data['taken'].columns.get_loc("Laatst_Uitgevoerd")
-                        sheet_taken.update_cell(idx + 2, kolomindex, str(datetime.today().date()))
-                        st.success(f"✅ '{taak_naam}' gemarkeerd als uitgevoerd op {datetime.today()}")
-                        
-            if dag_planning['taak_lise'] == "" and dag_planning['taak_cedric'] == "":
-                st.markdown(f"🧹 **Geen taak vandaag**")
-                st.markdown("")
-                st.markdown("")
-        
-            st.markdown("---")
-            
-            # Cedric
-            current_cedric = dag_planning['cedric']
-            selected_cedric = st.selectbox(
-                f"👨‍🦱 Cedric", 
-                options=data['act_cedric']['Activiteiten'].tolist(), 
-                index=data['act_cedric']['Activiteiten'].tolist().index(current_cedric), 
-                key=f"cedric_{i}"
-            )
-            if selected_cedric != current_cedric:
-                save_planning_change(dag_key, 'cedric', selected_cedric)
-            
-            # Lise
-            current_lise = dag_planning['lise']
-            selected_lise = st.selectbox(
-                f"👩‍🦰 Lise", 
-                options=data['act_lise']['Activiteiten'].tolist(), 
-                index=data['act_lise']['Activiteiten'].tolist().index(current_lise), 
-                key=f"lise_{i}"
-            )
-            if selected_lise != current_lise:
-                save_planning_change(dag_key, 'lise', selected_lise)
-            
-            # Kids
-            current_kids = dag_planning['kids']
-            selected_kids = st.selectbox(
-                f"👦 Kids", 
-                options=data['act_kids']['Activiteiten'].tolist(), 
-                index=data['act_kids']['Activiteiten'].tolist().index(current_kids), 
-                key=f"kids_{i}"
-            )
-            if selected_kids != current_kids:
-                save_planning_change(dag_key, 'lars', selected_kids)
-
-             # Activiteiten met helper functie
-            # Iedereen
-            current_all = dag_planning['all']
-            selected_all = st.selectbox(
-                f"👨‍👩‍👦‍👦 Iedereen", 
-                options=data['act_cedric']['Activiteiten'].tolist(), 
-                index=data['act_cedric']['Activiteiten'].tolist().index(current_all), 
-                key=f"all_{i}"
+    for i in range(7):
+        with cols[i]:
+            dag_kolom(i, start_dag + timedelta(days=i), start_dag, data, weergave)
+
+    meting.einde('render')
+
+    with st.expander("📆 Vooruit plannen (boodschappenlijst & kalender)"):
+        aantal_weken = st.number_input("Aantal weken", min_value=1, max_value=52, value=13)
+        if st.button("📋 Planning genereren", key="horizon_genereren"):
+            # Enkel een voorbeeld: bewaarde dagen blijven staan, nieuwe pas na "Vastleggen"
+            st.session_state.horizon = planner.horizon(data, versies, db, start_dag, int(aantal_weken) * 7, personen,
+                                                       getattr(st.session_state, 'planning_counter', 0))
+            st.session_state.horizon_melding = None
+        if st.session_state.get("horizon_melding"):
+            st.success(st.session_state.horizon_melding)
+        if st.session_state.get("horizon"):
+            dagen = st.session_state.horizon
+            horizon_df = pd.DataFrame(list(dagen.values())).drop(columns=['dag_kort'])
+            st.dataframe(horizon_df, hide_index=True)
+            st.download_button(
+                "⬇️ Download als CSV",
+                horizon_df.to_csv(index=False),
+                file_name=f"planning_{next(iter(dagen))}_{len(dagen) // 7}w.csv",
+                mime="text/csv"
             )
-            if selected_all != current_all:
-                save_planning_change(dag_key, 'all', selected_all)
-            
-            st.markdown("---")
-
-            if st.button(f"🔄 Nieuwe dagplanning", key=f"regen_{i}"):
-                st.session_state[f"regen_{dag_key}"] = True
-                with st.spinner("Bezig met genereren van nieuwe planning..."):
-                    # Wis oude planning en reset cache
-                    verwijderde_dag = wis_dag_uit_json_en_cache(dag_key)
-                    
-                    st.success(f"✅ Nieuwe planning gegenereerd!")
-                    if verwijderde_dag:
-                        st.info(f"🗑️ Verwijderde planning voor: {verwijderde_dag}")
-                    else:
-                        st.info("ℹ️ Geen bestaande planning gevonden, nieuwe planning wordt gegenereerd")
-        
-                st.rerun()
-                st.session_state[f"regen_{dag_key}"] = False
+            st.button("📌 Vastleggen in het weekrooster", on_click=leg_horizon_vast,
+                      help="Bewaart de nieuwe dagen, zodat het weekrooster later dezelfde planning toont")
+
+    with st.expander("🕰️ Wanneer laatst?"):
+        col_eten, col_act = st.columns(2)
+        with col_eten:
+            gerecht = st.selectbox("🍽️ Gerecht", weergave.eten.opties[1:], index=None, key="laatst_eten")
+            if gerecht:
+                laatst = get_omgeving(huishouden.id).archief.laatst(gerecht, velden=('eten',))
+                st.write(f"Laatst gegeten op **{laatst}**" if laatst else "Nog nooit gegeten volgens het archief")
+        with col_act:
+            alle_activiteiten = sorted({a for lijst in weergave.activiteiten.values() for a in lijst.opties}, key=str)
+            activiteit = st.selectbox("🎯 Activiteit", alle_activiteiten, index=None, key="laatst_activiteit")
+            if activiteit:
+                laatst = get_omgeving(huishouden.id).archief.laatst(activiteit, velden=tuple(huishouden.activiteit_velden))
+                st.write(f"Laatst gedaan op **{laatst}**" if laatst else "Nog niet gedaan volgens het archief")
 
     # st.subheader("➕ Voeg nieuwe input toe")
     # col3, col4, col5, col6 = st.columns(4)
@@ -491,7 +454,7 @@ if data:
     #     frequentie = st.selectbox("Frequentie:", ["Wekelijks", "Maandelijks", "Jaarlijks", "Half jaarlijks", "Om de 5 jaar"])
     #     effort = st.selectbox("Effort:", ["Laag", "Gemiddeld", "Hoog"])
     #     if st.button("➕ Toevoegen aan Taken") and nieuwe_taak:
-    #         if not taak_bestaat_al(nieuwe_taak, data['taken']):
+    #         if not taak_bestaat_al(nieuwe_taak):
     #             add_to_taken_sheet(nieuwe_taak, frequentie, effort)
     #         else:
     #             st.info("ℹ️ Deze taak bestaat al.")
@@ -501,4 +464,35 @@ if data:
     #         if nieuwe_activiteit not in data['activiteiten'].iloc[:,0].tolist():
     #             add_to_sheet("Activiteiten", nieuwe_activiteit)
     #         else:
-    #             st.info("ℹ️ Deze activiteit bestaat al.")
\ No newline at end of file
+    #             st.info("ℹ️ Deze activiteit bestaat al.")
+
+
+def cache_statistieken():
+    """{naam: (hits, misses)} van de caches die een rerun goedkoop maken"""
+    tabbladen = get_omgeving(huishouden.id).cache
+    register = get_omgeving(huishouden.id).register
+    planner = get_omgeving(huishouden.id).planner.cache
+    return {
+        'tabbladen': (sum(tabbladen.hits.values()), sum(tabbladen.misses.values())),
+        'planner': (planner.hits, planner.misses),
+        'sheet handles': (sum(register.vermeden.values()), sum(register.geopend.values())),
+    }
+
+def toon_profiling(metrics):
+    with st.expander("⏱️ Profiling"):
+        reruns = list(metrics.reruns)
+        if not reruns:
+            return
+        fasen = pd.DataFrame([{'tijdstip': r['tijdstip'], 'totaal': r['totaal_ms'], **r['fasen_ms']} for r in reruns])
+        kolommen = ['tijdstip', 'totaal'] + [fase for fase in FASEN if fase in fasen.columns]
+        st.write("**Duur per fase (ms), recentste rerun eerst**")
+        st.dataframe(fasen[kolommen].iloc[::-1], hide_index=True)
+        st.write("**Sheets API sinds de start** (incl. achtergrondthreads)")
+        st.dataframe(pd.DataFrame.from_dict(metrics.api.stand(), orient='index'))
+        st.write("**Caches**")
+        st.dataframe(pd.DataFrame.from_dict(reruns[-1]['caches'], orient='index'))
+        st.download_button("⬇️ Metrics (JSONL)", metrics.als_jsonl(), file_name="metrics.jsonl",
+                           mime="application/jsonl")
+
+get_metrics().sluit(meting, cache_statistieken())
+toon_profiling(get_metrics())
@@ -0,0 +1,174 @@
+"""Profiling van reruns: duur per fase, Sheets API-gebruik en cache hit rates.
+
+`ApiTeller` telt requests en bytes per soort operatie door de request-methode
+van de gspread HTTP-client te omwikkelen. `Metrics` bewaart de laatste
+reruns in het geheugen en schrijft ze als JSONL weg om later te analyseren.
+Het logbestand wordt geroteerd zodra het `max_bytes` haalt: er blijft één
+vorige versie (`<pad>.1`) staan, zodat het niet onbeperkt groeit.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+FASEN = ('load_all_sheets', 'toewijzing', 'generatie', 'save_db', 'render')
+
+
+def soort_request(methode, url):
+    """'GET values:batchGet', 'POST batchUpdate', ... uit methode en URL van een Sheets/Drive-request"""
+    url = url.split('?')[0]
+    if 'googleapis.com/drive' in url:
+        soort = 'drive'
+    elif ':batchUpdate' in url:
+        soort = 'batchUpdate'
+    elif 'values:batchGet' in url:
+        soort = 'values:batchGet'
+    elif ':append' in url:
+        soort = 'values:append'
+    elif '/values' in url:
+        soort = 'values'
+    else:
+        soort = 'metadata'
+    return f"{methode.upper()} {soort}"
+
+
+class ApiTeller:
+    """Aantal requests en bytes per soort operatie, thread-safe (ook de achtergrondthreads tellen mee)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.aanroepen = defaultdict(int)
+        self.verzonden = defaultdict(int)
+        self.ontvangen = defaultdict(int)
+
+    def tel(self, soort, verzonden=0, ontvangen=0):
+        with self._lock:
+            self.aanroepen[soort] += 1
+            self.verzonden[soort] += verzonden
+            self.ontvangen[soort] += ontvangen
+
+    def stand(self):
+        """{soort: {'aanroepen', 'verzonden', 'ontvangen'}} op dit moment"""
+        with self._lock:
+            return {
+                soort: {'aanroepen': n, 'verzonden': self.verzonden[soort], 'ontvangen': self.ontvangen[soort]}
+                for soort, n in self.aanroepen.items()
+            }
+
+    def instrumenteer(self, client):
+        """Telt voortaan elke request van `client` (een gspread Client of een FakeClient)"""
+        if hasattr(client, 'http_client'):
+            http_client = client.http_client
+            origineel = http_client.request
+
+            @wraps(origineel)
+            def request(methode, endpoint, params=None, data=None, json=None, files=None, headers=None):
+                verzonden = len(data or b"") + (len(_json_bytes(json)) if json is not None else 0)
+                try:
+                    antwoord = origineel(methode, endpoint, params=params, data=data, json=json,
+                                         files=files, headers=headers)
+                except Exception:
+                    self.tel(soort_request(methode, endpoint), verzonden)
+                    raise
+                self.tel(soort_request(methode, endpoint), verzonden, len(antwoord.content or b""))
+                return antwoord
+
+            http_client.request = request
+        else:
+            # FakeClient: geen HTTP, enkel het aantal requests per operatie
+            origineel = client._request
+
+            @wraps(origineel)
+            def _request(operatie):
+                self.tel(operatie)
+                return origineel(operatie)
+
+            client._request = _request
+        return client
+
+
+def _json_bytes(inhoud):
+    return json.dumps(inhoud).encode()
+
+
+def verschil(na, voor):
+    """API-stand `na` min `voor`, enkel de soorten die veranderden"""
+    resultaat = {}
+    for soort, tellers in na.items():
+        oud = voor.get(soort, {})
+        delta = {naam: waarde - oud.get(naam, 0) for naam, waarde in tellers.items()}
+        if delta['aanroepen']:
+            resultaat[soort] = delta
+    return resultaat
+
+
+class Rerun:
+    """Metingen van één rerun"""
+
+    def __init__(self, api_stand):
+        self.start = time.perf_counter()
+        self.tijdstip = datetime.now().isoformat(timespec='seconds')
+        self.fasen = {}
+        self._api_voor = api_stand
+        self._lopend = {}
+
+    def begin(self, naam):
+        self._lopend[naam] = time.perf_counter()
+
+    def einde(self, naam):
+        start = self._lopend.pop(naam, None)
+        if start is not None:
+            self.fasen[naam] = self.fasen.get(naam, 0.0) + (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def fase(self, naam):
+        self.begin(naam)
+        try:
+            yield
+        finally:
+            self.einde(naam)
+
+
+class Metrics:
+    def __init__(self, pad=None, max_reruns=200, max_bytes=1_000_000):
+        self.pad = pad
+        self.max_bytes = max_bytes
+        self.api = ApiTeller()
+        self.reruns = deque(maxlen=max_reruns)
+        self._lock = threading.Lock()
+
+    def start_rerun(self):
+        return Rerun(self.api.stand())
+
+    def sluit(self, rerun, caches=None):
+        """Rondt `rerun` af; `caches` is {naam: (hits, misses)} met cumulatieve tellers"""
+        record = {
+            'tijdstip': rerun.tijdstip,
+            'totaal_ms': round((time.perf_counter() - rerun.start) * 1000, 2),
+            'fasen_ms': {naam: round(ms, 2) for naam, ms in rerun.fasen.items()},
+            'api': verschil(self.api.stand(), rerun._api_voor),
+            'caches': {
+                naam: {'hits': hits, 'misses': misses, 'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None}
+                for naam, (hits, misses) in (caches or {}).items()
+            },
+        }
+        with self._lock:
+            self.reruns.append(record)
+            if self.pad:
+                self._roteer()
+                with open(self.pad, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+        return record
+
+    def _roteer(self):
+        # Eén rerun per regel: bij een volle log wordt de vorige rotatie overschreven
+        if os.path.exists(self.pad) and os.path.getsize(self.pad) >= self.max_bytes:
+            os.replace(self.pad, f"{self.pad}.1")
+
+    def als_jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(record) + "\n" for record in self.reruns)
@@ -0,0 +1,63 @@
+"""Alle gedeelde objecten van één huishouden, los van Streamlit.
+
+main.py bewaart één `Omgeving` per huishouden met st.cache_resource, zodat
+de sessies van dat huishouden ze delen. benchmark.py bouwt er een rond de
+fake client en meet zo dezelfde opbouw als de app: laden via de snapshot,
+de configuratie van het huishouden en dezelfde bestanden.
+"""
+from archief import Archief
+from lru import LRUCache
+from opslag import PlanningDB
+from planning import Planner, met_volgende_datum
+from sheets import SheetRegister, TabbladCache
+from snapshot import Snapshot, SnapshotSync
+from taken import TakenStore
+from wachtrij import SchrijfWachtrij
+
+# Bestanden per huishouden (Olieboom: in de hoofdmap, andere: huishoudens/<id>/)
+DB_PATH = "weekplanning_db.sqlite"
+OUDE_DB_PATH = "weekplanning_db.json"  # wordt bij de eerste start overgenomen
+WACHTRIJ_PATH = "schrijfwachtrij.json"
+SNAPSHOT_PATH = "tabbladen_snapshot.sqlite"
+SYNC_INTERVAL = 60  # seconden tussen twee revisiecontroles
+
+
+class Omgeving:
+    def __init__(self, client, huishouden, interval=SYNC_INTERVAL):
+        self.huishouden = huishouden
+        # Handles blijven over reruns en sessies heen bewaard
+        self.register = SheetRegister(client, huishouden.spreadsheet)
+        # Mutaties gaan in de achtergrond, gebundeld in één batch_update per flush
+        self.wachtrij = SchrijfWachtrij(self.register, huishouden.pad(WACHTRIJ_PATH))
+        # Lokale kopie van alle tabbladen; de achtergrondthread haalt enkel gewijzigde inhoud op
+        self.sync = SnapshotSync(self.register, Snapshot(huishouden.pad(SNAPSHOT_PATH)), wachtrij=self.wachtrij,
+                                 interval=interval, tabbladen=huishouden.tabbladen)
+        # Laden leest van schijf en blokkeert dus niet op het netwerk; de sync-thread
+        # invalideert tabbladen die in de spreadsheet veranderd zijn (vandaar geen TTL).
+        # De kolom met de volgende toegelaten datum wordt één keer per laadbeurt berekend.
+        self.cache = TabbladCache(self.sync.laad, ttl=None, tabbladen=huishouden.tabbladen,
+                                  verwerkers={'taken': met_volgende_datum})
+        self.sync.cache = self.cache
+        # Taken op naam, met rijnummers die ook na verwijderingen kloppen
+        self.taken = TakenStore(self.cache, self.wachtrij)
+        # Eén rij per dag en veld, naast de dagplanningen in dezelfde SQLite
+        velden = ('eten',) + tuple(f"taak_{persoon}" for persoon in huishouden.personen)
+        self.archief = Archief(huishouden.pad(DB_PATH), velden + tuple(huishouden.activiteit_velden))
+        # Begrensd geheugen voor takenverdelingen en dagplannen, gedeeld over sessies
+        self.planner = Planner(LRUCache(maxsize=1024), huishouden.taak_dagen, huishouden.activiteit_velden,
+                               huishouden.namen)
+
+    def start(self):
+        """Start de achtergrondthreads van de schrijfwachtrij en de snapshot-sync"""
+        self.wachtrij.start()
+        self.sync.start()
+        return self
+
+    def stop(self):
+        self.sync.stop()
+        self.wachtrij.stop()
+
+    def nieuwe_db(self):
+        """Eigen PlanningDB voor één sessie; SQLite regelt de locking tussen sessies"""
+        return PlanningDB(self.huishouden.pad(DB_PATH), json_pad=self.huishouden.pad(OUDE_DB_PATH))
+
@@ -0,0 +1,145 @@
+"""Opslag van de dagplanningen in SQLite.
+
+`PlanningDB` gedraagt zich als de dict die vroeger uit weekplanning_db.json
+kwam, maar leest dagen pas wanneer ze nodig zijn en schrijft bij `opslaan()`
+enkel de dagen weg die gewijzigd zijn, in één transactie.
+
+Elke sessie heeft haar eigen PlanningDB op hetzelfde bestand. `opslaan()`
+leest daarom de gewijzigde dagen opnieuw binnen de schrijftransactie en
+voegt per veld samen: enkel velden die deze sessie zelf veranderde,
+overschrijven wat een andere sessie intussen bewaarde.
+"""
+import json
+import os
+from collections.abc import MutableMapping
+
+from databank import verbind
+
+
+def voeg_samen(basis, eigen, actueel):
+    """Drieweg-merge per veld: wat `eigen` t.o.v. `basis` veranderde wint, de rest komt uit `actueel`"""
+    if actueel is None:
+        return dict(eigen)
+    basis = basis or {}
+    samen = dict(actueel)
+    samen.update({veld: waarde for veld, waarde in eigen.items() if veld not in basis or basis[veld] != waarde})
+    return samen
+
+
+class PlanningDB(MutableMapping):
+    def __init__(self, pad, json_pad=None):
+        self.pad = pad
+        self._cache = {}          # dag_key -> planning, enkel wat al gelezen is
+        self._basis = {}          # dag_key -> planning zoals gelezen, voor de merge in opslaan()
+        self._gewijzigd = set()
+        self._verwijderd = set()
+        with verbind(self.pad) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS dagen (dag_key TEXT PRIMARY KEY, planning TEXT NOT NULL)")
+        if json_pad and os.path.exists(json_pad):
+            self._migreer(json_pad)
+
+    def _migreer(self, json_pad):
+        """Neemt een bestaande weekplanning_db.json eenmalig over"""
+        with verbind(self.pad) as conn:
+            # user_version 1 = JSON al overgenomen (ook als alle dagen nadien gewist zijn)
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+                return
+            with open(json_pad, "r") as f:
+                oud = json.load(f)
+            conn.executemany(
+                "INSERT OR IGNORE INTO dagen VALUES (?, ?)",
+                [(key, json.dumps(planning)) for key, planning in oud.items()],
+            )
+            conn.execute("PRAGMA user_version = 1")
+
+    def voorlaad(self, keys):
+        """Leest meerdere dagen in één query, bv. de zeven dagen van de week"""
+        te_lezen = [key for key in keys if key not in self._cache and key not in self._verwijderd]
+        if not te_lezen:
+            return
+        with verbind(self.pad) as conn:
+            rijen = conn.execute(
+                f"SELECT dag_key, planning FROM dagen WHERE dag_key IN ({','.join('?' * len(te_lezen))})",
+                te_lezen,
+            ).fetchall()
+        for key, planning in rijen:
+            self._cache[key] = json.loads(planning)
+            self._basis[key] = json.loads(planning)
+
+    def ververs(self):
+        """Vergeet ongewijzigde dagen, zodat wat andere sessies bewaarden opnieuw gelezen wordt"""
+        for key in list(self._cache):
+            if key not in self._gewijzigd:
+                del self._cache[key]
+                self._basis.pop(key, None)
+
+    def __getitem__(self, key):
+        if key in self._verwijderd:
+            raise KeyError(key)
+        if key not in self._cache:
+            self.voorlaad([key])
+        if key not in self._cache:
+            raise KeyError(key)
+        return self._cache[key]
+
+    def __setitem__(self, key, planning):
+        self._cache[key] = planning
+        self._gewijzigd.add(key)
+        self._verwijderd.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._cache.pop(key, None)
+        self._basis.pop(key, None)
+        self._gewijzigd.discard(key)
+        self._verwijderd.add(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        with verbind(self.pad) as conn:
+            opgeslagen = [key for key, in conn.execute("SELECT dag_key FROM dagen ORDER BY dag_key")]
+        keys = (set(opgeslagen) | set(self._cache)) - self._verwijderd
+        return iter(sorted(keys))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def markeer(self, key):
+        """Meldt dat een planning in-place gewijzigd is (bv. db[key][veld] = ...)"""
+        if key in self._cache:
+            self._gewijzigd.add(key)
+
+    def opslaan(self):
+        """Schrijft gewijzigde en verwijderde dagen weg in één atomaire transactie.
+
+        Gewijzigde dagen worden per veld samengevoegd met wat er nu in de
+        database staat, zodat een andere sessie geen wijzigingen verliest.
+        """
+        if not self._gewijzigd and not self._verwijderd:
+            return
+        keys = sorted(self._gewijzigd)
+        with verbind(self.pad) as conn:
+            conn.execute("BEGIN IMMEDIATE")  # niemand schrijft tussen het herlezen en het wegschrijven
+            actueel = {
+                key: json.loads(planning) for key, planning in conn.execute(
+                    f"SELECT dag_key, planning FROM dagen WHERE dag_key IN ({','.join('?' * len(keys))})", keys,
+                )
+            } if keys else {}
+            for key in keys:
+                # In-place: wie de dict van deze dag vasthoudt, ziet de samengevoegde versie
+                self._cache[key].update(voeg_samen(self._basis.get(key), self._cache[key], actueel.get(key)))
+                self._basis[key] = json.loads(json.dumps(self._cache[key]))
+            conn.executemany(
+                "INSERT OR REPLACE INTO dagen VALUES (?, ?)",
+                [(key, json.dumps(self._cache[key])) for key in keys],
+            )
+            conn.executemany("DELETE FROM dagen WHERE dag_key = ?", [(key,) for key in self._verwijderd])
+        self._gewijzigd.clear()
+        self._verwijderd.clear()
@@ -0,0 +1,337 @@
+"""Geoptimaliseerde weekplanning, naast de willekeurige planning van planning.py.
+
+Eten en activiteiten worden per veld zo gekozen dat een waarde niet
+terugkomt binnen zijn venster: niet in de week zelf en niet kort voor of na
+een bewaarde dag in de PlanningDB. Taken worden verdeeld met een lokale
+zoektocht die zoveel mogelijk taken inplant, de meest achterstallige eerst,
+en het effortverschil tussen de personen klein houdt. Beide zoektochten
+stoppen na een vast aantal stappen of een tijdsbudget, wat eerst komt, zodat
+ook een lange takenlijst een rerun niet vertraagt.
+"""
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import timedelta
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from planning import (
+    EFFORT_SCORES, MAX_TAKEN_PER_PERSOON, TAAK_DAGEN, TOEGELATEN_EFFORTS, VOLGENDE_KOLOM, beschikbaar_masker,
+    planning_rng, planning_seed, taak_eigenaars, taken_per_dag, volgende_datums,
+)
+
+# Aantal dagen waarbinnen een waarde liefst niet terugkomt
+VENSTERS = {'eten': 14}
+STANDAARD_VENSTER = 7
+
+TIJDSBUDGET = 0.05  # seconden per zoektocht
+# Bovengrens op het aantal stappen. Het tijdsbudget is een vangnet: op een trage
+# machine kan het de zoektocht eerder stoppen en dus een ander resultaat geven.
+MAX_STAPPEN = 2000
+GEDULD = 300        # stappen zonder verbetering voor de zoektocht opgeeft
+KANDIDATEN = 100    # niet-ingeplande taken die de zoektocht overweegt, dringendste eerst
+
+# Elke ingeplande taak weegt zwaarder dan het grootst mogelijke effortverschil
+TAAK_GEWICHT = 10.0
+ACHTERSTAND_GEWICHT = 10.0 / 365  # tot een jaar achterstand telt mee
+BALANS_GEWICHT = 1.0
+
+
+def herhaling_kost(afstanden, venster):
+    """Straf voor een waarde die op `afstanden` dagen van een andere keer valt"""
+    return np.maximum(0, venster - np.abs(afstanden))
+
+
+class Zoektocht:
+    """Stopt na `max_stappen` stappen, na `geduld` stappen zonder verbetering of na `budget` seconden"""
+
+    def __init__(self, budget=TIJDSBUDGET, max_stappen=MAX_STAPPEN, geduld=GEDULD):
+        self.einde = time.perf_counter() + budget
+        self.max_stappen = max_stappen
+        self.geduld = geduld
+        self.stappen = 0
+        self._sinds_verbetering = 0
+
+    def verbeterd(self):
+        self._sinds_verbetering = 0
+
+    def __iter__(self):
+        while (self.stappen < self.max_stappen and self._sinds_verbetering < self.geduld
+               and time.perf_counter() < self.einde):
+            self.stappen += 1
+            self._sinds_verbetering += 1
+            yield self.stappen
+
+
+def kies_waarden(dagen, lijst, geschiedenis, venster, rng, budget=TIJDSBUDGET):
+    """Eén waarde uit `lijst` per dag (ordinals in `dagen`), met zo weinig mogelijk herhalingen.
+
+    `geschiedenis` is {waarde: [ordinals]} van dagen die al vastliggen. Eerst
+    gretig de goedkoopste waarde per dag (willekeurig bij gelijke kost), dan
+    vervangen en wisselen zolang de totale kost daalt.
+    """
+    lijst = pd.unique(np.asarray(lijst, dtype=object))
+    if not len(lijst):
+        return [""] * len(dagen)
+    dagen = np.asarray(dagen)
+    index = {waarde: k for k, waarde in enumerate(lijst)}
+
+    # basis[k, j]: kost van waarde k op dag j ten opzichte van de geschiedenis
+    basis = np.zeros((len(lijst), len(dagen)))
+    for waarde, ordinals in geschiedenis.items():
+        k = index.get(waarde)
+        if k is not None:
+            basis[k] += herhaling_kost(dagen[:, None] - np.asarray(ordinals)[None, :], venster).sum(axis=1)
+    onderling = herhaling_kost(dagen[:, None] - dagen[None, :], venster)
+
+    keuze = []
+    for j in range(len(dagen)):
+        kost = basis[:, j].copy()
+        for i, k in enumerate(keuze):
+            kost[k] += onderling[i, j]
+        goedkoopst = np.flatnonzero(kost == kost.min())
+        keuze.append(int(goedkoopst[rng.integers(len(goedkoopst))]))
+
+    def totaal(keuze):
+        kost = sum(basis[k, j] for j, k in enumerate(keuze))
+        return kost + sum(onderling[i, j] for j in range(len(keuze)) for i in range(j) if keuze[i] == keuze[j])
+
+    huidig = totaal(keuze)
+    zoektocht = Zoektocht(budget)
+    for _ in zoektocht:
+        if not huidig:
+            break
+        nieuw = list(keuze)
+        j = int(rng.integers(len(dagen)))
+        if len(dagen) > 1 and rng.random() < 0.5:
+            i = int(rng.integers(len(dagen)))
+            nieuw[i], nieuw[j] = nieuw[j], nieuw[i]
+        else:
+            nieuw[j] = int(rng.integers(len(lijst)))
+        kost = totaal(nieuw)
+        if kost < huidig:
+            keuze, huidig = nieuw, kost
+            zoektocht.verbeterd()
+    return [lijst[k] for k in keuze]
+
+
+def achterstand(taken_df, referentiedatum):
+    """Dagen dat elke taak over tijd is; nooit uitgevoerde en eenmalige taken zijn het dringendst"""
+    volgende = taken_df[VOLGENDE_KOLOM] if VOLGENDE_KOLOM in taken_df.columns else volgende_datums(taken_df)
+    dagen = (pd.Timestamp(referentiedatum).normalize() - volgende).dt.days.to_numpy(dtype=float, copy=True)
+    onbekend = np.isnan(dagen)
+    dagen[onbekend] = np.nanmax(dagen) + 1 if (~onbekend).any() else 0
+    return dagen
+
+
+# TOEGELATEN_EFFORTS houdt de volgorde-eigenaardigheid van de willekeurige
+# planning; hier telt enkel welke efforts er zijn, dus beide kanten gesorteerd
+TOEGELATEN_COMBINATIES = frozenset(tuple(sorted(combinatie)) for combinatie in TOEGELATEN_EFFORTS)
+
+
+# Wat de zoektocht onderweg mag vasthouden: elke deelverzameling van een toegelaten combinatie
+HAALBARE_COMBINATIES = frozenset(
+    deel for combinatie in TOEGELATEN_COMBINATIES
+    for n in range(len(combinatie) + 1) for deel in combinations(combinatie, n)
+)
+
+
+def _toegelaten(efforts):
+    return tuple(sorted(efforts)) in TOEGELATEN_COMBINATIES
+
+
+def _haalbaar(efforts):
+    """True als `efforts` nog aan te vullen is tot een toegelaten combinatie"""
+    return tuple(sorted(efforts)) in HAALBARE_COMBINATIES
+
+
+def verdeel_taken_optimaal(taken_df, referentiedatum, personen, taak_dagen=TAAK_DAGEN, rng=None, budget=TIJDSBUDGET,
+                           namen=None):
+    """Zelfde resultaat-vorm als verdeel_taken_per_persoon_with_shuffle: {persoon: [taakrecord, ...]}.
+
+    Per persoon zoveel taken als hij taakdagen heeft (hoogstens drie), met
+    een toegelaten combinatie van efforts. De taken van een persoon staan
+    op volgorde van achterstand, zodat de dringendste op de eerste taakdag valt.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    df = taken_df[beschikbaar_masker(taken_df, referentiedatum)].reset_index(drop=True)
+    df['Effort_Score'] = df['Effort'].map(EFFORT_SCORES)
+    if df.empty:
+        return {persoon: [] for persoon in personen}
+
+    gewicht = TAAK_GEWICHT + ACHTERSTAND_GEWICHT * np.clip(achterstand(df, referentiedatum), 0, 365)
+    efforts = df['Effort'].to_numpy(dtype=object)
+    scores = df['Effort_Score'].fillna(0).to_numpy()
+    taak_namen = df['Taak'].to_numpy(dtype=object)
+    eigenaars = taak_eigenaars(df, personen, namen)
+    capaciteit = {p: min(MAX_TAKEN_PER_PERSOON, len(taak_dagen.get(p, []))) for p in personen}
+
+    def mag(persoon, posities):
+        if len(posities) > capaciteit[persoon] or not _haalbaar(efforts[posities]):
+            return False
+        return eigenaars is None or all(pd.isna(eigenaars[t]) or eigenaars[t] == persoon for t in posities)
+
+    def vol(persoon):
+        posities = verdeling[persoon]
+        return len(posities) >= capaciteit[persoon] or not any(
+            _haalbaar(list(efforts[posities]) + [effort]) for effort in EFFORT_SCORES.index)
+
+    def definitief(posities):
+        # Een onvolledige combinatie (bv. één Gemiddeld) telt nog niet als ingepland
+        return posities if _toegelaten(efforts[posities]) else []
+
+    def score(verdeling):
+        definitieve = [definitief(posities) for posities in verdeling.values()]
+        ingepland = sum(gewicht[t] for posities in definitieve for t in posities)
+        efforts_pp = [scores[posities].sum() for posities in definitieve]
+        return ingepland - BALANS_GEWICHT * (max(efforts_pp) - min(efforts_pp))
+
+    # Dringendste taken eerst; gelijke achterstand in willekeurige volgorde
+    geschud = rng.permutation(len(df))
+    volgorde = geschud[np.argsort(-gewicht[geschud], kind='stable')]
+    geldig = volgorde[pd.Series(efforts[volgorde]).isin(EFFORT_SCORES.index).to_numpy()].tolist()
+
+    # Nog niet bekeken taken per (eigenaar, effort): een persoon begint enkel aan
+    # een combinatie die met de resterende taken nog te vervolledigen is
+    eigenaar = np.full(len(df), None, dtype=object) if eigenaars is None else np.where(pd.isna(eigenaars), None, eigenaars)
+    rest = Counter(zip(eigenaar[geldig], efforts[geldig]))
+
+    def te_vervolledigen(persoon, posities):
+        huidig = Counter(efforts[posities])
+        for combinatie in TOEGELATEN_COMBINATIES:
+            nodig = Counter(combinatie)
+            if not all(nodig[effort] >= n for effort, n in huidig.items()):
+                continue
+            if all(n <= rest[None, effort] + rest[persoon, effort] for effort, n in (nodig - huidig).items()):
+                return True
+        return False
+
+    # Gretige start: elke taak naar de persoon met de minste effort die ze nog kan nemen
+    verdeling = {persoon: [] for persoon in personen}
+    gebruikt, open_ = set(), []
+    for t in geldig:
+        rest[eigenaar[t], efforts[t]] -= 1
+        if taak_namen[t] in gebruikt:
+            continue
+        kandidaten = [p for p in personen if mag(p, verdeling[p] + [t]) and te_vervolledigen(p, verdeling[p] + [t])]
+        if kandidaten:
+            # Liefst een combinatie vervolledigen, dan naar wie de minste effort heeft
+            persoon = min(kandidaten, key=lambda p: (not _toegelaten(efforts[verdeling[p] + [t]]),
+                                                     scores[verdeling[p]].sum()))
+            verdeling[persoon].append(t)
+            gebruikt.add(taak_namen[t])
+        elif len(open_) < KANDIDATEN:
+            open_.append(t)
+        if len(open_) >= KANDIDATEN and all(vol(p) for p in personen):
+            break
+
+    # Lokale zoektocht: invoegen, vervangen, verplaatsen en ruilen zolang de score niet daalt
+    huidig = score(verdeling)
+    zoektocht = Zoektocht(budget)
+    for _ in zoektocht:
+        nieuw = {p: list(posities) for p, posities in verdeling.items()}
+        p, q = personen[rng.integers(len(personen))], personen[rng.integers(len(personen))]
+        zet = rng.integers(3)
+        if zet == 0 and open_:
+            # Een niet-ingeplande taak invoegen of in de plaats van een ingeplande zetten
+            t = open_[rng.integers(len(open_))]
+            if taak_namen[t] in {taak_namen[s] for posities in nieuw.values() for s in posities}:
+                continue
+            if nieuw[p] and rng.random() < 0.5:
+                nieuw[p].pop(int(rng.integers(len(nieuw[p]))))
+            nieuw[p].append(t)
+        elif zet == 1 and nieuw[p] and p != q:
+            nieuw[q].append(nieuw[p].pop(int(rng.integers(len(nieuw[p])))))
+        elif zet == 2 and nieuw[p] and nieuw[q] and p != q:
+            i, j = int(rng.integers(len(nieuw[p]))), int(rng.integers(len(nieuw[q])))
+            nieuw[p][i], nieuw[q][j] = nieuw[q][j], nieuw[p][i]
+        else:
+            continue
+        if not (mag(p, nieuw[p]) and mag(q, nieuw[q])):
+            continue
+        kandidaat = score(nieuw)
+        # Ook zijwaartse zetten: een halve combinatie (één Hoog) moet eerst
+        # ingeruild kunnen worden voor ze aangevuld wordt
+        if kandidaat >= huidig - 1e-9:
+            ingepland = {s for posities in nieuw.values() for s in posities}
+            open_ = [s for s in set(open_) | {s for posities in verdeling.values() for s in posities}
+                     if s not in ingepland]
+            open_.sort(key=lambda s: -gewicht[s])
+            if kandidaat > huidig + 1e-9:
+                zoektocht.verbeterd()
+            verdeling, huidig = nieuw, kandidaat
+
+    return {
+        persoon: df.take(sorted(definitief(verdeling[persoon]), key=lambda t: -gewicht[t])).to_dict('records')
+        for persoon in personen
+    }
+
+
+def geschiedenis_uit_db(db, dagen, activiteit_velden):
+    """{veld: {waarde: [ordinals]}} van de bewaarde `dagen` in een PlanningDB.
+
+    Velden die een tabblad delen (bv. 'cedric' en 'all'), delen ook hun geschiedenis.
+    """
+    per_key = {'eten': ['eten']}
+    for veld, key in activiteit_velden.items():
+        per_key.setdefault(key, []).append(veld)
+    geschiedenis = {}
+    for velden in per_key.values():
+        gedeeld = {}
+        for veld in velden:
+            geschiedenis[veld] = gedeeld
+    keys = [dag.strftime("%Y-%m-%d") for dag in dagen]
+    db.voorlaad(keys)
+    for dag, dag_key in zip(dagen, keys):
+        if dag_key in db:
+            for veld, waarden in geschiedenis.items():
+                waarde = db[dag_key].get(veld, "")
+                if waarde:
+                    waarden.setdefault(waarde, []).append(dag.toordinal())
+    return geschiedenis
+
+
+def optimaliseer_week(planner, data, versies, db, start, personen, teller=0, meting=None, budget=TIJDSBUDGET):
+    """Zoals Planner.week, maar ontbrekende dagen komen uit de optimalisatie.
+
+    Bewaarde dagen van de week blijven staan. Samen met de bewaarde dagen tot
+    een venster ervoor en erna vormen ze de geschiedenis voor de herhalingen.
+    """
+    fase = meting.fase if meting is not None else (lambda naam: nullcontext())
+    with fase('toewijzing'):
+        key = ('taken_optimaal', versies['taken'], start.toordinal(), tuple(personen), teller)
+        taak_planning_week = planner.cache.haal_of_bereken(key, lambda: verdeel_taken_optimaal(
+            data['taken'], start, personen, planner.taak_dagen, planning_rng(start.toordinal(), teller), budget,
+            planner.namen,
+        ))
+    with fase('generatie'):
+        dagen = [start + timedelta(days=i) for i in range(7)]
+        keys = [dag.strftime("%Y-%m-%d") for dag in dagen]
+        db.voorlaad(keys)
+        ontbrekend = [dag for dag, dag_key in zip(dagen, keys) if dag_key not in db]
+        if ontbrekend:
+            venster = max([STANDAARD_VENSTER, *VENSTERS.values()])
+            rondom = [start + timedelta(days=i) for i in range(-venster, 7 + venster)]
+            geschiedenis = geschiedenis_uit_db(db, rondom, planner.activiteit_velden)
+
+            opties = planner.opties(data, versies)
+            rngs = [np.random.default_rng(kind) for kind in
+                    planning_seed(start.toordinal(), teller).spawn(len(planner.dag_velden))]
+            gekozen = {
+                veld: kies_waarden([dag.toordinal() for dag in ontbrekend], opties[veld], geschiedenis.get(veld, {}),
+                                   VENSTERS.get(veld, STANDAARD_VENSTER), rng, budget / len(planner.dag_velden))
+                for veld, rng in zip(planner.dag_velden, rngs)
+            }
+            for i, dag in enumerate(ontbrekend):
+                planning = {
+                    "datum": dag.strftime('%A %d %B %Y'),
+                    "dag_kort": dag.strftime('%a %d/%m'),
+                    "eten": gekozen['eten'][i],
+                }
+                planning.update(taken_per_dag(dag, taak_planning_week, planner.taak_dagen))
+                planning.update({veld: gekozen[veld][i] for veld in planner.activiteit_velden})
+                db[dag.strftime("%Y-%m-%d")] = planning
+        planning = [db[dag_key] for dag_key in keys]
+    return planning, taak_planning_week
@@ -0,0 +1,455 @@
+"""Planningslogica zonder Streamlit, zodat ze ook in benchmarks bruikbaar is."""
+import unicodedata
+from contextlib import nullcontext
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Aantal dagen dat een taak na uitvoering niet meer ingepland wordt
+FREQUENTIE_DAGEN = pd.Series({
+    'Wekelijks': 7,
+    'Maandelijks': 30,
+    '3-maadelijks': 90,
+    'Half jaarlijks': 182,
+    'Jaarlijks': 365,
+    'Om de 5 jaar': 1825,
+})
+EFFORT_SCORES = pd.Series({'Laag': 1, 'Gemiddeld': 2, 'Hoog': 3})
+
+# Kolom met de eerstvolgende datum waarop een taak weer mag (NaT = altijd)
+VOLGENDE_KOLOM = '_Volgende_Datum'
+
+
+def volgende_datums(taken_df):
+    """Laatst_Uitgevoerd + frequentie, gevectoriseerd over de hele kolom"""
+    if 'Laatst_Uitgevoerd' not in taken_df.columns:
+        return pd.Series(pd.NaT, index=taken_df.index, dtype='datetime64[ns]')
+    laatst = pd.to_datetime(taken_df['Laatst_Uitgevoerd'].astype(str), format="%Y-%m-%d", errors='coerce')
+    dagen = taken_df['Frequentie'].map(FREQUENTIE_DAGEN)
+    # Onbekende frequentie (bv. Eenmalig) of geen geldige datum: NaT, dus altijd toegelaten
+    return laatst + pd.to_timedelta(dagen, unit='D')
+
+
+def met_volgende_datum(taken_df):
+    """Voegt de (cachebare) kolom met de eerstvolgende toegelaten datum toe"""
+    taken_df[VOLGENDE_KOLOM] = volgende_datums(taken_df)
+    return taken_df
+
+
+def beschikbaar_masker(taken_df, referentiedatum):
+    """Booleaans masker van taken die op referentiedatum (opnieuw) ingepland mogen worden"""
+    if VOLGENDE_KOLOM in taken_df.columns:
+        volgende = taken_df[VOLGENDE_KOLOM]
+    else:
+        volgende = volgende_datums(taken_df)
+    referentie = np.datetime64(pd.Timestamp(referentiedatum).normalize())
+    return volgende.isna().to_numpy() | (volgende.to_numpy() <= referentie)
+
+
+def effort_scores(efforts):
+    return efforts.map(EFFORT_SCORES)
+
+
+# Toegelaten combinaties van efforts per persoon per week. Een kandidaat wordt,
+# net zoals vroeger, alfabetisch gesorteerd en dan letterlijk in deze lijst
+# opgezocht; combinaties die zo niet gesorteerd staan worden dus nooit bereikt.
+TOEGELATEN_EFFORTS = frozenset(map(tuple, [
+    ["Laag"], ["Laag", "Laag"], ["Laag", "Hoog"], ["Laag", "Gemiddeld"],
+    ["Gemiddeld", "Gemiddeld"], ["Laag", "Laag", "Laag"],
+    ["Laag", "Laag", "Hoog"], ["Gemiddeld", "Gemiddeld", "Laag"],
+]))
+MAX_TAKEN_PER_PERSOON = 3
+
+# add_to_taken_sheet schrijft de persoon als vierde waarde van de rij
+PERSOON_KOLOM_INDEX = 3
+# Persoon-waarden van taken die iedereen mag doen; oudere rijen zeggen nog "beiden"
+IEDEREEN = "iedereen"
+GEDEELD = (IEDEREEN, "beiden")
+
+
+def _bouw_overgangen(toegelaten, efforts):
+    """Kleine toestandsmachine: (huidige efforts, nieuwe effort) -> volgende toestand"""
+    overgangen, te_bezoeken = {}, [()]
+    while te_bezoeken:
+        toestand = te_bezoeken.pop()
+        for effort in efforts:
+            volgende = tuple(sorted(toestand + (effort,)))
+            if volgende in toegelaten:
+                if volgende not in overgangen:
+                    te_bezoeken.append(volgende)
+                overgangen.setdefault(toestand, {})[effort] = volgende
+    return overgangen
+
+OVERGANGEN = _bouw_overgangen(TOEGELATEN_EFFORTS, EFFORT_SCORES.index)
+
+
+def normaliseer_naam(naam):
+    """'Cédric' -> 'cedric', zodat het overeenkomt met de sleutels in `personen`"""
+    naam = unicodedata.normalize('NFKD', str(naam))
+    return ''.join(c for c in naam if not unicodedata.combining(c)).strip().lower()
+
+
+def taak_eigenaars(taken_df, personen, namen=None):
+    """Per taak de persoon (id) aan wie ze vastzit, of None als iedereen ze mag doen ("iedereen").
+
+    De persoon-kolom mag een id of een naam uit `namen` ({id: naam}) bevatten,
+    want het takenformulier schrijft de naam. Geeft None terug als de
+    Taken-tabel geen persoon-kolom heeft.
+    """
+    kolommen = taken_df.columns
+    if len(kolommen) <= PERSOON_KOLOM_INDEX or kolommen[PERSOON_KOLOM_INDEX] in ('Laatst_Uitgevoerd', VOLGENDE_KOLOM):
+        return None
+    gekend = {normaliseer_naam(p): p for p in personen}
+    gekend.update({normaliseer_naam(naam): p for p, naam in (namen or {}).items() if p in personen})
+    for gedeeld in GEDEELD:
+        gekend.pop(gedeeld, None)
+    waarden = taken_df.iloc[:, PERSOON_KOLOM_INDEX]
+    # Enkel de unieke waarden normaliseren; meestal zijn dat er maar een handvol
+    per_waarde = {w: gekend.get(normaliseer_naam(w)) for w in waarden.unique()}
+    return waarden.map(per_waarde).to_numpy(dtype=object)
+
+
+def wijs_taken_toe(taken_df, personen_volgorde, eigenaars=None):
+    """Verdeelt (al geschudde) taken over de personen: {persoon: [taakrecord, ...]}"""
+    gekozen = kies_taak_posities(taken_df, personen_volgorde, eigenaars)
+    # Enkel voor de gekozen taken worden records opgebouwd
+    return {persoon: taken_df.take(posities).to_dict('records') for persoon, posities in gekozen.items()}
+
+
+def kies_taak_posities(taken_df, personen_volgorde, eigenaars=None):
+    """Kiest per persoon de posities van zijn taken, in O(aantal taken).
+
+    Elke persoon krijgt, net zoals de vroegere iterrows-lus, telkens de
+    eerstvolgende taak in de lijst die zijn effort-combinatie toegelaten
+    houdt. De taken zitten daarvoor per (effort, eigenaar) in buckets met
+    posities in volgorde, zodat we nooit een volledige rij moeten opbouwen.
+    """
+    namen = taken_df['Taak'].array
+    efforts = taken_df['Effort']
+
+    # Enkel efforts die in een toegelaten combinatie kunnen voorkomen krijgen een bucket
+    buckets = {}
+    for effort in {e for volgende in OVERGANGEN.values() for e in volgende}:
+        posities = np.flatnonzero((efforts == effort).to_numpy())
+        if eigenaars is None:
+            buckets[(effort, None)] = posities.tolist()
+            continue
+        for eigenaar in pd.unique(eigenaars[posities]):
+            if pd.isna(eigenaar):
+                eigenaar, masker = None, pd.isna(eigenaars[posities])
+            else:
+                masker = eigenaars[posities] == eigenaar
+            buckets[(effort, eigenaar)] = posities[masker].tolist()
+
+    gekozen = {persoon: [] for persoon in personen_volgorde}
+    toegewezen = set()
+
+    for persoon in personen_volgorde:
+        wijzers = {}
+        toestand, laatste = (), -1
+        while len(toestand) < MAX_TAKEN_PER_PERSOON:
+            beste = None
+            for effort in OVERGANGEN.get(toestand, {}):
+                for bucket_key in ((effort, None), (effort, persoon)):
+                    bucket = buckets.get(bucket_key)
+                    if not bucket:
+                        continue
+                    i = wijzers.get(bucket_key, 0)
+                    while i < len(bucket) and (bucket[i] <= laatste or namen[bucket[i]] in toegewezen):
+                        i += 1
+                    wijzers[bucket_key] = i
+                    if i < len(bucket) and (beste is None or bucket[i] < beste[0]):
+                        beste = (bucket[i], effort)
+            if beste is None:
+                break
+            positie, effort = beste
+            gekozen[persoon].append(positie)
+            toegewezen.add(namen[positie])
+            toestand, laatste = OVERGANGEN[toestand][effort], positie
+    return gekozen
+
+
+# Weekdagen (0=ma, ..., 6=zo) waarop iemand zijn taken van de week doet
+TAAK_DAGEN = {
+    'cedric': [1, 3, 5],  # di, do, za
+    'lise': [0, 2, 4],    # ma, wo, vr
+}
+ACTIVITEIT_VELDEN = {'cedric': 'act_cedric', 'lise': 'act_lise', 'kids': 'act_kids', 'all': 'act_cedric'}
+
+
+class PlanningOpties:
+    """De keuzelijsten uit de sheets, één keer omgezet naar NumPy arrays"""
+
+    def __init__(self, data, activiteit_velden=ACTIVITEIT_VELDEN):
+        self.lijsten = {'eten': data['eten'].iloc[:, 0].to_numpy(dtype=object)}
+        for veld, key in activiteit_velden.items():
+            self.lijsten[veld] = data[key]['Activiteiten'].to_numpy(dtype=object)
+
+    def __getitem__(self, veld):
+        return self.lijsten[veld]
+
+    @property
+    def activiteit_velden(self):
+        return [veld for veld in self.lijsten if veld != 'eten']
+
+
+def taken_per_dag(dag, taak_planning_week, taak_dagen=TAAK_DAGEN):
+    """Welke taak elke persoon op `dag` doet, als {'taak_<persoon>': naam of ""}"""
+    resultaat = {}
+    for persoon, dagen in taak_dagen.items():
+        taken = taak_planning_week.get(persoon, [])
+        resultaat[f"taak_{persoon}"] = ""
+        if dag.weekday() in dagen:
+            index = dagen.index(dag.weekday())
+            if index < len(taken):
+                resultaat[f"taak_{persoon}"] = taken[index]['Taak']
+    return resultaat
+
+
+class HorizonPlanning:
+    """Planning over meerdere weken in compacte vorm.
+
+    Per veld (eten en de activiteitvelden) een int-array met posities in de
+    optielijsten (-1 = lege lijst), en per persoon een array met taaknamen.
+    """
+
+    def __init__(self, datums, opties, indices, taken):
+        self.datums = datums
+        self.opties = opties
+        self.indices = indices
+        self.taken = taken
+
+    def __len__(self):
+        return len(self.datums)
+
+    def waarden(self, veld):
+        lijst = self.opties[veld]
+        indices = self.indices[veld]
+        if not len(lijst):
+            return np.full(len(indices), "", dtype=object)
+        return lijst[indices]
+
+    def dag(self, i):
+        """Eén dag in hetzelfde formaat als generate_daily_planning_with_randomness"""
+        dag = pd.Timestamp(self.datums[i]).date()
+        planning = {
+            "datum": dag.strftime('%A %d %B %Y'),
+            "dag_kort": dag.strftime('%a %d/%m'),
+            "eten": self.waarden('eten')[i],
+        }
+        planning.update({veld: namen[i] for veld, namen in self.taken.items()})
+        planning.update({veld: self.waarden(veld)[i] for veld in self.opties.activiteit_velden})
+        return planning
+
+def plan_horizon(start, aantal_dagen, opties, taken_df, personen, teller=0, taak_dagen=TAAK_DAGEN, namen=None):
+    """Plant `aantal_dagen` dagen vanaf `start` in één keer.
+
+    Eten en activiteiten komen uit dezelfde stromen per (datum, teller) als
+    Planner.dag, en de taken van elke week uit dezelfde stroom als
+    Planner.week_taken, zodat het weekrooster later dezelfde dagen toont;
+    daarom blijft het trekken één Generator per dag en veld.
+    Een ingeplande taak telt als uitgevoerd op zijn dag, zodat ze de
+    volgende weken pas terugkomt volgens haar frequentie.
+    """
+    start = pd.Timestamp(start).normalize()
+    datums = np.datetime64(start, 'D') + np.arange(aantal_dagen)
+    velden = tuple(opties.lijsten)  # zelfde volgorde als Planner.dag_velden
+    indices = {veld: np.full(aantal_dagen, -1) for veld in velden}
+    for i in range(aantal_dagen):
+        rngs = dag_rngs(start + pd.Timedelta(days=i), teller, velden)
+        for veld, lijst in opties.lijsten.items():
+            if len(lijst):
+                indices[veld][i] = rngs[veld].integers(len(lijst))
+
+    taken = {f"taak_{persoon}": np.full(aantal_dagen, "", dtype=object) for persoon in taak_dagen}
+    volgende = volgende_datums(taken_df).to_numpy(dtype='datetime64[D]')
+    frequentie_dagen = taken_df['Frequentie'].map(FREQUENTIE_DAGEN).to_numpy()
+    eigenaars = taak_eigenaars(taken_df, personen, namen)
+    taak_namen = taken_df['Taak'].to_numpy(dtype=object)
+    nog_open = np.ones(len(taken_df), dtype=bool)
+
+    for week_start in range(0, aantal_dagen, 7):
+        referentie = datums[week_start]
+        rng = planning_rng((start + pd.Timedelta(days=week_start)).toordinal(), teller)
+        masker = nog_open & (np.isnat(volgende) | (volgende <= referentie))
+        posities = np.flatnonzero(masker)[rng.permutation(int(masker.sum()))]
+        volgorde = [personen[i] for i in rng.permutation(len(personen))]
+        week_eigenaars = None if eigenaars is None else eigenaars[posities]
+        verdeling = kies_taak_posities(taken_df.iloc[posities], volgorde, week_eigenaars)
+
+        for persoon, dagen in taak_dagen.items():
+            for week_positie, weekdag in zip(verdeling.get(persoon, []), dagen):
+                # Eerste dag vanaf week_start die op de juiste weekdag valt
+                verschuiving = (weekdag - pd.Timestamp(referentie).weekday()) % 7
+                dag_index = week_start + verschuiving
+                if dag_index >= aantal_dagen:
+                    continue
+                positie = posities[week_positie]
+                taken[f"taak_{persoon}"][dag_index] = taak_namen[positie]
+                if np.isnan(frequentie_dagen[positie]):
+                    nog_open[positie] = False  # eenmalige taak: niet opnieuw plannen
+                else:
+                    volgende[positie] = datums[dag_index] + int(frequentie_dagen[positie])
+
+    return HorizonPlanning(datums, opties, indices, taken)
+
+
+# Vaste volgorde van de velden die per dag getrokken worden; elk veld krijgt
+# zijn eigen kind-stroom, zodat bv. een andere eetlijst de activiteiten niet verschuift
+DAG_VELDEN = ('eten', 'cedric', 'lise', 'kids', 'all')
+
+
+def planning_seed(*sleutel):
+    """SeedSequence voor een sleutel zoals (datum.toordinal(), planning_counter)"""
+    return np.random.SeedSequence([int(deel) for deel in sleutel])
+
+
+def planning_rng(*sleutel):
+    """Eigen numpy Generator per sleutel: raakt de globale `random`-toestand niet"""
+    return np.random.default_rng(planning_seed(*sleutel))
+
+
+def dag_rngs(dag, teller=0, velden=DAG_VELDEN):
+    """Eén onafhankelijke Generator per veld in `velden` voor deze dag"""
+    kinderen = planning_seed(dag.toordinal(), teller).spawn(len(velden))
+    return {veld: np.random.default_rng(kind) for veld, kind in zip(velden, kinderen)}
+
+
+def kies(rng, lijst):
+    """Willekeurig element uit een optielijst, of "" als de lijst leeg is"""
+    return lijst[rng.integers(len(lijst))] if len(lijst) else ""
+
+
+def generate_daily_planning_with_randomness(dag, data, taak_planning_week, seed_offset=0, opties=None):
+    """Aangepaste versie met randomness voor variatie in planning"""
+    
+    # Eigen RNG-stroom per (datum, offset) en per veld: deterministisch en thread-safe,
+    # zonder de globale random-toestand van andere sessies te raken
+    rngs = dag_rngs(dag, seed_offset)
+    
+    # Keuzelijsten bij voorkeur één keer per rerun omzetten, niet per dag
+    opties = opties or PlanningOpties(data)
+    taken = taken_per_dag(dag, taak_planning_week)
+
+    return {
+        "datum": dag.strftime('%A %d %B %Y'),
+        "dag_kort": dag.strftime('%a %d/%m'),
+        "eten": kies(rngs['eten'], opties['eten']),  # Random eten ipv gebaseerd op dag
+        "taak_lise": taken['taak_lise'],
+        "taak_cedric": taken['taak_cedric'],
+        "cedric": kies(rngs['cedric'], opties['cedric']),  # Random activiteit
+        "lise": kies(rngs['lise'], opties['lise']),        # Random activiteit
+        "kids": kies(rngs['kids'], opties['kids']),        # Random activiteit
+        "all": kies(rngs['all'], opties['all']),           # Random activiteit
+    }
+
+
+def verdeel_taken_per_persoon_with_shuffle(taken_df, referentiedatum, personen, shuffle_seed=None, namen=None):
+    """Aangepaste versie die taken shuffelt voor meer variatie"""
+    
+    # shuffle_seed mag een getal of een tuple zijn, bv. (startdatum, planning_counter)
+    if shuffle_seed is None:
+        rng = np.random.default_rng()
+    else:
+        rng = planning_rng(*np.atleast_1d(shuffle_seed))
+    
+    # Gevectoriseerd: één masker over de hele Taken-tabel i.p.v. een apply per rij
+    df = taken_df[beschikbaar_masker(taken_df, referentiedatum)].copy()
+    df['Effort_Score'] = effort_scores(df['Effort'])
+    
+    # Shuffle de taken voor meer variatie
+    df = df.iloc[rng.permutation(len(df))].reset_index(drop=True)
+
+    # Shuffle ook de personen volgorde
+    personen_shuffled = [personen[i] for i in rng.permutation(len(personen))]
+
+    # Taken met een vaste persoon ("Lise"/"Cédric") gaan enkel naar die persoon
+    planning = wijs_taken_toe(df, personen_shuffled, taak_eigenaars(df, personen, namen))
+    return {persoon: planning[persoon] for persoon in personen}
+
+
+class Planner:
+    """Gememoiseerde planning per (dataversie, datum, planning_counter).
+
+    Zolang de Taken-data niet wijzigt, hergebruiken reruns de takenverdeling
+    van de week. Dagvelden worden apart onthouden per tabblad waaruit ze
+    komen: als enkel Eten wijzigt, wordt enkel het eten opnieuw getrokken.
+    """
+
+    def __init__(self, cache, taak_dagen=TAAK_DAGEN, activiteit_velden=ACTIVITEIT_VELDEN, namen=None):
+        self.cache = cache
+        self.taak_dagen = taak_dagen
+        self.namen = namen  # {id: naam} van de leden, om de persoon-kolom van Taken te lezen
+        self.activiteit_velden = activiteit_velden
+        # Voor het standaardhuishouden gelijk aan DAG_VELDEN, dus dezelfde RNG-stromen
+        self.dag_velden = ('eten',) + tuple(activiteit_velden)
+
+    def opties(self, data, versies):
+        key = ('opties',) + tuple(sorted(versies.items()))
+        return self.cache.haal_of_bereken(key, lambda: PlanningOpties(data, self.activiteit_velden))
+
+    def week_taken(self, taken_df, taken_versie, start, personen, teller=0):
+        key = ('taken', taken_versie, start.toordinal(), tuple(personen), teller)
+        return self.cache.haal_of_bereken(key, lambda: verdeel_taken_per_persoon_with_shuffle(
+            taken_df, start, personen, shuffle_seed=(start.toordinal(), teller), namen=self.namen
+        ))
+
+    def _veld(self, veld, versie, dag, teller, opties):
+        key = ('veld', veld, versie, dag.toordinal(), teller)
+        return self.cache.haal_of_bereken(key, lambda: kies(dag_rngs(dag, teller, self.dag_velden)[veld], opties[veld]))
+
+    def dag(self, dag, data, versies, taak_planning_week, teller=0):
+        """Zelfde resultaat als generate_daily_planning_with_randomness(..., seed_offset=teller)"""
+        opties = self.opties(data, versies)
+        planning = {
+            "datum": dag.strftime('%A %d %B %Y'),
+            "dag_kort": dag.strftime('%a %d/%m'),
+            "eten": self._veld('eten', versies['eten'], dag, teller, opties),
+        }
+        planning.update(taken_per_dag(dag, taak_planning_week, self.taak_dagen))
+        for veld, key in self.activiteit_velden.items():
+            planning[veld] = self._veld(veld, versies[key], dag, teller, opties)
+        return planning
+
+    def horizon(self, data, versies, db, start, aantal_dagen, personen, teller=0):
+        """{dag_key: dagplan} voor `aantal_dagen` dagen vanaf `start`: bewaarde dagen uit `db`, de rest via plan_horizon.
+
+        Enkel een voorbeeld: `db` blijft ongewijzigd tot leg_vast de nieuwe dagen bewaart.
+        """
+        horizon = plan_horizon(start, aantal_dagen, self.opties(data, versies), data['taken'], personen,
+                               teller, self.taak_dagen, self.namen)
+        keys = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(aantal_dagen)]
+        db.voorlaad(keys)
+        return {dag_key: db[dag_key] if dag_key in db else horizon.dag(i) for i, dag_key in enumerate(keys)}
+
+    def leg_vast(self, db, dagen):
+        """Zet de dagen uit `dagen` die nog niet in `db` staan erin, zodat het weekrooster ze later toont.
+
+        Geeft {dag_key: dagplan} van de nieuw bewaarde dagen terug.
+        """
+        db.voorlaad(list(dagen))
+        nieuw = {dag_key: planning for dag_key, planning in dagen.items() if dag_key not in db}
+        for dag_key, planning in nieuw.items():
+            db[dag_key] = planning
+        return nieuw
+
+    def week(self, data, versies, db, start, personen, teller=0, meting=None):
+        """De zeven dagplannen vanaf `start`: bewaarde dagen uit `db`, ontbrekende nieuw gepland.
+
+        Dit is wat main.py bij elke rerun doet, zonder Streamlit. `meting` (een
+        metrics.Rerun) krijgt de fasen 'toewijzing' en 'generatie'.
+        """
+        fase = meting.fase if meting is not None else (lambda naam: nullcontext())
+        with fase('toewijzing'):
+            taak_planning_week = self.week_taken(data['taken'], versies['taken'], start, personen, teller)
+        with fase('generatie'):
+            dagen = [start + timedelta(days=i) for i in range(7)]
+            keys = [dag.strftime("%Y-%m-%d") for dag in dagen]
+            db.voorlaad(keys)
+            planning = []
+            for dag, dag_key in zip(dagen, keys):
+                if dag_key not in db:
+                    db[dag_key] = self.dag(dag, data, versies, taak_planning_week, teller)
+                planning.append(db[dag_key])
+        return planning, taak_planning_week
@@ -0,0 +1,260 @@
+import threading
+import time
+from collections import Counter
+
+import pandas as pd
+from gspread.exceptions import APIError, GSpreadException, WorksheetNotFound
+from gspread.utils import fill_gaps, numericise_all, to_records
+
+# Tabbladen die de planner nodig heeft: sleutel in `data` -> naam van het tabblad
+TABBLADEN = {
+    'eten': "Eten",
+    'taken': "Taken",
+    'act_cedric': "Activiteiten Cédric",
+    'act_lise': "Activiteiten Lise",
+    'act_kids': "Activiteiten kids",
+}
+
+def records_dataframe(waarden):
+    """Zet ruwe celwaarden (eerste rij = koppen) om zoals get_all_records dat doet"""
+    if not waarden or waarden == [[]]:
+        return pd.DataFrame()
+    waarden = fill_gaps(waarden)
+    koppen, rijen = waarden[0], waarden[1:]
+    dubbel = [kop for kop, aantal in Counter(koppen).items() if aantal > 1]
+    if dubbel:
+        # get_all_records weigert dit ook: met dict(zip(...)) zou de laatste kolom stil winnen
+        raise GSpreadException(f"the header row in the worksheet contains duplicates: {dubbel}")
+    return pd.DataFrame(to_records(koppen, [numericise_all(rij) for rij in rijen]))
+
+def inhoud_versie(df):
+    """Hash over de volledige inhoud van een tabblad, rijvolgorde inbegrepen"""
+    if df.empty:
+        return hash(tuple(df.columns))
+    # Rijhashes in volgorde: een gesorteerd tabblad krijgt een andere versie
+    return hash((tuple(df.columns), pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()))
+
+def haal_waarden(spreadsheet, tabbladen=TABBLADEN):
+    """Ruwe celwaarden van alle tabbladen in één batchGet i.p.v. één request per tabblad"""
+    bereiken = [f"'{naam}'" for naam in tabbladen.values()]
+    antwoord = spreadsheet.values_batch_get(bereiken)
+    value_ranges = antwoord.get('valueRanges', [])
+    return {key: value_range.get('values', []) for key, value_range in zip(tabbladen, value_ranges)}
+
+def laad_tabbladen(spreadsheet, tabbladen=TABBLADEN):
+    """Haalt alle tabbladen op in één batchGet en zet ze om naar DataFrames"""
+    return {key: records_dataframe(waarden) for key, waarden in haal_waarden(spreadsheet, tabbladen).items()}
+
+
+class TokenEmmer:
+    """Token bucket: hoogstens `tempo` requests per seconde, met pieken tot `capaciteit`.
+
+    Gedeeld door alle huishoudens die dezelfde client gebruiken, zodat samen
+    binnen het quotum van het service account gebleven wordt.
+    """
+
+    def __init__(self, tempo=1.0, capaciteit=10):
+        self.tempo = tempo
+        self.capaciteit = capaciteit
+        self._tokens = float(capaciteit)
+        self._laatst = time.monotonic()
+        self._lock = threading.Lock()
+        self.gewacht = 0.0  # totale wachttijd in seconden
+
+    def neem(self):
+        """Blokkeert tot er een token vrij is"""
+        with self._lock:
+            nu = time.monotonic()
+            self._tokens = min(self.capaciteit, self._tokens + (nu - self._laatst) * self.tempo)
+            self._laatst = nu
+            self._tokens -= 1
+            # Negatief saldo: deze aanvrager wacht tot zijn token aangegroeid is
+            wachten = -self._tokens / self.tempo if self._tokens < 0 else 0.0
+            self.gewacht += wachten
+        if wachten:
+            time.sleep(wachten)
+
+    def begrens(self, client):
+        """Laat elke request van `client` (gspread Client of FakeClient) eerst een token nemen"""
+        if hasattr(client, 'http_client'):
+            origineel = client.http_client.request
+
+            def request(*args, **kwargs):
+                self.neem()
+                return origineel(*args, **kwargs)
+
+            client.http_client.request = request
+        else:
+            origineel = client._request
+
+            def _request(operatie):
+                self.neem()
+                return origineel(operatie)
+
+            client._request = _request
+        return client
+
+
+class TabbladCache:
+    """Cache per tabblad met een eigen TTL en gerichte invalidatie.
+
+    `laad_functie` krijgt een dict {key: tabbladnaam} met enkel de tabbladen
+    die ontbreken of verlopen zijn, en haalt die samen in één batch op.
+    `verwerkers` ({key: functie(df) -> df}) voegen afgeleide kolommen toe die
+    zo mee gecachet worden.
+    """
+
+    def __init__(self, laad_functie, ttl=300, tabbladen=TABBLADEN, verwerkers=None):
+        self._laad = laad_functie
+        self._verwerkers = verwerkers or {}
+        self._ttl = ttl if isinstance(ttl, dict) else {key: ttl for key in tabbladen}
+        self.tabbladen = dict(tabbladen)
+        self._items = {}  # key -> (dataframe, geladen_op)
+        self._versies = {}  # key -> hash van de inhoud, wijzigt bij elke mutatie
+        self._lock = threading.RLock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def _geldig(self, key, nu):
+        if key not in self._items:
+            return False
+        ttl = self._ttl.get(key)
+        return ttl is None or nu - self._items[key][1] < ttl
+
+    def haal_op(self, keys=None):
+        """Geeft {key: dataframe} terug en laadt enkel wat ontbreekt of verlopen is"""
+        keys = list(keys or self.tabbladen)
+        with self._lock:
+            nu = time.monotonic()
+            te_laden = {key: self.tabbladen[key] for key in keys if not self._geldig(key, nu)}
+            for key in keys:
+                (self.misses if key in te_laden else self.hits)[key] += 1
+            if te_laden:
+                for key, df in self._laad(te_laden).items():
+                    self._versies[key] = inhoud_versie(df)
+                    self._items[key] = (self._verwerk(key, df), nu)
+            return {key: self._items[key][0] for key in keys}
+
+    def frame(self, key):
+        """De gecachte DataFrame van `key` zonder te laden, of None"""
+        with self._lock:
+            item = self._items.get(key)
+            return item[0] if item else None
+
+    def versies(self, keys=None):
+        """Huidige dataversie per tabblad; gelijke inhoud geeft dezelfde versie"""
+        with self._lock:
+            return {key: self._versies.get(key) for key in (keys or self.tabbladen)}
+
+    def _bump(self, key, *wijziging):
+        self._versies[key] = hash((self._versies.get(key),) + tuple(str(w) for w in wijziging))
+
+    def _verwerk(self, key, df):
+        if key in self._verwerkers and not df.columns.empty:
+            return self._verwerkers[key](df)
+        return df
+
+    def invalideer(self, *keys):
+        """Vergeet de opgegeven tabbladen (of alles als er geen opgegeven zijn)"""
+        with self._lock:
+            for key in keys or list(self._items):
+                self._items.pop(key, None)
+
+    def voeg_rij_toe(self, key, waarden):
+        """Past een toegevoegde rij meteen toe op de gecachte DataFrame, zonder herladen"""
+        with self._lock:
+            if key not in self._items:
+                return
+            df, geladen_op = self._items[key]
+            if df.columns.empty:
+                # Zonder koppen weten we niet waar de waarden horen: gewoon herladen
+                self._items.pop(key)
+                return
+            rij = numericise_all([str(w) for w in waarden])
+            rij += [""] * (len(df.columns) - len(rij))
+            df.loc[len(df)] = rij[:len(df.columns)]
+            self._verwerk(key, df)
+            self._bump(key, 'append', *waarden)
+
+    def werk_cel_bij(self, key, positie, kolom, waarde):
+        """Past één cel (0-gebaseerde rij, kolomnaam) in de gecachte DataFrame aan"""
+        with self._lock:
+            if key not in self._items:
+                return
+            df, geladen_op = self._items[key]
+            df.at[df.index[positie], kolom] = waarde
+            self._verwerk(key, df)
+            self._bump(key, 'update', positie, kolom, waarde)
+
+    def verwijder_rij(self, key, positie):
+        """Verwijdert een rij (0-gebaseerd, zonder koprij) uit de gecachte DataFrame"""
+        with self._lock:
+            if key in self._items:
+                df, geladen_op = self._items[key]
+                df = df.drop(index=df.index[positie]).reset_index(drop=True)
+                self._items[key] = (df, geladen_op)
+                self._bump(key, 'delete', positie)
+
+
+def is_verouderd(fout):
+    """True als de fout erop wijst dat een bewaarde handle niet meer klopt"""
+    if isinstance(fout, WorksheetNotFound):
+        return True
+    # 404: tabblad verwijderd, 400: bereik van een hernoemd tabblad niet meer te parsen
+    return isinstance(fout, APIError) and fout.code in (400, 404)
+
+
+class SheetRegister:
+    """Bewaart Spreadsheet/Worksheet handles zodat ze niet bij elke rerun heropend worden.
+
+    Een handle wordt pas (her)opend wanneer hij voor het eerst nodig is of
+    wanneer een API-call aangeeft dat hij verouderd is.
+    """
+
+    def __init__(self, client, spreadsheet_naam):
+        self._client = client
+        self.spreadsheet_naam = spreadsheet_naam
+        self._spreadsheet = None
+        self._worksheets = {}
+        self._lock = threading.RLock()
+        self.geopend = Counter()   # metadata-calls die echt gebeurd zijn
+        self.vermeden = Counter()  # opens die uit het register kwamen
+
+    def spreadsheet(self):
+        with self._lock:
+            if self._spreadsheet is None:
+                self._spreadsheet = self._client.open(self.spreadsheet_naam)
+                self.geopend['spreadsheet'] += 1
+            else:
+                self.vermeden['spreadsheet'] += 1
+            return self._spreadsheet
+
+    def worksheet(self, naam):
+        with self._lock:
+            if naam not in self._worksheets:
+                self._worksheets[naam] = self.spreadsheet().worksheet(naam)
+                self.geopend[naam] += 1
+            else:
+                self.vermeden[naam] += 1
+            return self._worksheets[naam]
+
+    def vernieuw(self, naam=None):
+        """Vergeet één worksheet handle, of alle handles als er geen naam is"""
+        with self._lock:
+            if naam is None:
+                self._spreadsheet = None
+                self._worksheets.clear()
+            else:
+                self._worksheets.pop(naam, None)
+
+    def voer_uit(self, actie, naam=None):
+        """Roept actie(handle) aan en probeert één keer opnieuw met een verse handle"""
+        handle = self.worksheet(naam) if naam else self.spreadsheet()
+        try:
+            return actie(handle)
+        except Exception as fout:
+            if not is_verouderd(fout):
+                raise
+            self.vernieuw(naam)
+            handle = self.worksheet(naam) if naam else self.spreadsheet()
+            return actie(handle)
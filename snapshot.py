@@ -0,0 +1,165 @@
+"""Offline-first: alle tabbladen lokaal in SQLite, bijgewerkt door een achtergrondthread.
+
+De app leest enkel uit de snapshot en wacht dus nooit op het netwerk (behalve
+bij de allereerste start, als er nog niets op schijf staat). `SnapshotSync`
+controleert periodiek de revisie van de spreadsheet en haalt de tabbladen
+pas op als die veranderd is; enkel tabbladen met andere inhoud worden in de
+snapshot en de TabbladCache vervangen.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from databank import verbind
+from sheets import TABBLADEN, haal_waarden, records_dataframe
+
+
+def inhoud_hash(waarden):
+    """Stabiele hash (ook over processen heen) van de ruwe celwaarden"""
+    return hashlib.sha1(json.dumps(waarden).encode()).hexdigest()
+
+
+class Snapshot:
+    def __init__(self, pad):
+        self.pad = pad
+        with verbind(self.pad) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tabbladen "
+                "(key TEXT PRIMARY KEY, waarden TEXT NOT NULL, inhoud TEXT NOT NULL, opgehaald_op REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (sleutel TEXT PRIMARY KEY, waarde TEXT)")
+
+    def lees(self, keys):
+        """{key: ruwe waarden} voor de tabbladen die al in de snapshot staan"""
+        keys = list(keys)
+        with verbind(self.pad) as conn:
+            rijen = conn.execute(
+                f"SELECT key, waarden FROM tabbladen WHERE key IN ({','.join('?' * len(keys))})", keys,
+            ).fetchall()
+        return {key: json.loads(waarden) for key, waarden in rijen}
+
+    def schrijf(self, waarden_per_key, revisie):
+        """Bewaart de opgehaalde tabbladen en geeft de keys terug waarvan de inhoud veranderde"""
+        nu = time.time()
+        with verbind(self.pad) as conn:
+            oud = dict(conn.execute("SELECT key, inhoud FROM tabbladen").fetchall())
+            gewijzigd = set()
+            for key, waarden in waarden_per_key.items():
+                inhoud = inhoud_hash(waarden)
+                if oud.get(key) != inhoud:
+                    gewijzigd.add(key)
+                    conn.execute("INSERT OR REPLACE INTO tabbladen VALUES (?, ?, ?, ?)",
+                                 (key, json.dumps(waarden), inhoud, nu))
+            self._zet_meta(conn, revisie=revisie, gecontroleerd_op=nu)
+        return gewijzigd
+
+    def _zet_meta(self, conn, **waarden):
+        conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [(k, str(v)) for k, v in waarden.items()])
+
+    def _meta(self, sleutel):
+        with verbind(self.pad) as conn:
+            rij = conn.execute("SELECT waarde FROM meta WHERE sleutel = ?", (sleutel,)).fetchone()
+        return rij[0] if rij else None
+
+    @property
+    def revisie(self):
+        return self._meta('revisie')
+
+    @property
+    def gecontroleerd_op(self):
+        """Tijdstip (epoch) waarop de snapshot laatst met de spreadsheet vergeleken werd"""
+        waarde = self._meta('gecontroleerd_op')
+        return float(waarde) if waarde else None
+
+    def markeer_gecontroleerd(self):
+        with verbind(self.pad) as conn:
+            self._zet_meta(conn, gecontroleerd_op=time.time())
+
+
+class SnapshotSync:
+    """Houdt een Snapshot en een TabbladCache bij vanuit de spreadsheet.
+
+    `laad` is bedoeld als laadfunctie van de TabbladCache: die leest dan
+    enkel van schijf. Openstaande schrijfacties worden eerst geflusht; zijn
+    er na het ophalen nieuwe bijgekomen, dan blijft de cache (die ze al
+    lokaal toepaste) staan tot de volgende ronde.
+    """
+
+    def __init__(self, register, snapshot, cache=None, wachtrij=None, interval=60, tabbladen=TABBLADEN):
+        self.register = register
+        self.snapshot = snapshot
+        self.cache = cache
+        self.wachtrij = wachtrij
+        self.interval = interval
+        self.tabbladen = dict(tabbladen)
+        self.laatste_fout = None
+        self.controles = 0
+        self.ophalingen = 0
+        self._uitgesteld = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def laad(self, tabbladen):
+        """{key: DataFrame} uit de snapshot; enkel wat er nog niet in staat, komt van het netwerk"""
+        waarden = self.snapshot.lees(tabbladen)
+        if len(waarden) < len(tabbladen):
+            self.ververs(forceer=True)
+            waarden = self.snapshot.lees(tabbladen)
+        return {key: records_dataframe(waarden[key]) for key in tabbladen}
+
+    def ververs(self, forceer=False):
+        """Vergelijkt de revisie en haalt bij een wijziging alle tabbladen in één batchGet op.
+
+        Geeft de keys terug waarvan de inhoud veranderde.
+        """
+        # Flushen (met zijn backoff) gebeurt buiten de lock; de wachtrij heeft er zelf een
+        if self.wachtrij is not None:
+            self.wachtrij.flush()
+        with self._lock:
+            self.controles += 1
+            revisie = self.register.voer_uit(lambda spreadsheet: spreadsheet.get_lastUpdateTime())
+            if not forceer and revisie == self.snapshot.revisie:
+                self.snapshot.markeer_gecontroleerd()
+                gewijzigd = set()
+            else:
+                waarden = self.register.voer_uit(lambda spreadsheet: haal_waarden(spreadsheet, self.tabbladen))
+                self.ophalingen += 1
+                gewijzigd = self.snapshot.schrijf(waarden, revisie)
+            self._uitgesteld |= gewijzigd
+            te_invalideren = set()
+            if self.cache is not None and self._uitgesteld and not (self.wachtrij and self.wachtrij.openstaand):
+                te_invalideren, self._uitgesteld = self._uitgesteld, set()
+            self.laatste_fout = None
+        # Pas na het vrijgeven van onze lock: TabbladCache.haal_op neemt de locks in
+        # omgekeerde volgorde (cache-lock, dan via laad() deze lock)
+        if te_invalideren:
+            self.cache.invalideer(*te_invalideren)
+        return gewijzigd
+
+    def leeftijd(self):
+        """Seconden sinds de snapshot laatst met de spreadsheet overeenkwam, of None"""
+        gecontroleerd_op = self.snapshot.gecontroleerd_op
+        return None if gecontroleerd_op is None else max(0.0, time.time() - gecontroleerd_op)
+
+    def _werk(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.ververs()
+            except Exception as fout:
+                # Offline: verder werken met wat op schijf staat
+                self.laatste_fout = fout
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._werk, name="snapshotsync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,158 @@
+"""Takenlijst op naam: rijnummers opzoeken zonder kolomscans of sheet.find."""
+import threading
+from datetime import date
+
+KOLOM_LAATST = 'Laatst_Uitgevoerd'
+EENMALIG = 'Eenmalig'
+
+
+class Fenwick:
+    """Binary indexed tree over 0/1-waarden: hoeveel levende rijen liggen vóór een slot"""
+
+    def __init__(self, aantal=0):
+        self._boom = [0] * (aantal + 1)
+        for i in range(1, aantal + 1):
+            self._boom[i] += 1
+            ouder = i + (i & -i)
+            if ouder <= aantal:
+                self._boom[ouder] += self._boom[i]
+
+    def __len__(self):
+        return len(self._boom) - 1
+
+    def wijzig(self, slot, delta):
+        i = slot + 1
+        while i < len(self._boom):
+            self._boom[i] += delta
+            i += i & -i
+
+    def som(self, slot):
+        """Som van de slots [0, slot)"""
+        totaal = 0
+        while slot > 0:
+            totaal += self._boom[slot]
+            slot -= slot & -slot
+        return totaal
+
+    def voeg_toe(self, waarde=1):
+        i = len(self._boom)
+        self._boom.append(waarde + self.som(i - 1) - self.som(i - (i & -i)))
+
+
+class TakenStore:
+    """Taken op naam, met rijnummers die kloppen na verwijderingen.
+
+    Elke taak krijgt bij het laden een vast slot; een verwijderde taak laat
+    haar slot leeg achter. De positie in het tabblad is dan het aantal levende
+    slots ervoor, wat de Fenwick-boom in O(log n) geeft. Enkel als het tabblad
+    opnieuw geladen wordt (een andere DataFrame of dataversie in de cache),
+    wordt de index opnieuw opgebouwd.
+    """
+
+    def __init__(self, cache, wachtrij, key='taken', tabblad="Taken"):
+        self._cache = cache
+        self._wachtrij = wachtrij
+        self.key = key
+        self.tabblad = tabblad
+        self._lock = threading.RLock()
+        self._versie = object()
+        self._df = None  # de DataFrame waarop de index gebouwd is
+        self._slots = {}  # naam -> levende slots, oudste eerst
+        self._levend = Fenwick()
+
+    def _sync(self):
+        df = self._cache.haal_op([self.key])[self.key]
+        versie = self._cache.versies([self.key])[self.key]
+        if df is not self._df or versie != self._versie:
+            namen = df['Taak'].tolist() if 'Taak' in df.columns else []
+            self._slots = {}
+            for slot, naam in enumerate(namen):
+                self._slots.setdefault(naam, []).append(slot)
+            self._levend = Fenwick(len(namen))
+            self._versie = versie
+            self._df = df
+        return df
+
+    def _gesynct(self):
+        # Eigen mutaties zitten al in de index: de nieuwe cacheversie (en DataFrame) overnemen
+        self._versie = self._cache.versies([self.key])[self.key]
+        self._df = self._cache.frame(self.key)
+
+    def _positie(self, naam):
+        slots = self._slots.get(naam)
+        return self._levend.som(slots[0]) if slots else None
+
+    def dataframe(self):
+        with self._lock:
+            return self._sync()
+
+    def bestaat(self, naam):
+        with self._lock:
+            self._sync()
+            return naam in self._slots
+
+    def positie(self, naam):
+        """0-gebaseerde rij (zonder koprij) van de eerste taak met deze naam, of None"""
+        with self._lock:
+            self._sync()
+            return self._positie(naam)
+
+    def rij(self, naam):
+        with self._lock:
+            df = self._sync()
+            positie = self._positie(naam)
+            return None if positie is None else df.iloc[positie]
+
+    def voeg_toe(self, waarden):
+        with self._lock:
+            self._sync()
+            self._wachtrij.append_row(self.tabblad, list(waarden))
+            self._cache.voeg_rij_toe(self.key, waarden)
+            self._slots.setdefault(waarden[0], []).append(len(self._levend))
+            self._levend.voeg_toe()
+            self._gesynct()
+
+    def markeer_uitgevoerd(self, naam, datum=None):
+        """Zet Laatst_Uitgevoerd op `datum` (standaard vandaag); False als de taak niet bestaat"""
+        datum = str(datum or date.today())
+        with self._lock:
+            df = self._sync()
+            positie = self._positie(naam)
+            if positie is None:
+                return False
+            kolom = df.columns.get_loc(KOLOM_LAATST) + 1  # get_loc is 0-gebaseerd, de sheet 1-gebaseerd
+            self._wachtrij.update_cell(self.tabblad, positie + 2, kolom, datum)
+            self._cache.werk_cel_bij(self.key, positie, KOLOM_LAATST, datum)
+            self._gesynct()
+            return True
+
+    def verwijder(self, naam):
+        """Verwijdert de eerste taak met deze naam; False als ze niet bestaat"""
+        with self._lock:
+            self._sync()
+            positie = self._positie(naam)
+            if positie is None:
+                return False
+            self._wachtrij.delete_rows(self.tabblad, positie + 2)
+            self._cache.verwijder_rij(self.key, positie)
+            slots = self._slots[naam]
+            self._levend.wijzig(slots.pop(0), -1)
+            if not slots:
+                del self._slots[naam]
+            self._gesynct()
+            return True
+
+    def vink_af(self, naam, datum=None):
+        """Eenmalige taken verdwijnen, andere krijgen een nieuwe uitvoerdatum.
+
+        Geeft 'verwijderd', 'uitgevoerd' of None (onbekende taak) terug.
+        """
+        with self._lock:
+            rij = self.rij(naam)
+            if rij is None:
+                return None
+            if rij['Frequentie'] == EENMALIG:
+                self.verwijder(naam)
+                return 'verwijderd'
+            self.markeer_uitgevoerd(naam, datum)
+            return 'uitgevoerd'
@@ -0,0 +1,46 @@
+"""Tests van het archief tegen de fake gspread backend (python -m pytest)."""
+from archief import ARCHIEF_KOPPEN, ARCHIEF_TABBLAD, Archief
+from fake_gspread import maak_gezinsplanning
+from sheets import SheetRegister
+from wachtrij import SchrijfWachtrij
+
+
+def test_sync_schrijft_naar_een_eigen_tabblad_met_koprij(tmp_path):
+    client = maak_gezinsplanning(taken=5, gerechten=3)
+    wachtrij = SchrijfWachtrij(SheetRegister(client, "Gezinsplanning"), str(tmp_path / "wachtrij.json"))
+    archief = Archief(str(tmp_path / "archief.sqlite"), velden=('eten', 'lise'))
+
+    archief.registreer({"2025-01-06": {'eten': "Soep", 'lise': "Zwemmen"}})
+    client.faal_volgende(10, 503)  # offline: sync zet enkel in de wachtrij
+    assert archief.sync(wachtrij) == 2
+    client._fouten.clear()
+    archief.registreer({"2025-01-07": {'eten': "Stoofvlees", 'lise': ""}})
+    assert archief.sync(wachtrij) == 2
+    assert client.totaal_aanroepen == 0
+    assert wachtrij.flush()
+
+    spreadsheet = client.open("Gezinsplanning")
+    rijen = spreadsheet.worksheet(ARCHIEF_TABBLAD)._waarden
+    assert rijen[0] == ARCHIEF_KOPPEN
+    assert [rij[:3] for rij in rijen[1:]] == [
+        ["2025-01-06", "eten", "Soep"], ["2025-01-06", "lise", "Zwemmen"],
+        ["2025-01-07", "eten", "Stoofvlees"], ["2025-01-07", "lise", ""],
+    ]
+    assert client.aanroepen['batch_update'] == 1  # tabblad, koprij en rijen in één batch
+    # Het oude tabblad met JSON-blobs blijft zoals het was
+    assert spreadsheet.worksheet("Weekresultaten")._waarden == [["Week", "Planning"]]
+
+
+def test_bestaand_tabblad_wordt_niet_opnieuw_aangemaakt(tmp_path):
+    client = maak_gezinsplanning(taken=5, gerechten=3)
+    register = SheetRegister(client, "Gezinsplanning")
+    for i in range(2):
+        # Elk proces (hier: elke Archief) zet opnieuw een maak_tabblad in de wachtrij
+        wachtrij = SchrijfWachtrij(register, str(tmp_path / f"wachtrij{i}.json"))
+        archief = Archief(str(tmp_path / f"archief{i}.sqlite"), velden=('eten',))
+        archief.registreer({"2025-01-06": {'eten': "Soep"}})
+        archief.sync(wachtrij)
+        assert wachtrij.flush()
+
+    rijen = client.open("Gezinsplanning").worksheet(ARCHIEF_TABBLAD)._waarden
+    assert [rij[:3] for rij in rijen] == [ARCHIEF_KOPPEN[:3], ["2025-01-06", "eten", "Soep"], ["2025-01-06", "eten", "Soep"]]
@@ -0,0 +1,32 @@
+"""Tests van de gedeelde SQLite-verbinding (python -m pytest)."""
+import sqlite3
+
+import pytest
+
+from databank import verbind
+
+
+def test_commit_en_altijd_gesloten(tmp_path):
+    pad = str(tmp_path / "db.sqlite")
+    with verbind(pad) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")  # gesloten
+    with verbind(pad) as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+
+
+def test_rollback_bij_een_fout(tmp_path):
+    pad = str(tmp_path / "db.sqlite")
+    with verbind(pad) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with pytest.raises(ValueError):
+        with verbind(pad) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise ValueError
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    with verbind(pad) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (0,)
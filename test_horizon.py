@@ -0,0 +1,54 @@
+"""Tests van de vooruitplanning: voorbeeld zonder opslag, vastleggen na akkoord (python -m pytest)."""
+from datetime import date
+
+import pytest
+
+from fake_gspread import maak_gezinsplanning
+from lru import LRUCache
+from opslag import PlanningDB
+from planning import Planner
+from sheets import laad_tabbladen
+
+START = date(2025, 1, 6)
+PERSONEN = ['lise', 'cedric']
+
+
+@pytest.fixture
+def data():
+    return laad_tabbladen(maak_gezinsplanning(taken=20, gerechten=30, activiteiten=10).open("Gezinsplanning"))
+
+
+def test_voorbeeld_schrijft_niets_weg(data, tmp_path):
+    pad = str(tmp_path / "db.sqlite")
+    db = PlanningDB(pad)
+    planner = Planner(LRUCache())
+    dagen = planner.horizon(data, {key: 0 for key in data}, db, START, 14, PERSONEN)
+    assert list(dagen)[0] == "2025-01-06" and len(dagen) == 14
+    assert len(db) == 0
+    db.opslaan()
+    assert len(PlanningDB(pad)) == 0
+
+
+def test_vastleggen_bewaart_enkel_nieuwe_dagen(data, tmp_path):
+    pad = str(tmp_path / "db.sqlite")
+    db = PlanningDB(pad)
+    db["2025-01-07"] = {'eten': "Eigen keuze"}
+    planner = Planner(LRUCache())
+    dagen = planner.horizon(data, {key: 0 for key in data}, db, START, 7, PERSONEN)
+    assert dagen["2025-01-07"] == {'eten': "Eigen keuze"}
+
+    nieuw = planner.leg_vast(db, dagen)
+    assert sorted(nieuw) == sorted(set(dagen) - {"2025-01-07"})
+    db.opslaan()
+    bewaard = PlanningDB(pad)
+    assert bewaard["2025-01-07"] == {'eten': "Eigen keuze"}
+    assert all(bewaard[dag_key] == planning for dag_key, planning in nieuw.items())
+
+
+def test_horizon_toont_dezelfde_dagen_als_het_weekrooster(data, tmp_path):
+    db = PlanningDB(str(tmp_path / "db.sqlite"))
+    planner = Planner(LRUCache())
+    versies = {key: 0 for key in data}
+    dagen = planner.horizon(data, versies, db, START, 7, PERSONEN)
+    week, _ = planner.week(data, versies, db, START, PERSONEN)
+    assert list(dagen.values()) == week
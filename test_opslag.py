@@ -0,0 +1,42 @@
+"""Tests van PlanningDB met twee sessies op hetzelfde bestand (python -m pytest)."""
+import pytest
+
+from opslag import PlanningDB
+
+
+@pytest.fixture
+def pad(tmp_path):
+    pad = str(tmp_path / "db.sqlite")
+    db = PlanningDB(pad)
+    db["2025-01-06"] = {'eten': "Soep", 'lise': "Zwemmen", 'cedric': "Lopen"}
+    db.opslaan()
+    return pad
+
+
+def test_gelijktijdige_wijzigingen_aan_andere_velden_blijven_allebei(pad):
+    sessie_a, sessie_b = PlanningDB(pad), PlanningDB(pad)
+    sessie_a["2025-01-06"], sessie_b["2025-01-06"]  # beide lezen dezelfde versie
+
+    sessie_a["2025-01-06"]['eten'] = "Stoofvlees"
+    sessie_a.markeer("2025-01-06")
+    sessie_a.opslaan()
+    sessie_b["2025-01-06"]['lise'] = "Yoga"
+    sessie_b.markeer("2025-01-06")
+    sessie_b.opslaan()
+
+    verwacht = {'eten': "Stoofvlees", 'lise': "Yoga", 'cedric': "Lopen"}
+    assert PlanningDB(pad)["2025-01-06"] == verwacht
+    assert sessie_b["2025-01-06"] == verwacht
+
+
+def test_ververs_toont_wat_een_andere_sessie_bewaarde(pad):
+    sessie_a, sessie_b = PlanningDB(pad), PlanningDB(pad)
+    assert sessie_b["2025-01-06"]['eten'] == "Soep"
+
+    sessie_a["2025-01-06"]['eten'] = "Stoofvlees"
+    sessie_a.markeer("2025-01-06")
+    sessie_a.opslaan()
+
+    assert sessie_b["2025-01-06"]['eten'] == "Soep"
+    sessie_b.ververs()
+    assert sessie_b["2025-01-06"]['eten'] == "Stoofvlees"
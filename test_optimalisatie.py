@@ -0,0 +1,49 @@
+"""Tests van de geoptimaliseerde takenverdeling (python -m pytest)."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from optimalisatie import verdeel_taken_optimaal
+from planning import EFFORT_SCORES, met_volgende_datum
+
+PERSONEN = ['cedric', 'lise']
+REFERENTIE = date(2025, 1, 6)
+
+
+def taken(efforts, laatst="2024-01-01"):
+    return met_volgende_datum(pd.DataFrame({
+        'Taak': [f"Taak {i}" for i in range(len(efforts))],
+        'Frequentie': "Maandelijks",
+        'Effort': efforts,
+        'Persoon': "beiden",
+        'Laatst_Uitgevoerd': laatst,
+    }))
+
+
+def efforts_per_persoon(verdeling):
+    return {persoon: sorted(taak['Effort'] for taak in records) for persoon, records in verdeling.items()}
+
+
+def test_achterstallige_gemiddelde_en_hoge_taken_worden_ingepland():
+    verdeling = verdeel_taken_optimaal(taken(["Gemiddeld"] * 4 + ["Hoog"] * 2), REFERENTIE, PERSONEN,
+                                       rng=np.random.default_rng(1))
+    assert efforts_per_persoon(verdeling) == {'cedric': ["Gemiddeld", "Gemiddeld"], 'lise': ["Gemiddeld", "Gemiddeld"]}
+
+
+def test_gemengde_taken_gebalanceerd_verdeeld():
+    efforts = ["Laag", "Gemiddeld", "Hoog"] * 20
+    verdeling = verdeel_taken_optimaal(taken(efforts), REFERENTIE, PERSONEN, rng=np.random.default_rng(2))
+    per_persoon = efforts_per_persoon(verdeling)
+    assert {effort for lijst in per_persoon.values() for effort in lijst} - {"Laag"}
+    totalen = [sum(EFFORT_SCORES[e] for e in lijst) for lijst in per_persoon.values()]
+    assert all(len(lijst) >= 2 for lijst in per_persoon.values())
+    assert max(totalen) - min(totalen) <= 1
+
+
+def test_meest_achterstallige_taak_eerst():
+    df = taken(["Hoog", "Hoog", "Laag"])
+    df.loc[0, 'Laatst_Uitgevoerd'] = "2023-01-01"
+    verdeling = verdeel_taken_optimaal(met_volgende_datum(df.drop(columns=df.columns[-1])), REFERENTIE, PERSONEN,
+                                       rng=np.random.default_rng(3))
+    assert "Taak 0" in [taak['Taak'] for records in verdeling.values() for taak in records]
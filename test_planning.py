@@ -0,0 +1,91 @@
+"""Tests van de takenverdeling in planning.py (python -m pytest)."""
+import random
+
+import pandas as pd
+import pytest
+
+from fake_gspread import maak_gezinsplanning
+from planning import taak_eigenaars, wijs_taken_toe
+from sheets import laad_tabbladen
+
+PERSONEN = ["cedric", "lise"]
+
+
+def taken_met_personen(personen):
+    return pd.DataFrame({
+        'Taak': [f"Taak {i}" for i in range(len(personen))],
+        'Frequentie': "Wekelijks",
+        'Effort': "Laag",
+        'Persoon': personen,
+        'Laatst_Uitgevoerd': "",
+    })
+
+
+def als_lijst(eigenaars):
+    return [None if pd.isna(eigenaar) else eigenaar for eigenaar in eigenaars]
+
+
+def test_eigenaar_op_naam_of_id_van_een_lid():
+    df = taken_met_personen(["Bert", "bert2", "Ann", "iedereen", "beiden", "Cédric"])
+    eigenaars = taak_eigenaars(df, ['bert2', 'ann'], namen={'bert2': "Bert", 'ann': "Ann"})
+    assert als_lijst(eigenaars) == ['bert2', 'bert2', 'ann', None, None, None]
+
+
+def test_zonder_namen_enkel_ids():
+    df = taken_met_personen(["Lise", "Cédric", "beiden"])
+    assert als_lijst(taak_eigenaars(df, ['cedric', 'lise'])) == ['lise', 'cedric', None]
+
+
+def toewijzing_iterrows(df, personen_volgorde, eigenaars=None):
+    """De oude lus als referentie, uitgebreid met eigenaars: taken van een ander slaat ze over"""
+    planning = {persoon: [] for persoon in personen_volgorde}
+    reeds_toegewezen = set()
+    for persoon in personen_volgorde:
+        huidige_efforts = []
+        for positie, (_, taak) in enumerate(df.iterrows()):
+            if taak['Taak'] in reeds_toegewezen:
+                continue
+            if eigenaars is not None and eigenaars[positie] not in (None, persoon):
+                continue
+            if len(huidige_efforts) >= 3:
+                break
+            kandidaat_efforts = sorted(huidige_efforts + [taak['Effort']])
+            if kandidaat_efforts in [
+                ["Laag"], ["Laag", "Laag"], ["Laag", "Hoog"], ["Laag", "Gemiddeld"],
+                ["Gemiddeld", "Gemiddeld"], ["Laag", "Laag", "Laag"],
+                ["Laag", "Laag", "Hoog"], ["Gemiddeld", "Gemiddeld", "Laag"]
+            ]:
+                planning[persoon].append(taak['Taak'])
+                huidige_efforts.append(taak['Effort'])
+                reeds_toegewezen.add(taak['Taak'])
+    return planning
+
+
+@pytest.fixture(scope="module")
+def taken():
+    return laad_tabbladen(maak_gezinsplanning(taken=60).open("Gezinsplanning"))['taken']
+
+
+def geschud(df, seed):
+    volgorde = PERSONEN.copy()
+    random.Random(seed).shuffle(volgorde)
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True), volgorde
+
+
+@pytest.mark.parametrize("met_eigenaars", [False, True])
+def test_toewijzing_per_seed_gelijk_aan_de_oude_lus(taken, met_eigenaars):
+    for seed in range(25):
+        df, volgorde = geschud(taken, seed)
+        eigenaars = taak_eigenaars(df, PERSONEN) if met_eigenaars else None
+        nieuw = wijs_taken_toe(df, volgorde, eigenaars)
+        oud = toewijzing_iterrows(df, volgorde, None if eigenaars is None else als_lijst(eigenaars))
+        assert {persoon: [t['Taak'] for t in toegewezen] for persoon, toegewezen in nieuw.items()} == oud, seed
+
+
+def test_eigen_taken_enkel_voor_de_eigenaar(taken):
+    df, volgorde = geschud(taken, 3)
+    eigenaars = taak_eigenaars(df, PERSONEN)
+    eigenaar_per_taak = dict(zip(df['Taak'], als_lijst(eigenaars)))
+    assert set(eigenaar_per_taak.values()) == {None, *PERSONEN}
+    for persoon, toegewezen in wijs_taken_toe(df, volgorde, eigenaars).items():
+        assert all(eigenaar_per_taak[t['Taak']] in (None, persoon) for t in toegewezen)
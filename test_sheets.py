@@ -0,0 +1,55 @@
+"""Tests van records_dataframe tegen de semantiek van gspread zelf (python -m pytest)."""
+import pandas as pd
+import pytest
+from gspread.exceptions import GSpreadException
+from gspread.utils import fill_gaps, numericise_all, to_records
+
+from sheets import records_dataframe
+
+
+def volgens_gspread(waarden):
+    """Wat Worksheet.get_all_records() voor deze celwaarden teruggeeft (get(pad_values=True) vult aan)"""
+    waarden = fill_gaps(waarden)
+    return to_records(waarden[0], [numericise_all(rij) for rij in waarden[1:]])
+
+
+@pytest.mark.parametrize("waarden", [
+    [["Taak", "Frequentie", "Laatst_Uitgevoerd"], ["Stofzuigen", "Wekelijks", "2025-01-06"]],
+    # getallen, decimalen, voorloopnullen, lege cellen en tekst die op een getal lijkt
+    [["Naam", "Aantal", "Prijs", "Code", "Leeg"], ["Soep", "3", "2.5", "007", ""], ["Brood", "1e3", "1,5", "-4", " "]],
+    # rijen van ongelijke lengte: de API laat lege cellen achteraan weg
+    [["Taak", "Effort", "Persoon"], ["Strijken"], ["Koken", "Laag"], ["Poetsen", "Hoog", "Lise"]],
+    # een rij langer dan de koprij krijgt een lege kop
+    [["Gerecht"], ["Soep", "extra"]],
+])
+def test_zelfde_records_als_gspread(waarden):
+    verwacht = pd.DataFrame(volgens_gspread(waarden))
+    pd.testing.assert_frame_equal(records_dataframe(waarden), verwacht)
+
+
+def test_enkel_koprij_geeft_lege_dataframe():
+    assert volgens_gspread([["Taak", "Effort"]]) == []
+    assert records_dataframe([["Taak", "Effort"]]).empty
+
+
+@pytest.mark.parametrize("waarden", [[], [[]]])
+def test_leeg_tabblad(waarden):
+    # get_all_records geeft [] voor een volledig leeg tabblad (get() geeft dan [[]])
+    assert records_dataframe(waarden).empty
+
+
+def test_dubbele_koppen_zoals_get_all_records():
+    waarden = [["Taak", "Persoon", "Taak"], ["Koken", "Lise", "Afwassen"]]
+    with pytest.raises(GSpreadException, match="duplicates"):
+        records_dataframe(waarden)
+    # twee extra kolommen zonder kop zijn ook dubbele (lege) koppen
+    with pytest.raises(GSpreadException):
+        records_dataframe([["Gerecht"], ["Soep", "a", "b"]])
+
+
+def test_getallen_zoals_numericise_all():
+    df = records_dataframe([["Naam", "Aantal", "Prijs", "Code", "Leeg"], ["Soep", "3", "2.5", "007", ""],
+                            ["Brood", "1e3", "1,5", "-4", ""]])
+    assert df.iloc[0].tolist() == ["Soep", 3, 2.5, 7, ""]
+    # numericise leest de komma als duizendtalscheiding: "1,5" wordt 15
+    assert df.iloc[1].tolist() == ["Brood", 1000.0, 15.0, -4, ""]
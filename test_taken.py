@@ -0,0 +1,68 @@
+"""Tests van TakenStore: de cellen die na een flush echt in het Taken-tabblad staan (python -m pytest)."""
+import pytest
+
+from fake_gspread import maak_gezinsplanning
+from planning import met_volgende_datum
+from sheets import SheetRegister, TabbladCache, laad_tabbladen
+from taken import TakenStore
+from wachtrij import SchrijfWachtrij
+
+
+@pytest.fixture
+def omgeving(tmp_path):
+    client = maak_gezinsplanning(taken=8)
+    spreadsheet = client.open("Gezinsplanning")
+    # Zoals in de app: met de afgeleide kolom achteraan, die niet in het tabblad staat
+    cache = TabbladCache(lambda tabbladen: laad_tabbladen(spreadsheet, tabbladen), ttl=None,
+                         tabbladen={'taken': "Taken"}, verwerkers={'taken': met_volgende_datum})
+    wachtrij = SchrijfWachtrij(SheetRegister(client, "Gezinsplanning"), str(tmp_path / "wachtrij.json"))
+    return TakenStore(cache, wachtrij), wachtrij, spreadsheet.worksheet("Taken")
+
+
+def taak(rijen, naam):
+    """Eerste rij met deze naam in een lijst rijen zonder koprij"""
+    return next(rij for rij in rijen if rij[0] == naam)
+
+
+def test_toevoegen_afvinken_en_verwijderen_schrijft_de_juiste_cellen(omgeving):
+    store, wachtrij, tabblad = omgeving
+    verwacht = [list(rij) for rij in tabblad._waarden[1:]]
+
+    assert store.verwijder("Taak 1")
+    del verwacht[1]
+    store.voeg_toe(["Taak 2", "Wekelijks", "Laag", "beiden", ""])  # tweede taak met dezelfde naam
+    verwacht.append(["Taak 2", "Wekelijks", "Laag", "beiden", ""])
+    assert store.markeer_uitgevoerd("Taak 3", "2025-02-01")
+    taak(verwacht, "Taak 3")[4] = "2025-02-01"
+    assert store.vink_af("Taak 5", "2025-02-02") == 'verwijderd'  # eenmalig
+    verwacht.remove(taak(verwacht, "Taak 5"))
+    assert store.verwijder("Taak 2")  # de eerste van de twee
+    verwacht.remove(taak(verwacht, "Taak 2"))
+    assert store.vink_af("Taak 2", "2025-02-03") == 'uitgevoerd'  # nu de toegevoegde
+    taak(verwacht, "Taak 2")[4] = "2025-02-03"
+    assert store.markeer_uitgevoerd("Taak 7", "2025-02-04")
+    taak(verwacht, "Taak 7")[4] = "2025-02-04"
+    assert wachtrij.flush()
+
+    assert tabblad._waarden[0] == ["Taak", "Frequentie", "Effort", "Persoon", "Laatst_Uitgevoerd"]
+    assert tabblad._waarden[1:] == verwacht
+    assert store.dataframe()['Taak'].tolist() == [rij[0] for rij in verwacht]
+
+
+def test_posities_kloppen_over_meerdere_flushes(omgeving):
+    store, wachtrij, tabblad = omgeving
+    for naam in ["Taak 0", "Taak 4"]:
+        assert store.verwijder(naam)
+        assert wachtrij.flush()
+    store.voeg_toe(["Nieuw", "Maandelijks", "Hoog", "Lise", ""])
+    assert wachtrij.flush()
+    for naam, datum in [("Nieuw", "2025-03-01"), ("Taak 6", "2025-03-02"), ("Taak 1", "2025-03-03")]:
+        assert store.markeer_uitgevoerd(naam, datum)
+        assert wachtrij.flush()
+        # Enkel de Laatst_Uitgevoerd-cel van precies deze taak is gewijzigd
+        rij = store.positie(naam) + 2
+        assert tabblad._waarden[rij - 1][0] == naam
+        assert tabblad._waarden[rij - 1][4] == datum
+
+    assert [rij[0] for rij in tabblad._waarden[1:]] == store.dataframe()['Taak'].tolist()
+    assert not store.verwijder("Taak 0") and not store.markeer_uitgevoerd("Taak 4")
@@ -0,0 +1,155 @@
+"""Tests van de schrijfwachtrij tegen de fake gspread backend (python -m pytest)."""
+import json
+import time
+
+import pytest
+
+from fake_gspread import maak_gezinsplanning
+from sheets import SheetRegister
+from wachtrij import SchrijfWachtrij, coalesceer
+
+
+@pytest.fixture
+def client():
+    return maak_gezinsplanning(taken=5, gerechten=3)
+
+
+@pytest.fixture
+def wachtrij(client, tmp_path):
+    return SchrijfWachtrij(SheetRegister(client, "Gezinsplanning"), str(tmp_path / "wachtrij.json"), backoff=0.001)
+
+
+def tabblad(client, naam):
+    return client.open("Gezinsplanning").worksheet(naam)._waarden
+
+
+def test_coalesceer_laatste_update_per_cel():
+    operaties = [
+        {'op': 'update_cell', 'tabblad': "Taken", 'rij': 2, 'kolom': 5, 'waarde': "a"},
+        {'op': 'update_cell', 'tabblad': "Taken", 'rij': 2, 'kolom': 5, 'waarde': "b"},
+    ]
+    assert coalesceer(operaties) == [operaties[1]]
+
+
+def test_coalesceer_niet_over_een_delete_heen():
+    # Na de delete wijst rij 2 naar een andere taak: beide updates moeten blijven
+    operaties = [
+        {'op': 'update_cell', 'tabblad': "Taken", 'rij': 2, 'kolom': 5, 'waarde': "a"},
+        {'op': 'delete_rows', 'tabblad': "Taken", 'rij': 2, 'tot_rij': 2},
+        {'op': 'update_cell', 'tabblad': "Taken", 'rij': 2, 'kolom': 5, 'waarde': "b"},
+    ]
+    assert coalesceer(operaties) == operaties
+
+
+def test_coalesceer_delete_op_ander_tabblad_raakt_updates_niet():
+    operaties = [
+        {'op': 'update_cell', 'tabblad': "Taken", 'rij': 2, 'kolom': 5, 'waarde': "a"},
+        {'op': 'delete_rows', 'tabblad': "Eten", 'rij': 2, 'tot_rij': 2},
+        {'op': 'update_cell', 'tabblad': "Taken", 'rij': 2, 'kolom': 5, 'waarde': "b"},
+    ]
+    assert coalesceer(operaties) == operaties[1:]
+
+
+def test_coalesceer_appends_worden_een_operatie():
+    operaties = [
+        {'op': 'append_row', 'tabblad': "Eten", 'waarden': ["x"]},
+        {'op': 'append_row', 'tabblad': "Eten", 'rijen': [["y"], ["z"]]},
+    ]
+    assert coalesceer(operaties) == [{'op': 'append_row', 'tabblad': "Eten", 'rijen': [["x"], ["y"], ["z"]]}]
+
+
+def test_flush_past_alles_in_een_batch_toe(client, wachtrij):
+    wachtrij.update_cell("Taken", 2, 5, "2025-01-01")
+    wachtrij.delete_rows("Taken", 3)
+    wachtrij.update_cell("Taken", 3, 5, "2025-02-02")
+    wachtrij.append_row("Eten", ["Soep"])
+    wachtrij.append_row("Eten", ["Stoofvlees"])
+
+    assert wachtrij.flush()
+    assert client.aanroepen['batch_update'] == 1
+    taken = tabblad(client, "Taken")
+    assert [rij[0] for rij in taken[1:]] == ["Taak 0", "Taak 2", "Taak 3", "Taak 4"]
+    assert taken[1][4] == "2025-01-01" and taken[2][4] == "2025-02-02"
+    assert [rij[0] for rij in tabblad(client, "Eten")[-2:]] == ["Soep", "Stoofvlees"]
+    assert wachtrij.openstaand == 0
+
+
+def test_herstel_na_crash_uit_het_bestand(client, wachtrij):
+    wachtrij.append_row("Eten", ["Soep"])
+    wachtrij.update_cell("Taken", 2, 5, "2025-01-01")
+    # "Crash": een nieuwe wachtrij op hetzelfde pad neemt het openstaande werk over
+    opnieuw = SchrijfWachtrij(wachtrij.register, wachtrij.pad)
+    assert opnieuw.openstaand == 2
+    assert opnieuw.flush()
+    assert tabblad(client, "Eten")[-1] == ["Soep"]
+    with open(wachtrij.pad) as f:
+        assert json.load(f) == []
+
+
+def test_herprobeert_met_backoff_bij_429(client, wachtrij, monkeypatch):
+    wachtjes = []
+    monkeypatch.setattr("wachtrij.time.sleep", wachtjes.append)
+    wachtrij.append_row("Eten", ["Soep"])
+    client.faal_volgende(2, 429)
+
+    assert wachtrij.flush()
+    assert len(wachtjes) == 2 and wachtjes[1] > wachtjes[0]  # exponentieel langer
+    assert tabblad(client, "Eten")[-1] == ["Soep"]
+
+
+def test_blijft_staan_na_te_veel_tijdelijke_fouten(client, wachtrij):
+    wachtrij.append_row("Eten", ["Soep"])
+    client.faal_volgende(wachtrij.max_pogingen, 503)
+
+    assert not wachtrij.flush()
+    assert wachtrij.openstaand == 1 and wachtrij.laatste_fout.code == 503
+    assert wachtrij.flush()
+    assert tabblad(client, "Eten")[-1] == ["Soep"]
+
+
+def test_tijdelijke_fout_bij_opzoeken_van_het_tabblad(client, wachtrij):
+    # De eerste metadata-call (open) faalt: dat hoort bij de poging, niet erbuiten
+    wachtrij.append_row("Eten", ["Soep"])
+    client.faal_volgende(1, 503)
+    assert wachtrij.flush()
+    assert tabblad(client, "Eten")[-1] == ["Soep"]
+
+
+def test_definitieve_fout_gaat_naar_mislukte_operaties(client, wachtrij):
+    wachtrij.append_row("Bestaat niet", ["x"])
+    wachtrij.append_row("Eten", ["Soep"])
+
+    assert wachtrij.flush()
+    assert wachtrij.openstaand == 0
+    assert tabblad(client, "Eten")[-1] == ["Soep"]
+    mislukt = wachtrij.mislukte_operaties()
+    assert [op['tabblad'] for op in mislukt] == ["Bestaat niet"]
+    assert "WorksheetNotFound" in mislukt[0]['fout']
+    # Volgende flushes hebben er geen last meer van
+    wachtrij.append_row("Eten", ["Stoofvlees"])
+    assert wachtrij.flush()
+
+
+def test_achtergrondthread_overleeft_fouten(client, wachtrij, monkeypatch):
+    wachtrij.vertraging = 0.01
+    pogingen = []
+    origineel = wachtrij.flush
+
+    def flush():
+        pogingen.append(1)
+        if len(pogingen) == 1:
+            raise RuntimeError("onverwacht")
+        return origineel()
+
+    monkeypatch.setattr(wachtrij, "flush", flush)
+    monkeypatch.setattr(wachtrij, "max_pogingen", 1)
+    wachtrij.start()
+    try:
+        wachtrij.append_row("Eten", ["Soep"])
+        einde = time.monotonic() + 5
+        while wachtrij.openstaand and time.monotonic() < einde:
+            time.sleep(0.01)
+        assert wachtrij.openstaand == 0 and len(pogingen) >= 2
+    finally:
+        monkeypatch.setattr(wachtrij, "flush", origineel)
+        wachtrij.stop()
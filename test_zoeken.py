@@ -0,0 +1,66 @@
+"""Tests van de zoekindex over gerechten (python -m pytest)."""
+from zoeken import MAX_SUGGESTIES, ZoekIndex
+
+
+def test_leestekens_scheiden_woorden():
+    index = ZoekIndex(["Vol-au-vent", "Croque-monsieur", "Stoofvlees (met frietjes)", "Volkorenbrood"])
+    assert index.zoek("vol au")[0] == "Vol-au-vent"
+    assert index.zoek("vent") == ["Vol-au-vent"]
+    assert index.zoek("monsieur") == ["Croque-monsieur"]
+    assert index.zoek("frietjes") == ["Stoofvlees (met frietjes)"]
+
+
+def test_enkel_leestekens_als_zoekterm():
+    index = ZoekIndex(["Vol-au-vent", "Soep"])
+    assert index.zoek("-") == ["Vol-au-vent"]
+
+
+def test_accenten_en_hoofdletters_tellen_niet():
+    index = ZoekIndex(["Crème Brûlée", "Paëlla", "Soep"])
+    assert index.zoek("creme brulee") == ["Crème Brûlée"]
+    assert index.zoek("CRÈME") == ["Crème Brûlée"]
+    assert index.zoek("paella") == ["Paëlla"]
+
+
+def test_rangschikking_exact_begin_woordbegin_deelstring():
+    index = ZoekIndex(["Tomatensoep", "Soep met balletjes", "Groentesoep", "Soep", "Balletjes in soep"])
+    assert index.zoek("soep") == [
+        "Soep",                # exact
+        "Soep met balletjes",  # begint met de term
+        "Balletjes in soep",   # een woord begint met de term
+        "Tomatensoep",         # deelstring, in de volgorde van de lijst
+        "Groentesoep",
+    ]
+
+
+def test_woordbegin_van_meerdere_zoekwoorden():
+    index = ZoekIndex(["Spaghetti carbonara", "Spaghetti bolognese", "Bolognese saus"])
+    assert index.zoek("sp bol") == ["Spaghetti bolognese"]
+
+
+def test_typfouten_worden_voorgesteld():
+    index = ZoekIndex(["Spaghetti bolognese", "Stoofvlees met frietjes", "Soep", "Videe"])
+    assert index.zoek("spagetti")[0] == "Spaghetti bolognese"
+    assert index.zoek("stoofvles")[0] == "Stoofvlees met frietjes"
+    assert index.zoek("xyzxyz") == []
+
+
+def test_typfouten_na_de_echte_treffers():
+    index = ZoekIndex(["Stoofvlees", "Stoofvlees met frietjes", "Stoemp"])
+    assert index.zoek("stoofvlees") == ["Stoofvlees", "Stoofvlees met frietjes"]
+    assert index.zoek("stoofvles") == ["Stoofvlees", "Stoofvlees met frietjes"]
+
+
+def test_geen_typfoutsuggesties_bij_genoeg_treffers():
+    opties = [f"Gerecht {i}" for i in range(MAX_SUGGESTIES)] + ["Gerrecht"]
+    index = ZoekIndex(opties)
+    assert index.zoek("gerecht") == opties[:-1]
+    assert "Gerrecht" in ZoekIndex(opties[:3] + ["Gerrecht"]).zoek("gerecht")
+
+
+def test_onthouden_resultaat_gelijk_aan_koud():
+    index = ZoekIndex(["Crème Brûlée", "Soep", "Stoofvlees"])
+    warm = index.zoek("s")
+    assert index.zoek("s") is warm
+    index.leeg()
+    assert index.zoek("s") == warm
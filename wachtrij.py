@@ -0,0 +1,306 @@
+"""Write-behind wachtrij voor Google Sheets mutaties.
+
+Widgets zetten update_cell/append_row/delete_rows/maak_tabblad operaties in
+de wachtrij en gaan meteen verder. Een achtergrondthread bundelt alles wat klaarstaat in
+één `batch_update` per flush, probeert opnieuw met backoff bij 429's en houdt
+de openstaande operaties bij in een lokaal JSON-bestand zodat een crash geen
+werk kost. Een operatie die definitief faalt (een verdwenen tabblad, een 4xx)
+gaat naar een apart bestand met mislukte operaties, zodat ze de rest van de
+wachtrij niet blijft tegenhouden.
+"""
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from gspread.exceptions import APIError, WorksheetNotFound
+
+# Foutcodes waarbij opnieuw proberen zin heeft (quota en tijdelijke serverfouten)
+HERPROBEER_CODES = (429, 500, 503)
+
+
+def is_tijdelijk(fout):
+    """True als later opnieuw proberen kan lukken: quota, serverfouten en netwerkfouten"""
+    if isinstance(fout, APIError):
+        return fout.code in HERPROBEER_CODES
+    return isinstance(fout, OSError)  # requests' ConnectionError en Timeout zijn OSErrors
+
+
+def _celwaarde(waarde):
+    return {'userEnteredValue': {'stringValue': str(waarde)}}
+
+
+def coalesceer(operaties):
+    """Voegt operaties samen zonder de volgorde-semantiek te veranderen.
+
+    - meerdere updates van dezelfde cel: enkel de laatste blijft over, zolang
+      er geen append/delete op hetzelfde tabblad tussen zit;
+    - opeenvolgende appends op hetzelfde tabblad worden één append met meerdere rijen.
+    """
+    resultaat = []
+    laatste_update = {}  # (tabblad, rij, kolom) -> index in resultaat
+    for op in operaties:
+        if op['op'] == 'update_cell':
+            cel = (op['tabblad'], op['rij'], op['kolom'])
+            if cel in laatste_update:
+                resultaat[laatste_update[cel]] = None
+            laatste_update[cel] = len(resultaat)
+            resultaat.append(dict(op))
+            continue
+
+        # Structurele wijziging: rijnummers van eerdere updates schuiven mogelijk op
+        laatste_update = {cel: i for cel, i in laatste_update.items() if cel[0] != op['tabblad']}
+        vorige = next((r for r in reversed(resultaat) if r is not None), None)
+        if op['op'] == 'append_row':
+            rijen = [list(rij) for rij in op.get('rijen') or [op['waarden']]]
+        if (op['op'] == 'append_row' and vorige and vorige['op'] == 'append_row'
+                and vorige['tabblad'] == op['tabblad']):
+            vorige['rijen'].extend(rijen)
+        elif op['op'] == 'append_row':
+            resultaat.append({'op': 'append_row', 'tabblad': op['tabblad'], 'rijen': rijen})
+        else:
+            resultaat.append(dict(op))
+    return [op for op in resultaat if op is not None]
+
+
+def naar_requests(operaties, sheet_id, nieuw_sheet_id=lambda tabblad: None):
+    """Vertaalt gecoalesceerde operaties naar batchUpdate requests.
+
+    `nieuw_sheet_id(tabblad)` geeft een vrij id als een te maken tabblad nog
+    niet bestaat, anders None; `sheet_id` kent daarna ook dat nieuwe id.
+    """
+    requests = []
+    for op in operaties:
+        if op['op'] == 'maak_tabblad':
+            nieuw = nieuw_sheet_id(op['tabblad'])
+            if nieuw is None:
+                continue
+            # Tabblad en koprij in dezelfde batch: nooit een tabblad zonder koppen
+            requests.append({'addSheet': {'properties': {
+                'sheetId': nieuw, 'title': op['tabblad'],
+                'gridProperties': {'rowCount': 1, 'columnCount': len(op['koppen'])},
+            }}})
+            requests.append({'updateCells': {
+                'range': {'sheetId': nieuw, 'startRowIndex': 0, 'endRowIndex': 1,
+                          'startColumnIndex': 0, 'endColumnIndex': len(op['koppen'])},
+                'rows': [{'values': [_celwaarde(kop) for kop in op['koppen']]}],
+                'fields': 'userEnteredValue',
+            }})
+        elif op['op'] == 'update_cell':
+            requests.append({'updateCells': {
+                'range': {
+                    'sheetId': sheet_id(op['tabblad']),
+                    'startRowIndex': op['rij'] - 1, 'endRowIndex': op['rij'],
+                    'startColumnIndex': op['kolom'] - 1, 'endColumnIndex': op['kolom'],
+                },
+                'rows': [{'values': [_celwaarde(op['waarde'])]}],
+                'fields': 'userEnteredValue',
+            }})
+        elif op['op'] == 'append_row':
+            requests.append({'appendCells': {
+                'sheetId': sheet_id(op['tabblad']),
+                'rows': [{'values': [_celwaarde(w) for w in rij]} for rij in op['rijen']],
+                'fields': 'userEnteredValue',
+            }})
+        elif op['op'] == 'delete_rows':
+            requests.append({'deleteDimension': {'range': {
+                'sheetId': sheet_id(op['tabblad']), 'dimension': 'ROWS',
+                'startIndex': op['rij'] - 1, 'endIndex': op.get('tot_rij', op['rij']),
+            }}})
+    return requests
+
+
+class SchrijfWachtrij:
+    def __init__(self, register, pad, vertraging=0.5, max_pogingen=5, backoff=1.0):
+        self.register = register
+        self.pad = pad
+        self.vertraging = vertraging
+        self.max_pogingen = max_pogingen
+        self.backoff = backoff
+        self.mislukt_pad = f"{os.path.splitext(pad)[0]}.mislukt.json"
+        self.laatste_fout = None
+        self.flushes = 0
+        self._operaties = self._laad()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._wakker = threading.Condition(self._lock)
+        self._thread = None
+        self._stoppen = False
+
+    # Persistentie
+
+    def _laad(self):
+        if os.path.exists(self.pad):
+            with open(self.pad, "r") as f:
+                return json.load(f)
+        return []
+
+    def _bewaar(self):
+        _schrijf_atomisch(self.pad, self._operaties)
+
+    def _bewaar_mislukt(self, operaties):
+        _schrijf_atomisch(self.mislukt_pad, self.mislukte_operaties() + operaties)
+
+    def mislukte_operaties(self):
+        """Operaties die definitief faalden, met hun fout en tijdstip, om na te kijken"""
+        if os.path.exists(self.mislukt_pad):
+            with open(self.mislukt_pad, "r") as f:
+                return json.load(f)
+        return []
+
+    # Operaties
+
+    def _voeg_toe(self, op):
+        with self._lock:
+            self._operaties.append(op)
+            self._bewaar()
+            self._wakker.notify()
+
+    def update_cell(self, tabblad, rij, kolom, waarde):
+        self._voeg_toe({'op': 'update_cell', 'tabblad': tabblad, 'rij': rij, 'kolom': kolom, 'waarde': str(waarde)})
+
+    def append_row(self, tabblad, waarden):
+        self._voeg_toe({'op': 'append_row', 'tabblad': tabblad, 'waarden': [str(w) for w in waarden]})
+
+    def append_rows(self, tabblad, rijen):
+        """Meerdere rijen als één operatie (en dus één appendCells request)"""
+        self._voeg_toe({'op': 'append_row', 'tabblad': tabblad, 'rijen': [[str(w) for w in rij] for rij in rijen]})
+
+    def delete_rows(self, tabblad, rij, tot_rij=None):
+        self._voeg_toe({'op': 'delete_rows', 'tabblad': tabblad, 'rij': rij, 'tot_rij': tot_rij or rij})
+
+    def maak_tabblad(self, tabblad, koppen):
+        """Maakt het tabblad met koprij `koppen` aan bij de flush, tenzij het al bestaat"""
+        self._voeg_toe({'op': 'maak_tabblad', 'tabblad': tabblad, 'koppen': [str(kop) for kop in koppen]})
+
+    @property
+    def openstaand(self):
+        with self._lock:
+            return len(self._operaties)
+
+    # Flushen
+
+    def _stuur(self, operaties):
+        """Eén batch_update voor `operaties`, met backoff bij tijdelijke fouten; gooit de laatste fout"""
+        for poging in range(self.max_pogingen):
+            try:
+                # Ook het opzoeken van de sheet ids (metadata-calls) hoort bij de poging
+                body = {'requests': naar_requests(coalesceer(operaties), *self._sheet_ids())}
+                self.register.voer_uit(lambda spreadsheet: spreadsheet.batch_update(body))
+                return
+            except Exception as fout:
+                if not is_tijdelijk(fout) or poging == self.max_pogingen - 1:
+                    raise
+                time.sleep(self.backoff * 2 ** poging + random.uniform(0, self.backoff))
+
+    def _sheet_ids(self):
+        """(sheet_id, nieuw_sheet_id) voor naar_requests; nieuwe ids gelden enkel voor deze poging"""
+        nieuwe = {}
+
+        def nieuw_sheet_id(tabblad):
+            if tabblad in nieuwe:
+                return None
+            try:
+                self.register.worksheet(tabblad)
+                return None
+            except WorksheetNotFound:
+                nieuwe[tabblad] = random.randrange(1, 2 ** 31)
+                return nieuwe[tabblad]
+
+        def sheet_id(tabblad):
+            return nieuwe[tabblad] if tabblad in nieuwe else self.register.worksheet(tabblad).id
+
+        return sheet_id, nieuw_sheet_id
+
+    def _isoleer(self, operaties):
+        """Stuurt de operaties één voor één na een definitieve fout van de hele batch.
+
+        Geeft (aantal afgehandeld, mislukte operaties) terug en stopt bij een
+        tijdelijke fout; wat dan overblijft, komt bij de volgende flush terug.
+        """
+        mislukt = []
+        for i, op in enumerate(operaties):
+            try:
+                self._stuur([op])
+            except Exception as fout:
+                if is_tijdelijk(fout):
+                    self.laatste_fout = fout
+                    return i, mislukt
+                mislukt.append(dict(op, fout=repr(fout), tijdstip=datetime.now().isoformat(timespec='seconds')))
+        return len(operaties), mislukt
+
+    def flush(self):
+        """Stuurt alle openstaande operaties in één batch_update.
+
+        Geeft True als niets van deze flush nog in de wachtrij staat; definitief
+        mislukte operaties zijn dan naar `mislukt_pad` verhuisd (zie `laatste_fout`).
+        """
+        with self._flush_lock:
+            with self._lock:
+                operaties = list(self._operaties)
+            if not operaties:
+                return True
+
+            try:
+                self._stuur(operaties)
+                afgehandeld, mislukt = len(operaties), []
+                self.laatste_fout = None
+            except Exception as fout:
+                self.laatste_fout = fout
+                if is_tijdelijk(fout):
+                    return False
+                afgehandeld, mislukt = self._isoleer(operaties)
+                if mislukt:
+                    self.laatste_fout = RuntimeError(
+                        f"{len(mislukt)} operatie(s) definitief mislukt, zie {self.mislukt_pad}: {mislukt[-1]['fout']}"
+                    )
+                    self._bewaar_mislukt(mislukt)
+
+            with self._lock:
+                # Intussen toegevoegde operaties blijven staan voor de volgende flush
+                del self._operaties[:afgehandeld]
+                self._bewaar()
+            self.flushes += 1
+            return afgehandeld == len(operaties)
+
+    def _werk(self):
+        while True:
+            with self._lock:
+                while not self._operaties and not self._stoppen:
+                    self._wakker.wait()
+                if self._stoppen:
+                    return
+            # Even wachten zodat snel opeenvolgende klikken in dezelfde batch belanden
+            time.sleep(self.vertraging)
+            try:
+                gelukt = self.flush()
+            except Exception as fout:
+                # De thread mag nooit sterven: de operaties staan nog op schijf
+                self.laatste_fout, gelukt = fout, False
+            if not gelukt:
+                time.sleep(self.backoff * 2 ** self.max_pogingen)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._werk, name="schrijfwachtrij", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._lock:
+            self._stoppen = True
+            self._wakker.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+def _schrijf_atomisch(pad, inhoud):
+    # Eerst naar een tijdelijk bestand, dan vervangen: nooit een half geschreven bestand
+    tijdelijk = f"{pad}.tmp"
+    with open(tijdelijk, "w") as f:
+        json.dump(inhoud, f)
+    os.replace(tijdelijk, pad)
@@ -0,0 +1,55 @@
+"""View-model voor het weekrooster: keuzelijsten één keer per dataversie opbouwen."""
+from functools import cached_property
+
+from planning import ACTIVITEIT_VELDEN
+from zoeken import ZoekIndex
+
+NIEUW_GERECHT = "➕ Nieuw gerecht toevoegen..."
+
+
+class OptieLijst:
+    """Opties voor een selectbox als tuple, met een waarde -> index map"""
+
+    def __init__(self, waarden, voorvoegsel=()):
+        self.opties = tuple(voorvoegsel) + tuple(waarden)
+        self.index = {}
+        for i, waarde in enumerate(self.opties):
+            self.index.setdefault(waarde, i)
+
+    def __contains__(self, waarde):
+        return waarde in self.index
+
+    def __len__(self):
+        return len(self.opties)
+
+    def met_waarde(self, waarde):
+        """(opties, index) voor een selectbox die `waarde` toont.
+
+        Staat de bewaarde waarde niet (meer) in de sheet, dan komt ze vooraan
+        in de lijst i.p.v. een ValueError te geven.
+        """
+        if waarde in self.index:
+            return self.opties, self.index[waarde]
+        return (waarde,) + self.opties, 0
+
+
+class WeekWeergave:
+    """Alle keuzelijsten van het weekrooster, gedeeld door de zeven dagkolommen"""
+
+    def __init__(self, data, activiteit_velden=ACTIVITEIT_VELDEN):
+        self._gerechten = data['eten'].iloc[:, 0]
+        self.eten = OptieLijst(data['eten'].iloc[:, 0], voorvoegsel=(NIEUW_GERECHT,))
+        # 'all' gebruikt dezelfde lijst als 'cedric': één OptieLijst per tabblad
+        per_tabblad = {key: OptieLijst(data[key]['Activiteiten']) for key in set(activiteit_velden.values())}
+        self.activiteiten = {veld: per_tabblad[key] for veld, key in activiteit_velden.items()}
+
+    @cached_property
+    def eten_zoek(self):
+        """Zoekindex over de gerechten, pas opgebouwd bij de eerste zoekopdracht"""
+        return ZoekIndex(self._gerechten)
+
+
+def week_weergave(cache, data, versies, activiteit_velden=ACTIVITEIT_VELDEN):
+    """WeekWeergave uit `cache` (een LRUCache), opnieuw opgebouwd enkel als de data wijzigt"""
+    key = ('weergave',) + tuple(sorted(versies.items()))
+    return cache.haal_of_bereken(key, lambda: WeekWeergave(data, activiteit_velden))
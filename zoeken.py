@@ -0,0 +1,137 @@
+"""Zoekindex over gerechten: accentongevoelig, met prefixen, trigrammen en typfouttolerantie."""
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import reduce
+
+import numpy as np
+
+from lru import LRUCache
+
+# Minimaal aandeel van de trigrammen van de zoekterm dat een gerecht moet
+# bevatten om als "bedoelde je" (typfout) mee te tellen
+MIN_GELIJKENIS = 0.5
+# Maximum aantal typfoutsuggesties; bij minstens zoveel echte treffers worden ze niet gezocht
+MAX_SUGGESTIES = 25
+
+GEEN_TREFFER = np.inf
+LEEG = np.array([], dtype=np.intp)
+# Groter dan elk teken in een gerecht: prefix + LAATSTE_TEKEN sluit het prefixbereik af
+LAATSTE_TEKEN = "\U0010ffff"
+
+# Woorden zijn reeksen letters en cijfers: leestekens scheiden ook ("Vol-au-vent")
+WOORD = re.compile(r"[^\W_]+")
+
+
+def normaliseer(tekst):
+    """'Crème Brûlée' -> 'creme brulee'"""
+    tekst = str(tekst)
+    if tekst.isascii():
+        return tekst.casefold().strip()
+    tekst = unicodedata.normalize('NFKD', tekst)
+    return ''.join(c for c in tekst if not unicodedata.combining(c)).casefold().strip()
+
+
+def woorden(tekst):
+    """'vol-au-vent (vegetarisch)' -> ['vol', 'au', 'vent', 'vegetarisch']"""
+    return WOORD.findall(tekst)
+
+
+def trigrammen(tekst, rand=True):
+    """Trigrammen van `tekst`; met rand=True ook die met het begin en einde van de tekst"""
+    if rand:
+        tekst = f"  {tekst} "
+    return {tekst[i:i + 3] for i in range(len(tekst) - 2)}
+
+
+class ZoekIndex:
+    """Eén keer per versie van de Eten-lijst opgebouwd, gedeeld door alle dagkolommen.
+
+    Begin en woordbegin zijn bereiken in gesorteerde lijsten; de letterlijke
+    deelstring-test loopt enkel over gerechten die nog geen betere score
+    hebben en alle trigrammen van de term bevatten. Typfoutsuggesties (een
+    bincount over de trigramlijsten) komen er enkel bij als de term zelf
+    minder dan MAX_SUGGESTIES treffers geeft.
+    """
+
+    def __init__(self, opties):
+        self.opties = tuple(opties)
+        self._opties = np.empty(len(self.opties), dtype=object)
+        self._opties[:] = self.opties
+        self._teksten = [normaliseer(optie) for optie in self.opties]
+        # Gesorteerde teksten en woorden met hun ids: alles met een prefix ligt aaneen
+        volgorde = sorted(range(len(self._teksten)), key=self._teksten.__getitem__)
+        self._gesorteerd = [self._teksten[i] for i in volgorde]
+        self._gesorteerd_ids = np.array(volgorde, dtype=np.intp)
+        paren = sorted((woord, i) for i, tekst in enumerate(self._teksten) for woord in woorden(tekst))
+        self._woorden = [woord for woord, _ in paren]
+        self._woord_ids = np.array([i for _, i in paren], dtype=np.intp)
+        per_trigram = defaultdict(list)
+        for i, tekst in enumerate(self._teksten):
+            for trigram in trigrammen(tekst):
+                per_trigram[trigram].append(i)
+        self._per_trigram = {trigram: np.array(ids, dtype=np.intp) for trigram, ids in per_trigram.items()}
+        self._resultaten = LRUCache(maxsize=128)
+
+    def _bereik(self, gesorteerd, prefix):
+        return bisect_left(gesorteerd, prefix), bisect_left(gesorteerd, prefix + LAATSTE_TEKEN)
+
+    def _met_prefix(self, prefix):
+        """Booleaans masker van de gerechten met een woord dat met `prefix` begint"""
+        begin, einde = self._bereik(self._woorden, prefix)
+        masker = np.zeros(len(self._teksten), dtype=bool)
+        masker[self._woord_ids[begin:einde]] = True
+        return masker
+
+    def zoek(self, zoekterm):
+        """Opties die bij `zoekterm` passen, de beste eerst"""
+        term = normaliseer(zoekterm)
+        if not term:
+            return list(self.opties)
+        return self._resultaten.haal_of_bereken(term, lambda: self._zoek(term))
+
+    def leeg(self):
+        """Vergeet de onthouden zoekresultaten (bv. om koude zoekopdrachten te meten)"""
+        self._resultaten.leeg()
+
+    def _zoek(self, term):
+        # Lagere score = beter; betere scores eerst, latere stappen overschrijven die niet
+        scores = np.full(len(self._teksten), GEEN_TREFFER)
+
+        # Elk zoekwoord is het begin van een woord in het gerecht ("sp bol" -> "Spaghetti bolognese")
+        zoekwoorden = woorden(term)
+        if zoekwoorden:
+            scores[reduce(np.logical_and, (self._met_prefix(woord) for woord in zoekwoorden))] = 2
+
+        # Begint met de zoekterm, of is hem exact
+        begin, einde = self._bereik(self._gesorteerd, term)
+        scores[self._gesorteerd_ids[begin:einde]] = 1
+        scores[self._gesorteerd_ids[begin:bisect_right(self._gesorteerd, term, begin, einde)]] = 0
+
+        # Letterlijke deelstring (zoals vroeger), enkel nog voor gerechten zonder betere score
+        # die alle trigrammen van de term bevatten
+        binnen = trigrammen(term, rand=False)
+        if binnen:
+            lijsten = [self._per_trigram.get(t, LEEG) for t in binnen]
+            in_binnen = np.bincount(np.concatenate(lijsten), minlength=len(scores))
+            kandidaten = np.flatnonzero((in_binnen == len(binnen)) & (scores == GEEN_TREFFER))
+        else:
+            in_binnen, kandidaten = 0, np.flatnonzero(scores == GEEN_TREFFER)
+        scores[[i for i in kandidaten.tolist() if term in self._teksten[i]]] = 3
+
+        treffers = np.flatnonzero(scores < GEEN_TREFFER)
+        # Typfouten: enkel als de term zelf weinig oplevert. De trigrammen binnen de term zijn
+        # hierboven al geteld, dus komen er enkel nog de randtrigrammen bij.
+        if len(term) >= 3 and len(treffers) < MAX_SUGGESTIES:
+            term_trigrammen = trigrammen(term)
+            rand = [self._per_trigram.get(t, LEEG) for t in term_trigrammen - binnen]
+            gedeeld = in_binnen + np.bincount(np.concatenate(rand), minlength=len(scores))
+            kandidaten = np.flatnonzero((gedeeld >= MIN_GELIJKENIS * len(term_trigrammen))
+                                        & (scores == GEEN_TREFFER))
+            # Meest gedeelde trigrammen eerst, bij gelijkheid de laagste id
+            beste = kandidaten[np.argsort(-gedeeld[kandidaten], kind='stable')][:MAX_SUGGESTIES]
+            scores[beste] = 5 - gedeeld[beste] / len(term_trigrammen)
+            treffers = np.flatnonzero(scores < GEEN_TREFFER)
+
+        return self._opties[treffers[np.argsort(scores[treffers], kind='stable')]].tolist()